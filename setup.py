@@ -50,6 +50,10 @@ install_requires = [
 tests_require = [
     "dtps-http",
 ]
+# optional serialization formats (see duckietown_messages.utils.serialization)
+extras_require = {
+    "msgpack": ["msgpack"],
+}
 
 # compile description
 underline = "=" * (len(package_name) + len(short_description) + 2)
@@ -75,6 +79,7 @@ setup(
     url=library_webpage,
     tests_require=tests_require,
     install_requires=install_requires,
+    extras_require=extras_require,
     package_dir={"": "src"},
     packages=find_packages("./src"),
     long_description=description,
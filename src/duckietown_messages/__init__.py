@@ -1 +1,3 @@
 __version__ = "0.0.27"
+
+from .utils.warmup import warmup
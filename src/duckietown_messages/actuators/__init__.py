@@ -8,4 +8,5 @@ from .drone_control import DroneControl
 from .drone_mode import DroneModeMsg, DroneModeResponse
 from .drone_motor_command import DroneMotorCommand
 from .generic import Actuator
+from .led_frame import LEDFrame
 from .leds import LEDs
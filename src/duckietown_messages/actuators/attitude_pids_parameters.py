@@ -1,8 +1,9 @@
 from duckietown_messages.base import BaseMessage
+from duckietown_messages.utils.packing import Packable
 from pydantic import Field
 
 
-class AttitudePIDParameters(BaseMessage):
+class AttitudePIDParameters(BaseMessage, Packable):
     
     roll_pid_kp: float = Field(description="Roll PID proportional gain")
     roll_pid_ki: float = Field(description="Roll PID integral gain")
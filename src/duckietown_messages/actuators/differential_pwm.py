@@ -2,9 +2,10 @@ from pydantic import Field
 
 from ..base import BaseMessage
 from ..standard.header import Header, AUTO
+from ..utils.packing import Packable
 
 
-class DifferentialPWM(BaseMessage):
+class DifferentialPWM(BaseMessage, Packable):
     # header
     header: Header = AUTO
 
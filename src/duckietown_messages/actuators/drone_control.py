@@ -1,7 +1,8 @@
 from pydantic import Field
 from ..base import BaseMessage
+from ..utils.packing import Packable
 
-class DroneControl(BaseMessage):
+class DroneControl(BaseMessage, Packable):
     """
     Roll Pitch Yaw(rate) Throttle Commands, simulating output from
     remote control. Values range from 900 to 2000
@@ -2,6 +2,7 @@ from enum import IntEnum
 
 from pydantic import Field
 from ..base import BaseMessage
+from ..utils.packing import Packable
 
 
 class Mode(IntEnum):
@@ -10,7 +11,7 @@ class Mode(IntEnum):
     FLYING = 2
 
 
-class DroneModeMsg(BaseMessage):
+class DroneModeMsg(BaseMessage, Packable):
     mode: Mode = Field(description="mode of the drone, can be DISARMED, ARMED, FLYING")
 
 
@@ -1,8 +1,9 @@
 from pydantic import Field
 from ..base import BaseMessage
 from ..standard.header import AUTO, Header
+from ..utils.packing import Packable
 
-class DroneMotorCommand(BaseMessage):
+class DroneMotorCommand(BaseMessage, Packable):
     """
     PWM commands from the range defined on betaflight for each motor.
     """
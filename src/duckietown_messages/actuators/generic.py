@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import ClassVar, Optional
 
 from pydantic import Field
 
@@ -7,6 +7,9 @@ from ..standard.header import Header, AUTO
 
 
 class Actuator(BaseMessage):
+    # actuator descriptors rarely change, decoded instances are shared through the decode cache
+    cache_decoded: ClassVar[bool] = True
+
     # header
     header: Header = AUTO
 
@@ -0,0 +1,132 @@
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+from pydantic import Field
+
+from .car_lights import CarLights
+from .leds import LEDs
+from ..base import BaseMessage
+from ..colors.rgba import RGBA
+from ..standard.header import Header, AUTO
+
+# order of the lights of CarLights in a LED frame
+CAR_LIGHTS: List[str] = ["front_left", "front_right", "back_left", "back_right"]
+
+
+def _dtype(resolution: int) -> np.dtype:
+    # values of up to 8 bits are stored in one byte, up to 16 bits in two (little-endian)
+    return np.dtype(np.uint8) if resolution <= 8 else np.dtype("<u2")
+
+
+def quantize(values: np.ndarray, resolution: int) -> np.ndarray:
+    """Maps intensities in [0, 1] (clipped) to integer levels with the given resolution (bits)."""
+    levels: int = (1 << resolution) - 1
+    return np.rint(np.clip(values, 0.0, 1.0) * levels).astype(_dtype(resolution))
+
+
+def dequantize(values: np.ndarray, resolution: int) -> np.ndarray:
+    """Maps integer levels with the given resolution (bits) to float32 intensities in [0, 1]."""
+    return values.astype(np.float32) / np.float32((1 << resolution) - 1)
+
+
+@lru_cache(maxsize=None)
+def gamma_table(resolution: int, gamma: float) -> np.ndarray:
+    """Lookup table mapping each linear level of the given resolution to its gamma-corrected level."""
+    levels: int = (1 << resolution) - 1
+    table = quantize((np.arange(levels + 1) / levels) ** gamma, resolution)
+    table.flags.writeable = False
+    return table
+
+
+class LEDFrame(BaseMessage):
+    # header
+    header: Header = AUTO
+
+    # number of LEDs in the frame
+    quantity: int = Field(description="The number of LEDs", ge=0)
+
+    # number of color channels of each LED (e.g., 3 for RGB, 4 for RGBA)
+    colors: int = Field(description="The number of color channels of each LED", ge=1)
+
+    # bits per channel, values of up to 8 bits take one byte, up to 16 bits two bytes (little-endian)
+    resolution: int = Field(description="The resolution of each color channel in number of bits", ge=1, le=16)
+
+    # channel values, LED after LED, size is (quantity * colors * bytes per value)
+    data: bytes = Field(description="Channel values of all the LEDs, packed LED after LED")
+
+    @classmethod
+    def from_array(cls, values: np.ndarray, resolution: int = 8, header: Header = None) -> 'LEDFrame':
+        """Builds a frame from a (quantity, colors) array of integer levels."""
+        if values.ndim != 2:
+            raise ValueError(f"Expected a (quantity, colors) array, got shape {values.shape}")
+        if values.size and int(values.max()) >= (1 << resolution):
+            raise ValueError(f"Values exceed the resolution of {resolution} bits")
+        return cls(
+            header=header or Header.get_default(),
+            quantity=values.shape[0],
+            colors=values.shape[1],
+            resolution=resolution,
+            data=np.ascontiguousarray(values, dtype=_dtype(resolution)).tobytes(),
+        )
+
+    @classmethod
+    def from_float(cls, values: np.ndarray, resolution: int = 8, gamma: Optional[float] = None,
+                   header: Header = None) -> 'LEDFrame':
+        """
+        Builds a frame from a (quantity, colors) array of intensities in [0, 1], optionally applying
+        the gamma correction ``values ** gamma`` before quantization.
+        """
+        values = np.asarray(values, dtype=np.float32)
+        if gamma is not None:
+            values = np.clip(values, 0.0, 1.0) ** np.float32(gamma)
+        return cls.from_array(quantize(values, resolution), resolution, header)
+
+    @classmethod
+    def for_leds(cls, leds: LEDs, values: np.ndarray, gamma: Optional[float] = None,
+                 header: Header = None) -> 'LEDFrame':
+        """Same as ``from_float`` with the shape and resolution declared by the ``leds`` descriptor."""
+        values = np.asarray(values, dtype=np.float32)
+        if values.shape != (leds.quantity, leds.colors):
+            raise ValueError(f"Expected intensities of shape {(leds.quantity, leds.colors)} for LEDs "
+                             f"'{leds.name}', got {values.shape}")
+        return cls.from_float(values, leds.resolution, gamma, header)
+
+    @classmethod
+    def from_rgba(cls, colors: List[RGBA], resolution: int = 8, header: Header = None) -> 'LEDFrame':
+        values = np.array([[c.r, c.g, c.b, c.a] for c in colors], dtype=np.float32).reshape(-1, 4)
+        return cls.from_float(values, resolution, header=header)
+
+    @classmethod
+    def from_car_lights(cls, lights: CarLights, resolution: int = 8) -> 'LEDFrame':
+        """Builds a 4x RGBA frame out of the lights in the order given by `CAR_LIGHTS`."""
+        return cls.from_rgba([getattr(lights, name) for name in CAR_LIGHTS], resolution, lights.header)
+
+    def as_array(self) -> np.ndarray:
+        """Returns the (quantity, colors) integer levels as a read-only view on ``data``."""
+        buffer = np.frombuffer(self.data, dtype=_dtype(self.resolution))
+        if buffer.size != self.quantity * self.colors:
+            raise ValueError(f"Expected {self.quantity * self.colors} values in the LED frame, "
+                             f"got {buffer.size}")
+        return buffer.reshape((self.quantity, self.colors))
+
+    def as_float(self) -> np.ndarray:
+        """Returns the (quantity, colors) intensities in [0, 1] as float32."""
+        return dequantize(self.as_array(), self.resolution)
+
+    def apply_gamma(self, gamma: float) -> 'LEDFrame':
+        """Returns a copy of the frame with gamma correction applied through a lookup table."""
+        values = gamma_table(self.resolution, gamma)[self.as_array()]
+        return LEDFrame.from_array(values, self.resolution, self.header)
+
+    def to_rgba(self) -> List[RGBA]:
+        """Returns one RGBA color per LED, LEDs with 3 channels are opaque."""
+        if self.colors not in (3, 4):
+            raise ValueError(f"Only frames with 3 or 4 colors can be converted to RGBA, got {self.colors}")
+        values = self.as_float().tolist()
+        return [RGBA(r=v[0], g=v[1], b=v[2], a=v[3] if self.colors == 4 else 1.0) for v in values]
+
+    def to_car_lights(self) -> CarLights:
+        if self.quantity != len(CAR_LIGHTS):
+            raise ValueError(f"Expected a frame of {len(CAR_LIGHTS)} LEDs, got {self.quantity}")
+        return CarLights(header=self.header, **dict(zip(CAR_LIGHTS, self.to_rgba())))
@@ -1,32 +1,310 @@
 import typing
 from abc import ABCMeta
+from functools import lru_cache
 
-from pydantic import BaseModel, ValidationError
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError
 
-from dtps_http import RawData
-from duckietown_messages.utils.exceptions import DataDecodingError
+from dtps_http import RawData, MIME_CBOR
+# `compact` registers the "compact" serialization format
+from duckietown_messages.utils import caching, compact, parallel
+from duckietown_messages.utils.exceptions import BatchDecodingError, DataDecodingError
+from duckietown_messages.utils.metrics import Metrics
+from duckietown_messages.utils.migrations import Migrations
+from duckietown_messages.utils.serialization import SerializerAbs, Serializers
+from duckietown_messages.utils.tracing import Tracing
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(cls: type) -> TypeAdapter:
+    # validator/serializer of `List[cls]`, built once per message class
+    return TypeAdapter(typing.List[cls])
 
 
 class BaseMessage(BaseModel, metaclass=ABCMeta):
+    # bytes travel as base64 strings in JSON, validators and serializers are built on first use (see `warmup`)
+    model_config = ConfigDict(ser_json_bytes="base64", val_json_bytes="base64", defer_build=True)
+
+    # default serialization format used by `to_rawdata`, see `duckietown_messages.utils.serialization`
+    wire_format: typing.ClassVar[str] = "cbor"
+
+    # share decoded instances through the content-addressed cache, see `duckietown_messages.utils.caching`
+    cache_decoded: typing.ClassVar[bool] = False
+
+    # when nested in another message and serialized in the "compact" format, a header equal to the one of
+    # the enclosing message is omitted and taken from it on decode, see `duckietown_messages.utils.compact`
+    inherit_header: typing.ClassVar[bool] = False
 
     # TODO: add a field for the header and remove it from the subclasses
 
+    def __setattr__(self, name: str, value: typing.Any):
+        if name in type(self).model_fields:
+            # frozen (shared) instances are refused, the cached content hash is dropped
+            caching.assigning(self, name, value)
+        super().__setattr__(name, value)
+
     @classmethod
     def from_rawdata(cls, rd: RawData, allow_none: bool = False) -> 'BaseMessage':
-        native: object = rd.get_as_native_object()
+        if cls.cache_decoded:
+            return caching.DECODE_CACHE.decode(cls, rd, allow_none)
+        return cls._from_rawdata(rd, allow_none)
+
+    @classmethod
+    def _from_rawdata(cls, rd: RawData, allow_none: bool) -> 'BaseMessage':
+        if rd.content_type != MIME_CBOR:
+            serializer: typing.Optional[SerializerAbs] = Serializers.for_content_type(rd.content_type)
+            if serializer is not None and serializer.name != "cbor":
+                return cls._from_serialized(serializer, rd, allow_none)
+        t0: int = Metrics.start(cls.__name__, "decode") if Metrics.enabled else 0
+        try:
+            native: object = rd.get_as_native_object()
+        except Exception as e:
+            if t0:
+                Metrics.stop(cls.__name__, "decode", t0, bytes_in=len(rd.content), failed=True)
+            raise DataDecodingError(f"Error while parsing {cls.__name__} from {rd}: {e}", e)
+        if t0:
+            Metrics.stop(cls.__name__, "decode", t0, bytes_in=len(rd.content))
         if native is None:
             if allow_none:
                 # noinspection PyTypeChecker
                 return None
             raise DataDecodingError(f"Expected a dict-like object, received None instead")
+        if not isinstance(native, dict):
+            raise DataDecodingError(f"Expected a dict-like object, received {type(native).__name__} instead")
+        if Migrations.enabled:
+            native = cls._upgrade(native, rd)
         # ---
         data: dict = typing.cast(dict, native)
+        t0 = Metrics.start(cls.__name__, "validate") if Metrics.enabled else 0
         try:
             # noinspection PyArgumentList
-            return cls(**data)
+            msg = cls(**data)
         except ValidationError as e:
+            if t0:
+                Metrics.stop(cls.__name__, "validate", t0, failed=True)
             raise DataDecodingError(f"Error while parsing {cls.__name__} from {rd}: {e}", e)
+        if t0:
+            Metrics.stop(cls.__name__, "validate", t0)
+        if Tracing.enabled:
+            Tracing.stamp(msg, f"decode:{cls.__name__}")
+        return msg
+
+    @classmethod
+    def _upgrade(cls, native: object, rd: RawData) -> object:
+        # brings payloads sent with an older version of the message to the current one
+        try:
+            return Migrations.upgrade(cls, native)
+        except Exception as e:
+            raise DataDecodingError(f"Error while upgrading {cls.__name__} from {rd}: {e}", e)
+
+    @classmethod
+    def _from_serialized(cls, serializer: SerializerAbs, rd: RawData, allow_none: bool) -> 'BaseMessage':
+        # parsing and validation happen in a single step for these formats
+        t0: int = Metrics.start(cls.__name__, "decode") if Metrics.enabled else 0
+        try:
+            if Migrations.enabled and Migrations.registered(cls):
+                msg = cls._load_upgraded(serializer, rd)
+            else:
+                msg = serializer.load(cls, rd.content)
+        except Exception as e:
+            if t0:
+                Metrics.stop(cls.__name__, "decode", t0, bytes_in=len(rd.content), failed=True)
+            if isinstance(e, DataDecodingError):
+                raise
+            # validation errors, but also malformed payloads and payloads that are not dict-like objects
+            raise DataDecodingError(f"Error while parsing {cls.__name__} from {rd}: {e}", e)
+        if t0:
+            Metrics.stop(cls.__name__, "decode", t0, bytes_in=len(rd.content))
+        if msg is None and not allow_none:
+            raise DataDecodingError(f"Expected a dict-like object, received None instead")
+        if Tracing.enabled and msg is not None:
+            Tracing.stamp(msg, f"decode:{cls.__name__}")
+        return msg
+
+    @classmethod
+    def _load_upgraded(cls, serializer: SerializerAbs, rd: RawData) -> typing.Optional['BaseMessage']:
+        # payloads of classes with migrations are upgraded between parsing and validation
+        native: object = serializer.load_native(cls, rd.content)
+        return None if native is None else serializer.validate(cls, cls._upgrade(native, rd))
+
+    def to_rawdata(self, format: typing.Optional[str] = None) -> RawData:
+        """
+        Serializes the message using the given format (e.g., "cbor", "msgpack", "json"), defaults to
+        the `wire_format` of the message class.
+        """
+        format = format or self.wire_format
+        if Tracing.enabled:
+            Tracing.stamp(self, f"encode:{type(self).__name__}")
+        if format == "cbor" and not Metrics.enabled:
+            # Use model_dump() instead of deprecated dict() method for better performance
+            native: dict = self.model_dump()
+            if Migrations.enabled:
+                Migrations.stamp(type(self), native)
+            return RawData.cbor_from_native_object(native)
+        serializer: SerializerAbs = Serializers.get(format)
+        if not Metrics.enabled:
+            return serializer.to_rawdata(self)
+        # instrumented path
+        name: str = type(self).__name__
+        t0: int = Metrics.start(name, "encode")
+        rd: RawData = serializer.to_rawdata(self)
+        Metrics.stop(name, "encode", t0, bytes_out=len(rd.content))
+        return rd
+
+    def content_hash(self) -> str:
+        """
+        Stable hash of the content of the message (the ETag of its CBOR encoding), computed once per instance.
+        """
+        return caching.content_hash(self)
+
+    @classmethod
+    def decode_parallel(cls, payloads: typing.Iterable[RawData], workers: typing.Optional[int] = None,
+                        chunksize: int = 256, max_pending: typing.Optional[int] = None,
+                        allow_none: bool = False) -> typing.Iterator['BaseMessage']:
+        """
+        Decodes a stream of payloads using a pool of worker processes, yielding messages in input order.
+        See `duckietown_messages.utils.parallel.decode_parallel` for details.
+        """
+        return parallel.decode_parallel(cls, payloads, workers=workers, chunksize=chunksize,
+                                        max_pending=max_pending, allow_none=allow_none)
 
-    def to_rawdata(self) -> RawData:
-        # Use model_dump() instead of deprecated dict() method for better performance
-        return RawData.cbor_from_native_object(self.model_dump())
+    @classmethod
+    def model_validate_many(cls, data: typing.List[dict]) -> typing.List['BaseMessage']:
+        """
+        Validates a list of dict-like objects into a list of messages with a single call into pydantic-core.
+        Raises a BatchDecodingError listing the indices of all the invalid items.
+        """
+        t0: int = Metrics.start(cls.__name__, "validate_many") if Metrics.enabled else 0
+        try:
+            msgs: typing.List['BaseMessage'] = _list_adapter(cls).validate_python(data)
+        except ValidationError as e:
+            if t0:
+                Metrics.stop(cls.__name__, "validate_many", t0, failed=True)
+            indices: typing.List[int] = sorted({err["loc"][0] for err in e.errors() if err["loc"]})
+            raise BatchDecodingError(f"Error while parsing {len(indices)} {cls.__name__} message(s) "
+                                     f"at indices {indices}: {e}", e, indices)
+        if t0:
+            Metrics.stop(cls.__name__, "validate_many", t0)
+        return msgs
+
+    @classmethod
+    def from_rawdata_many(cls, rds: typing.Iterable[RawData],
+                          allow_none: bool = False) -> typing.List['BaseMessage']:
+        """
+        Decodes a batch of payloads into messages of this class, as `from_rawdata` would one by one. CBOR
+        payloads are parsed and validated in bulk (see `model_validate_many`), the payloads in other formats
+        and those of classes sharing their decoded instances (see `cache_decoded`) are decoded one by one.
+        Raises a BatchDecodingError listing the indices of all the payloads that could not be decoded.
+        """
+        rds = list(rds)
+        cbor: typing.List[int] = [] if cls.cache_decoded else \
+            [i for i, rd in enumerate(rds) if rd.content_type == MIME_CBOR]
+        if len(cbor) == len(rds):
+            return cls._from_cbor_many(rds, allow_none)
+        out: typing.List[typing.Optional['BaseMessage']] = [None] * len(rds)
+        failed: typing.Dict[int, Exception] = {}
+        if cbor:
+            try:
+                for i, msg in zip(cbor, cls._from_cbor_many([rds[i] for i in cbor], allow_none)):
+                    out[i] = msg
+            except BatchDecodingError as e:
+                failed.update((cbor[i], e) for i in e.indices)
+        bulk: typing.Set[int] = set(cbor)
+        for i, rd in enumerate(rds):
+            if i in bulk:
+                continue
+            if rd.content_type != MIME_CBOR and Serializers.for_content_type(rd.content_type) is None:
+                failed[i] = DataDecodingError(f"Unsupported content type '{rd.content_type}'")
+                continue
+            try:
+                out[i] = cls.from_rawdata(rd, allow_none)
+            except DataDecodingError as e:
+                failed[i] = e
+        if failed:
+            indices: typing.List[int] = sorted(failed)
+            first: Exception = failed[indices[0]]
+            raise BatchDecodingError(f"Error while decoding {len(indices)} {cls.__name__} message(s) "
+                                     f"at indices {indices}: {first}", first, indices)
+        return out
+
+    @classmethod
+    def _from_cbor_many(cls, rds: typing.List[RawData], allow_none: bool) -> typing.List['BaseMessage']:
+        t0: int = Metrics.start(cls.__name__, "decode_many") if Metrics.enabled else 0
+        malformed: typing.Dict[int, Exception] = {}
+        try:
+            natives: typing.List[object] = [rd.get_as_native_object() for rd in rds]
+        except Exception:
+            # parse the payloads one by one to find the malformed ones, reported along with the invalid ones
+            natives = cls._parse_each(rds, malformed)
+        if t0:
+            Metrics.stop(cls.__name__, "decode_many", t0, bytes_in=sum(len(rd.content) for rd in rds),
+                         failed=bool(malformed))
+        if Migrations.enabled:
+            natives = [cls._upgrade(native, rd) for native, rd in zip(natives, rds)]
+        nones: typing.List[int] = [i for i, native in enumerate(natives)
+                                   if native is None and i not in malformed]
+        if not nones and not malformed:
+            return cls._traced(cls.model_validate_many(natives))
+        if nones and not allow_none:
+            raise BatchDecodingError(f"Expected dict-like objects, received None at indices {nones} instead",
+                                     None, nones)
+        # validate the non-empty payloads only, then put the None values back in place
+        valid: typing.List[int] = [i for i, native in enumerate(natives) if native is not None]
+        failed: typing.Dict[int, Exception] = dict(malformed)
+        msgs: typing.List['BaseMessage'] = []
+        try:
+            msgs = cls.model_validate_many([natives[i] for i in valid])
+        except BatchDecodingError as e:
+            failed.update((valid[i], e.error) for i in e.indices)
+        if failed:
+            indices: typing.List[int] = sorted(failed)
+            first: Exception = failed[indices[0]]
+            raise BatchDecodingError(f"Error while parsing {len(indices)} {cls.__name__} message(s) "
+                                     f"at indices {indices}: {first}", first, indices)
+        out: typing.List[typing.Optional['BaseMessage']] = [None] * len(natives)
+        for i, msg in zip(valid, cls._traced(msgs)):
+            out[i] = msg
+        return out
+
+    @classmethod
+    def _traced(cls, msgs: typing.List['BaseMessage']) -> typing.List['BaseMessage']:
+        # same stamp as `from_rawdata` for every message of a batch
+        if Tracing.enabled:
+            for msg in msgs:
+                Tracing.stamp(msg, f"decode:{cls.__name__}")
+        return msgs
+
+    @staticmethod
+    def _parse_each(rds: typing.List[RawData], malformed: typing.Dict[int, Exception]) -> typing.List[object]:
+        # None in place of the payloads that cannot be parsed, their errors are added to `malformed`
+        natives: typing.List[object] = []
+        for i, rd in enumerate(rds):
+            try:
+                natives.append(rd.get_as_native_object())
+            except Exception as e:
+                malformed[i] = DataDecodingError(f"Error while parsing {rd}: {e}", e)
+                natives.append(None)
+        return natives
+
+    @classmethod
+    def to_rawdata_many(cls, msgs: typing.List['BaseMessage'],
+                        format: typing.Optional[str] = None) -> typing.List[RawData]:
+        """
+        Serializes a list of messages of this class, as `to_rawdata` would one by one, in the given format
+        (defaults to the `wire_format` of the class). In CBOR, all the messages are dumped with a single call.
+        """
+        format = format or cls.wire_format
+        if Tracing.enabled:
+            for msg in msgs:
+                Tracing.stamp(msg, f"encode:{cls.__name__}")
+        t0: int = Metrics.start(cls.__name__, "encode_many") if Metrics.enabled else 0
+        if format == "cbor":
+            natives: typing.List[dict] = _list_adapter(cls).dump_python(msgs)
+            if Migrations.enabled:
+                natives = [Migrations.stamp(cls, native) for native in natives]
+            rds: typing.List[RawData] = [RawData.cbor_from_native_object(native) for native in natives]
+        else:
+            serializer: SerializerAbs = Serializers.get(format)
+            rds = [serializer.to_rawdata(msg) for msg in msgs]
+        if t0:
+            Metrics.stop(cls.__name__, "encode_many", t0, bytes_out=sum(len(rd.content) for rd in rds))
+        return rds
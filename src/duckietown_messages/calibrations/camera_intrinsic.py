@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import ClassVar, Optional
 
 from pydantic import Field
 
@@ -7,6 +7,9 @@ from ..standard.header import Header, AUTO
 
 
 class CameraIntrinsicCalibration(BaseMessage):
+    # calibrations are republished unchanged, reuse the decoded instance
+    cache_decoded: ClassVar[bool] = True
+
     header: Header = AUTO
 
     K: list = Field(description="Intrinsic camera matrix (flattened)")
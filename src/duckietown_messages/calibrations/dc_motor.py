@@ -1,4 +1,4 @@
-from typing import List
+from typing import ClassVar, List
 
 from pydantic import Field
 
@@ -8,6 +8,9 @@ from ..standard.pair import Pair
 
 
 class DCMotorCalibration(BaseMessage):
+    # calibrations are republished unchanged, reuse the decoded instance
+    cache_decoded: ClassVar[bool] = True
+
     header: Header = AUTO
 
     gain: List[Pair[float, float]] = Field(description="Gain of the motor as a list of "
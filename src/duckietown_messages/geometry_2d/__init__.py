@@ -1,2 +1,5 @@
 from .point import Point
+from .point_list import PointList
+from .polyline import Polyline
 from .roi import ROI
+from .segment_list import SegmentList
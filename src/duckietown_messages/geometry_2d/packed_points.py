@@ -0,0 +1,86 @@
+from typing import ClassVar, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .point import Point
+from ..standard.header import Header
+
+# coordinates are stored as little-endian float32, ids as little-endian int32
+COORDINATE = np.dtype("<f4")
+ID = np.dtype("<i4")
+
+
+class PackedPoints:
+    """
+    Mixin for messages storing N elements made of ``points_per_element`` 2D points each as a single buffer
+    of (x, y) float32 pairs (field ``points``), with optional per-element int32 ids (field ``ids``), e.g.,
+    colors or class ids. Accessors return read-only numpy views on the buffers.
+    """
+
+    # fields `header`, `points` and `ids` are declared by the message class
+    points_per_element: ClassVar[int] = 1
+
+    @classmethod
+    def _shape(cls, n: int) -> Tuple[int, ...]:
+        return (n, 2) if cls.points_per_element == 1 else (n, cls.points_per_element, 2)
+
+    @classmethod
+    def from_array(cls, points: np.ndarray, ids: Optional[Sequence[int]] = None, header: Header = None,
+                   **kwargs):
+        """
+        Builds a message from an (N, 2) array of points, or an (N, K, 2) array for elements made of K points.
+        """
+        points = np.asarray(points)
+        n: int = points.shape[0] if points.ndim else 0
+        if points.shape != cls._shape(n):
+            raise ValueError(f"Expected an array of shape {cls._shape(n)}, got {points.shape}")
+        if ids is not None:
+            ids = np.asarray(ids)
+            if ids.shape != (n,):
+                raise ValueError(f"Expected {n} ids, got an array of shape {ids.shape}")
+            ids = np.ascontiguousarray(ids, dtype=ID).tobytes()
+        # noinspection PyArgumentList
+        return cls(
+            header=header or Header.get_default(),
+            points=np.ascontiguousarray(points, dtype=COORDINATE).tobytes(),
+            ids=ids,
+            **kwargs,
+        )
+
+    def __len__(self) -> int:
+        return len(self.points) // (COORDINATE.itemsize * 2 * self.points_per_element)
+
+    def as_array(self) -> np.ndarray:
+        """Returns the points as a read-only (N, 2) (or (N, K, 2)) float32 view on the buffer."""
+        buffer = np.frombuffer(self.points, dtype=COORDINATE)
+        if buffer.size % (2 * self.points_per_element):
+            raise ValueError(f"Expected a multiple of {2 * self.points_per_element} coordinates, "
+                             f"got {buffer.size}")
+        return buffer.reshape(self._shape(-1))
+
+    def ids_array(self) -> Optional[np.ndarray]:
+        """Returns the per-element ids as a read-only int32 view, None if there are none."""
+        if self.ids is None:
+            return None
+        ids = np.frombuffer(self.ids, dtype=ID)
+        if ids.size != len(self):
+            raise ValueError(f"Expected {len(self)} ids, got {ids.size}")
+        return ids
+
+    @staticmethod
+    def _points_to_array(points: Sequence[Point]) -> np.ndarray:
+        coordinates = np.fromiter((c for p in points for c in (p.x, p.y)), dtype=COORDINATE,
+                                  count=2 * len(points))
+        return coordinates.reshape((-1, 2))
+
+    def _array_to_points(self, points: np.ndarray) -> List[Point]:
+        # coordinates come from a float32 buffer, they are valid by construction
+        header: Header = self.header
+        return [Point.model_construct(header=header, x=x, y=y) for x, y in points.tolist()]
+
+
+__all__ = [
+    "COORDINATE",
+    "ID",
+    "PackedPoints",
+]
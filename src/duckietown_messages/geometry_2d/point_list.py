@@ -0,0 +1,27 @@
+from typing import List, Optional, Sequence
+
+from pydantic import Field
+
+from .packed_points import PackedPoints
+from .point import Point
+from ..base import BaseMessage
+from ..standard.header import Header, AUTO
+
+
+class PointList(BaseMessage, PackedPoints):
+    # header
+    header: Header = AUTO
+
+    # coordinates of the points, (x, y) pairs as little-endian float32, size is (N * 8)
+    points: bytes = Field(description="Coordinates of the points as (x, y) pairs of little-endian float32")
+
+    # optional per-point ids (e.g., color or class), little-endian int32, size is (N * 4)
+    ids: Optional[bytes] = Field(description="Per-point ids as little-endian int32", default=None)
+
+    @classmethod
+    def from_points(cls, points: Sequence[Point], ids: Optional[Sequence[int]] = None,
+                    header: Header = None) -> 'PointList':
+        return cls.from_array(cls._points_to_array(points), ids, header)
+
+    def to_points(self) -> List[Point]:
+        return self._array_to_points(self.as_array())
@@ -0,0 +1,38 @@
+from typing import List, Optional, Sequence
+
+import numpy as np
+from pydantic import Field
+
+from .packed_points import PackedPoints
+from .point import Point
+from ..base import BaseMessage
+from ..standard.header import Header, AUTO
+
+
+class Polyline(BaseMessage, PackedPoints):
+    # header
+    header: Header = AUTO
+
+    # coordinates of the vertices in order, (x, y) pairs as little-endian float32, size is (N * 8)
+    points: bytes = Field(description="Coordinates of the vertices as (x, y) pairs of little-endian float32")
+
+    # optional per-vertex ids (e.g., color or class), little-endian int32, size is (N * 4)
+    ids: Optional[bytes] = Field(description="Per-vertex ids as little-endian int32", default=None)
+
+    # whether the last vertex is connected to the first one
+    closed: bool = Field(description="Whether the last vertex is connected to the first one", default=False)
+
+    @classmethod
+    def from_points(cls, points: Sequence[Point], closed: bool = False, ids: Optional[Sequence[int]] = None,
+                    header: Header = None) -> 'Polyline':
+        return cls.from_array(cls._points_to_array(points), ids, header, closed=closed)
+
+    def to_points(self) -> List[Point]:
+        return self._array_to_points(self.as_array())
+
+    def length(self) -> float:
+        """Total length of the polyline, including the closing edge of closed polylines."""
+        vertices = self.as_array().astype(np.float64)
+        if self.closed and len(vertices) > 1:
+            vertices = np.concatenate((vertices, vertices[:1]))
+        return float(np.linalg.norm(np.diff(vertices, axis=0), axis=1).sum())
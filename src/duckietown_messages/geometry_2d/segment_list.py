@@ -0,0 +1,37 @@
+from typing import ClassVar, List, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import Field
+
+from .packed_points import PackedPoints
+from .point import Point
+from ..base import BaseMessage
+from ..standard.header import Header, AUTO
+
+
+class SegmentList(BaseMessage, PackedPoints):
+    points_per_element: ClassVar[int] = 2
+
+    # header
+    header: Header = AUTO
+
+    # endpoints of the segments, (x0, y0, x1, y1) as little-endian float32, size is (N * 16)
+    points: bytes = Field(description="Endpoints of the segments as (x0, y0, x1, y1), little-endian float32")
+
+    # optional per-segment ids (e.g., color or class), little-endian int32, size is (N * 4)
+    ids: Optional[bytes] = Field(description="Per-segment ids as little-endian int32", default=None)
+
+    @classmethod
+    def from_segments(cls, segments: Sequence[Tuple[Point, Point]], ids: Optional[Sequence[int]] = None,
+                      header: Header = None) -> 'SegmentList':
+        endpoints = cls._points_to_array([p for segment in segments for p in segment])
+        return cls.from_array(endpoints.reshape((-1, 2, 2)), ids, header)
+
+    def to_segments(self) -> List[Tuple[Point, Point]]:
+        endpoints = self._array_to_points(self.as_array().reshape((-1, 2)))
+        return list(zip(endpoints[0::2], endpoints[1::2]))
+
+    def lengths(self) -> np.ndarray:
+        """Length of each segment."""
+        endpoints = self.as_array()
+        return np.linalg.norm(endpoints[:, 1] - endpoints[:, 0], axis=1)
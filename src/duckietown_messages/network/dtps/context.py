@@ -1,7 +1,12 @@
-from typing import Union, List
+from typing import Any, Dict, Union, List, Optional, Tuple
+
+from pydantic import PrivateAttr
 
 from ...base import BaseMessage
 
+# normalized form of a context: (name, sorted unique urls, path without leading/trailing slashes)
+ContextKey = Tuple[str, Tuple[str, ...], str]
+
 
 class DTPSContextMsg(BaseMessage):
     # context configuration
@@ -9,12 +14,38 @@ class DTPSContextMsg(BaseMessage):
     urls: Union[List[str], None] = None
     path: Union[str, None] = None
 
+    # canonical key, computed on first use and reset when a field is assigned
+    _key: Optional[ContextKey] = PrivateAttr(None)
+
+    @property
+    def key(self) -> ContextKey:
+        """
+        Canonical key of the context, equivalent contexts (same urls in any order, same path up to
+        slashes) have the same key. Lists must not be modified in place after the key is computed.
+        """
+        if self._key is None:
+            self._key = (self.name, tuple(sorted(set(self.urls or []))), (self.path or "").strip("/"))
+        return self._key
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in DTPSContextMsg.model_fields:
+            super().__setattr__("_key", None)
+
+    def model_copy(self, *, update: Optional[Dict[str, Any]] = None, deep: bool = False) -> 'DTPSContextMsg':
+        # the fields of the copy are updated without going through `__setattr__`, the cached key is stale
+        copy = super().model_copy(update=update, deep=deep)
+        if update:
+            BaseMessage.__setattr__(copy, "_key", None)
+        return copy
+
     def __eq__(self, other):
         if not isinstance(other, DTPSContextMsg):
             return False
-        return (self.name == other.name and
-                sorted(self.urls or []) == sorted(other.urls or []) and
-                (self.path or "").strip("/") == (other.path or "").strip("/"))
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
 
     def __str__(self):
         return "DTPSContextMsg(name=%r, urls=%r, path=%r)" % (self.name, self.urls, self.path)
@@ -0,0 +1,123 @@
+import dataclasses
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+from .context import ContextKey, DTPSContextMsg
+
+# type of the pooled connections
+C = TypeVar("C")
+
+
+@dataclasses.dataclass
+class PoolStats:
+    # number of requests served by an open connection / that opened a new connection
+    hits: int = 0
+    misses: int = 0
+    # number of connections closed to make room for new ones
+    evictions: int = 0
+
+
+class ContextPool(Generic[C]):
+    """
+    Resolves equivalent DTPS contexts to a single canonical instance and keeps a bounded pool of client
+    connections keyed by them, so that contexts that differ only by the order of their urls or by the
+    slashes around their path share a connection.
+
+    Connections are opened by ``connect`` the first time a context is requested, reused afterwards, and the
+    least recently used one is closed by ``close`` when more than ``maxsize`` are open. Canonical contexts
+    are kept as long as their connection, so the pool never holds more than ``maxsize`` of each.
+    """
+
+    def __init__(self, connect: Callable[[DTPSContextMsg], C], close: Optional[Callable[[C], None]] = None,
+                 maxsize: int = 8):
+        if maxsize < 1:
+            raise ValueError(f"The size of the pool must be positive, got {maxsize}")
+        self.maxsize: int = maxsize
+        self.stats: PoolStats = PoolStats()
+        self._connect: Callable[[DTPSContextMsg], C] = connect
+        self._close: Optional[Callable[[C], None]] = close
+        self._contexts: Dict[ContextKey, DTPSContextMsg] = {}
+        self._connections: "OrderedDict[ContextKey, C]" = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._connections)
+
+    def __contains__(self, context: DTPSContextMsg) -> bool:
+        return context.key in self._connections
+
+    def resolve(self, context: DTPSContextMsg) -> DTPSContextMsg:
+        """
+        Returns the canonical instance of the given context, the one its open connection was opened with
+        (the context itself if there is none).
+        """
+        with self._lock:
+            return self._contexts.get(context.key, context)
+
+    def get(self, context: DTPSContextMsg) -> C:
+        """Returns the connection to the given context, opening one if needed."""
+        key: ContextKey = context.key
+        with self._lock:
+            connection: Optional[C] = self._connections.get(key)
+            if connection is not None:
+                self._connections.move_to_end(key)
+                self.stats.hits += 1
+                return connection
+            self.stats.misses += 1
+            canonical: DTPSContextMsg = self._contexts.get(key, context)
+        # connections are opened outside of the lock, so a slow one does not hold up the requests of others
+        connection = self._connect(canonical)
+        evicted = []
+        with self._lock:
+            existing: Optional[C] = self._connections.get(key)
+            if existing is not None:
+                # another thread connected to the same context meanwhile, its connection wins
+                self._connections.move_to_end(key)
+                evicted.append(connection)
+                connection = existing
+            else:
+                self._contexts.setdefault(key, canonical)
+                self._connections[key] = connection
+                while len(self._connections) > self.maxsize:
+                    old_key, old = self._connections.popitem(last=False)
+                    self._contexts.pop(old_key, None)
+                    evicted.append(old)
+                    self.stats.evictions += 1
+        # connections are closed outside of the lock
+        for old in evicted:
+            self._dispose(old)
+        return connection
+
+    def discard(self, context: DTPSContextMsg):
+        """Closes the connection to the given context (e.g., after an error), `get` opens a new one."""
+        with self._lock:
+            connection: Optional[C] = self._connections.pop(context.key, None)
+            self._contexts.pop(context.key, None)
+        if connection is not None:
+            self._dispose(connection)
+
+    def close(self):
+        """Closes all the connections."""
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._contexts.clear()
+        for connection in connections:
+            self._dispose(connection)
+
+    def _dispose(self, connection: C):
+        if self._close is not None:
+            self._close(connection)
+
+    def __enter__(self) -> 'ContextPool[C]':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+__all__ = [
+    "ContextPool",
+    "PoolStats",
+]
@@ -1,9 +1,12 @@
 from .angular_velocities import AngularVelocities
 from .button_event import ButtonEvent
 from .camera import Camera
+from .chunked_image import ChunkedImage
 from .compressed_image import CompressedImage
 from .image import Image
+from .image_chunk import ImageChunk
 from .linear_accelerations import LinearAccelerations
 from .range import Range
 from .range_finder import RangeFinder
+from .rle_mask import RLEMask
 from .temperature import Temperature
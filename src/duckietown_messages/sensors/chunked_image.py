@@ -0,0 +1,36 @@
+from typing import Literal
+
+from pydantic import Field
+
+from ..base import BaseMessage
+from ..standard.header import Header, AUTO
+
+
+class ChunkedImage(BaseMessage):
+    # header of the image
+    header: Header = AUTO
+
+    # identifier of the frame, shared with its chunks
+    frame: int = Field(description="Identifier of the frame, shared with its chunks", ge=0)
+
+    # image width, that is, number of columns
+    width: int = Field(description="Width of the image", ge=0)
+
+    # image height, that is, number of rows
+    height: int = Field(description="Height of the image", ge=0)
+
+    # encoding of pixels, see `Image.encoding`
+    encoding: Literal["rgb8", "rgba8", "bgr8", "bgra8", "mono1", "mono8", "mono16"] = \
+        Field(description="The encoding of the pixels")
+
+    # length of a full row in bytes
+    step: int = Field(description="Full row length in bytes", ge=0)
+
+    # is this data bigendian?
+    is_bigendian: bool = Field(description="Is the data bigendian?")
+
+    # number of rows in each chunk (the last one may be shorter)
+    rows_per_chunk: int = Field(description="Number of rows in each chunk", ge=1)
+
+    # number of chunks the image is split into
+    chunks: int = Field(description="Number of chunks the image is split into", ge=0)
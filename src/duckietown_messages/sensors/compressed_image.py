@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Literal, Optional
 
 import numpy as np
 from pydantic import Field
@@ -22,11 +22,12 @@ class CompressedImage(BaseMessage):
     data: bytes = Field(description="The compressed image data")
 
     @classmethod
-    def from_rgb(cls, im: np.ndarray, encoding: Literal["jpeg", "png"], header: Header) -> 'CompressedImage':
+    def from_rgb(cls, im: np.ndarray, encoding: Literal["jpeg", "png"], header: Header,
+                 quality: Optional[int] = None) -> 'CompressedImage':
         msg = CompressedImage(
             header=header,
             format=encoding,
-            data=rgb_to_jpeg(im),
+            data=rgb_to_jpeg(im, quality),
         )
         # ---
         return msg
@@ -5,8 +5,11 @@ import numpy as np
 from pydantic import Field
 
 from ..base import BaseMessage
+from ..geometry_2d.roi import ROI
 from ..standard.header import Header, AUTO
 from ..utils.image.pil import np_to_pil, pil_to_np
+from ..utils.image.resize import box_downsample, resize_nearest
+from ..utils.metrics import Metrics
 
 
 @dataclasses.dataclass
@@ -33,8 +36,9 @@ SUPPORTED_ENCODINGS: Dict[str, ImageEncoding] = {
     "mono1": ImageEncoding("L",
                            num_channels=1,
                            channel_size_bits=1,
-                           unpack=lambda i: np.unpackbits(i).astype(np.uint8),
-                           pack=lambda b: np.packbits(b)),
+                           # rows are packed independently, each one starts on a new byte
+                           unpack=lambda i: np.unpackbits(i, axis=-1),
+                           pack=lambda b: np.packbits(b.reshape((b.shape[0], -1)), axis=1)),
     "mono8": ImageEncoding("L",
                            num_channels=1)
 }
@@ -68,6 +72,9 @@ class Image(BaseMessage):
     # actual data, size is (step * rows)
     data: bytes = Field(description="Pixel data. Size must be (step * rows)")
 
+    # offset (in bytes) of the first pixel in data, used by crops sharing the buffer of their parent
+    offset: int = Field(description="Offset in bytes of the first pixel in data", default=0, ge=0)
+
     # is this data bigendian?
     is_bigendian: bool = Field(description="Is the data bigendian?")
 
@@ -84,7 +91,7 @@ class Image(BaseMessage):
             width=w,
             height=h,
             encoding=encoding,
-            step=w * c * int(encoder.channel_size_bits / 8),
+            step=(w * c * encoder.channel_size_bits + 7) // 8,
             data=encoder.pack(im).tobytes(),
             # TODO: this always True?
             is_bigendian=False
@@ -114,33 +121,28 @@ class Image(BaseMessage):
         return cls.from_np(im, "mono8", header)
 
     @classmethod
-    def from_mono1(cls, im: np.ndarray, header: Header = None) -> 'Image':
+    def from_mono1(cls, im: np.ndarray, header: Header = None, threshold: int = 125) -> 'Image':
         # validate image shape
         assert len(im.shape) == 2
-        # convert mono8 to mono1
-        im = (im > 125).astype(np.uint8)
+        # convert mono8 to mono1, pixels brighter than the threshold are set
+        im = (im > threshold).astype(np.uint8)
         # ---
         return cls.from_np(im, "mono1", header)
 
     def as_array(self) -> np.ndarray:
-        # get image encoder
-        if self.encoding not in SUPPORTED_ENCODINGS:
-            raise ValueError(f"Image encoding '{self.encoding}' not supported.")
-        encoder: ImageEncoding = SUPPORTED_ENCODINGS[self.encoding]
-        # get image shape
-        if self.encoding == "mono1":
-            w, h, c = (self.width, self.height, 1)
-        else:
-            w, h, c = (self.width, self.height, int(self.step / (self.width * (encoder.channel_size_bits / 8))))
-        # validate number of channel
-        assert c == encoder.num_channels, "Number of channels does not match the encoding. Expected %d, got %d." % (
-            encoder.num_channels, c)
-        # turn bytes into array
-        im = np.frombuffer(self.data, dtype=np.uint8)
-        # unpack data
-        im = encoder.unpack(im)
-        # shape array
-        im = im.reshape((h, w, c)) if c > 1 else im.reshape((h, w))
+        if not Metrics.enabled:
+            return self._as_array()
+        t0: int = Metrics.start("Image", "as_array")
+        im: np.ndarray = self._as_array()
+        Metrics.stop("Image", "as_array", t0, bytes_in=len(self.data))
+        return im
+
+    def _as_array(self) -> np.ndarray:
+        encoder: ImageEncoding = self._encoder()
+        # view the pixel buffer as a (rows, columns, channels) array
+        im = self._raw_array()
+        # drop the channel axis on single-channel images
+        im = im if encoder.num_channels > 1 else im[:, :, 0]
         # reorder channels
         im = encoder.order(im)
         # color space conversion
@@ -150,6 +152,117 @@ class Image(BaseMessage):
         # ---
         return im
 
+    def _encoder(self) -> ImageEncoding:
+        # get image encoder
+        if self.encoding not in SUPPORTED_ENCODINGS:
+            raise ValueError(f"Image encoding '{self.encoding}' not supported.")
+        return SUPPORTED_ENCODINGS[self.encoding]
+
+    def _raw_array(self) -> np.ndarray:
+        """
+        Returns the pixels as a (height, width, channels) array in the channel order of the encoding.
+        The array is a read-only view on ``data`` (honoring ``offset`` and ``step``) for byte-sized
+        encodings, and a freshly unpacked copy for ``mono1``.
+        """
+        encoder: ImageEncoding = self._encoder()
+        w, h, c = self.width, self.height, encoder.num_channels
+        buffer = np.frombuffer(self.data, dtype=np.uint8)
+        if encoder.channel_size_bits == 1:
+            if self.step == 0:
+                # legacy layout, bits are packed over the whole (flattened) image
+                self._check_size((h * w + 7) // 8)
+                return np.unpackbits(buffer[self.offset:])[:h * w].reshape((h, w, 1))
+            if self.step * 8 < w:
+                raise ValueError(f"Row length does not match the encoding. Expected at least "
+                                 f"{(w + 7) // 8} bytes, got {self.step}.")
+            self._check_size(h * self.step)
+            rows = buffer[self.offset:self.offset + h * self.step].reshape((h, self.step))
+            return encoder.unpack(rows)[:, :w].reshape((h, w, 1))
+        # validate number of channels
+        pixel_size: int = c * encoder.channel_size_bits // 8
+        assert self.step >= w * pixel_size, \
+            "Row length does not match the encoding. Expected at least %d bytes, got %d." % (
+                w * pixel_size, self.step)
+        # the view must not reach past the end of the buffer (the last row is not padded to `step`)
+        self._check_size((h - 1) * self.step + w * pixel_size if h and w else 0)
+        return np.lib.stride_tricks.as_strided(
+            buffer[self.offset:],
+            shape=(h, w, c),
+            strides=(self.step, pixel_size, 1),
+            writeable=False,
+        )
+
+    def _check_size(self, size: int):
+        # `size` bytes of pixels must be available in `data` from `offset` on
+        if self.offset + size > len(self.data):
+            raise ValueError(f"Pixel data too short: {self.width}x{self.height} '{self.encoding}' pixels "
+                             f"need {size} bytes from offset {self.offset}, got {len(self.data)} bytes.")
+
+    def _from_raw_array(self, im: np.ndarray) -> 'Image':
+        # inverse of `_raw_array`, keeps encoding and header of this image
+        if im.shape[2] == 1:
+            im = im[:, :, 0]
+        return Image.from_np(np.ascontiguousarray(im), self.encoding, self.header)
+
+    def crop(self, roi: ROI) -> 'Image':
+        """
+        Returns the region ``roi`` of this image as a new image.
+
+        For byte-sized encodings no pixel is copied, the new image shares ``data`` with this one
+        and addresses the region through ``offset`` and ``step``. Use ``compact`` before sending a
+        crop over the network if only the cropped pixels should be transferred.
+        Bit-packed encodings (``mono1``) cannot be addressed this way and are copied.
+        """
+        if roi.x + roi.width > self.width or roi.y + roi.height > self.height:
+            raise ValueError(f"Region {roi.width}x{roi.height}+{roi.x}+{roi.y} exceeds the image "
+                             f"size {self.width}x{self.height}.")
+        encoder: ImageEncoding = self._encoder()
+        if encoder.channel_size_bits % 8:
+            im = self._raw_array()[roi.y:roi.y + roi.height, roi.x:roi.x + roi.width]
+            return self._from_raw_array(im)
+        pixel_size: int = encoder.num_channels * encoder.channel_size_bits // 8
+        return Image(
+            header=self.header,
+            width=roi.width,
+            height=roi.height,
+            encoding=self.encoding,
+            step=self.step,
+            offset=self.offset + roi.y * self.step + roi.x * pixel_size,
+            data=self.data,
+            is_bigendian=self.is_bigendian,
+        )
+
+    def compact(self) -> 'Image':
+        """
+        Returns an image whose ``data`` only contains the pixels of this image, tightly packed.
+        Returns the image itself if it is already compact.
+        """
+        encoder: ImageEncoding = self._encoder()
+        if encoder.channel_size_bits % 8:
+            is_compact: bool = self.offset == 0 and len(self.data) == self.height * self.step
+        else:
+            row_size: int = self.width * encoder.num_channels * encoder.channel_size_bits // 8
+            is_compact: bool = self.offset == 0 and self.step == row_size and \
+                len(self.data) == self.height * self.step
+        if is_compact:
+            return self
+        return self._from_raw_array(self._raw_array())
+
+    def downsample(self, factor: int) -> 'Image':
+        """
+        Area (box) downsampling by an integer factor, in the same encoding as this image.
+        ``mono1`` images are averaged and re-thresholded at 0.5.
+        """
+        im = box_downsample(self._raw_array(), factor)
+        return self._from_raw_array(im)
+
+    def resize(self, width: int, height: int) -> 'Image':
+        """
+        Nearest-neighbor resize to ``width`` x ``height``, in the same encoding as this image.
+        """
+        im = resize_nearest(self._raw_array(), width, height)
+        return self._from_raw_array(im)
+
     def as_rgb(self) -> np.ndarray:
         # validate encoding
         assert self.encoding == "rgb8"
@@ -0,0 +1,30 @@
+import zlib
+
+from pydantic import Field
+
+from ..base import BaseMessage
+from ..standard.header import Header, AUTO
+
+
+class ImageChunk(BaseMessage):
+    # header of the image
+    header: Header = AUTO
+
+    # identifier of the frame this chunk belongs to, see `ChunkedImage`
+    frame: int = Field(description="Identifier of the frame this chunk belongs to", ge=0)
+
+    # sequence number of the chunk within the frame
+    index: int = Field(description="Sequence number of the chunk within the frame", ge=0)
+
+    # first row of the band of rows carried by this chunk
+    row: int = Field(description="First row of the band carried by the chunk", ge=0)
+
+    # CRC-32 of data
+    checksum: int = Field(description="CRC-32 of the chunk data", ge=0)
+
+    # pixel data of a band of full rows, size is (step * rows)
+    data: bytes = Field(description="Pixel data of the band of rows")
+
+    def is_valid(self) -> bool:
+        """Whether the data matches the checksum."""
+        return zlib.crc32(self.data) == self.checksum
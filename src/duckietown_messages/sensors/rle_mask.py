@@ -0,0 +1,138 @@
+from typing import Optional
+
+import numpy as np
+from pydantic import Field
+
+from .image import Image
+from ..base import BaseMessage
+from ..geometry_2d.roi import ROI
+from ..standard.header import Header, AUTO
+
+# run lengths are stored as little-endian unsigned 32-bit integers
+_COUNT = np.dtype("<u4")
+
+
+def rle_encode(mask: np.ndarray) -> np.ndarray:
+    """
+    Run-length encodes a binary mask in row-major order. Runs alternate between unset and set pixels,
+    starting with unset pixels (the first run is empty if the first pixel is set).
+    """
+    flat = np.ascontiguousarray(mask, dtype=bool).ravel()
+    if flat.size == 0:
+        return np.zeros(0, dtype=_COUNT)
+    # indices where a run ends
+    changes = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    bounds = np.concatenate(([0], changes, [flat.size]))
+    counts = np.diff(bounds)
+    if flat[0]:
+        counts = np.concatenate(([0], counts))
+    return counts.astype(_COUNT)
+
+
+def rle_decode(counts: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Inverse of `rle_encode`, returns a (height, width) array of 0/1 values."""
+    values = np.arange(counts.size, dtype=np.uint8) & 1
+    flat = np.repeat(values, counts.astype(np.int64))
+    if flat.size != height * width:
+        raise ValueError(f"Run lengths cover {flat.size} pixels, expected {height * width}")
+    return flat.reshape((height, width))
+
+
+class RLEMask(BaseMessage):
+    # header
+    header: Header = AUTO
+
+    # mask width, that is, number of columns
+    width: int = Field(description="Width of the mask", ge=0)
+
+    # mask height, that is, number of rows
+    height: int = Field(description="Height of the mask", ge=0)
+
+    # lengths of the runs of unset and set pixels (alternating, unset first) in row-major order
+    counts: bytes = Field(description="Run lengths as little-endian uint32, alternating unset/set pixels")
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray, header: Header = None) -> 'RLEMask':
+        """Builds an RLE mask from a (height, width) array, non-zero pixels are set."""
+        if mask.ndim != 2:
+            raise ValueError(f"Expected a (height, width) mask, got shape {mask.shape}")
+        return cls(
+            header=header or Header.get_default(),
+            width=mask.shape[1],
+            height=mask.shape[0],
+            counts=rle_encode(mask).tobytes(),
+        )
+
+    @classmethod
+    def from_image(cls, image: Image, threshold: int = 125) -> 'RLEMask':
+        """Builds an RLE mask from a ``mono1`` image, or a ``mono8`` one thresholded at ``threshold``."""
+        if image.encoding == "mono1":
+            mask = image._raw_array()[:, :, 0]
+        elif image.encoding == "mono8":
+            mask = image._raw_array()[:, :, 0] > threshold
+        else:
+            raise ValueError(f"Only mono1 and mono8 images can be converted to masks, got {image.encoding}")
+        return cls.from_mask(mask, image.header)
+
+    @classmethod
+    def from_roi(cls, roi: ROI, width: int, height: int, header: Header = None) -> 'RLEMask':
+        """Builds a (height, width) mask in which only the pixels within ``roi`` are set."""
+        if roi.x + roi.width > width or roi.y + roi.height > height:
+            raise ValueError(f"Region {roi.width}x{roi.height}+{roi.x}+{roi.y} exceeds the mask "
+                             f"size {width}x{height}.")
+        # one (unset, set) pair of runs per row of the region, the first run also covers the rows above
+        rows: int = roi.height if roi.width else 0
+        counts = np.empty(2 * rows + 1, dtype=np.int64)
+        counts[0] = roi.y * width + roi.x
+        counts[1:-1:2] = roi.width
+        counts[2:-1:2] = width - roi.width
+        counts[-1] = width * height - counts[:-1].sum()
+        if rows and roi.width == width:
+            # full rows, a single run
+            counts = np.array([counts[0], rows * width, counts[-1]], dtype=np.int64)
+        # drop the trailing empty run, if any
+        counts = counts[:-1] if counts.size > 1 and counts[-1] == 0 else counts
+        return cls(
+            header=header or roi.header,
+            width=width,
+            height=height,
+            counts=counts.astype(_COUNT).tobytes(),
+        )
+
+    def runs(self) -> np.ndarray:
+        """Returns the run lengths as a read-only array."""
+        return np.frombuffer(self.counts, dtype=_COUNT)
+
+    @property
+    def area(self) -> int:
+        """Number of set pixels."""
+        return int(self.runs()[1::2].sum(dtype=np.int64))
+
+    def to_mask(self) -> np.ndarray:
+        """Returns the (height, width) mask as an array of 0/1 values."""
+        return rle_decode(self.runs(), self.height, self.width)
+
+    def to_image(self) -> Image:
+        """Returns the mask as a (row-aligned, bit-packed) ``mono1`` image."""
+        return Image.from_np(self.to_mask(), "mono1", self.header)
+
+    def to_roi(self) -> Optional[ROI]:
+        """Returns the bounding box of the set pixels, computed on the runs, None if the mask is empty."""
+        counts = self.runs().astype(np.int64)
+        ends = np.cumsum(counts)
+        # first and last pixel of each run of set pixels
+        first = (ends - counts)[1::2]
+        last = ends[1::2] - 1
+        keep = counts[1::2] > 0
+        first, last = first[keep], last[keep]
+        if first.size == 0:
+            return None
+        w: int = self.width
+        y0, y1 = int(first.min() // w), int(last.max() // w)
+        # runs spanning more than one row cover all the columns
+        multirow = (first // w) != (last // w)
+        if multirow.any():
+            x0, x1 = 0, w - 1
+        else:
+            x0, x1 = int((first % w).min()), int((last % w).max())
+        return ROI(header=self.header, x=x0, y=y0, width=x1 - x0 + 1, height=y1 - y0 + 1)
@@ -1,7 +1,7 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 from ....base import BaseMessage
-from ....network.dtps.context import DTPSContextMsg
+from ....network.dtps.context import DTPSContextMsg, ContextKey
 
 
 class HILConnectionConfiguration(BaseMessage):
@@ -11,5 +11,18 @@ class HILConnectionConfiguration(BaseMessage):
     # agent information
     agent_name: str
 
+    @property
+    def key(self) -> Tuple[str, Optional[ContextKey]]:
+        """Canonical key of the configuration, see `DTPSContextMsg.key`."""
+        return self.agent_name, (self.simulator.key if self.simulator is not None else None)
+
+    def __eq__(self, other):
+        if not isinstance(other, HILConnectionConfiguration):
+            return False
+        return self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
     def __str__(self):
         return "HILConnectionConfiguration(simulator=%s, agent_name=%r,)" % (self.simulator, self.agent_name)
@@ -0,0 +1,171 @@
+import dataclasses
+import heapq
+import math
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from dtps_http import RawData
+
+from .configuration import HILConfiguration
+from .connection.configuration import HILConnectionConfiguration
+
+# a recorded message, either a payload (timestamp taken from its header) or a (timestamp, payload) pair
+Recorded = Union[RawData, Tuple[float, RawData]]
+
+# called with (topic, payload, virtual time), returns the (topic, payload) messages the agent publishes
+Agent = Callable[[str, RawData, float], Optional[Iterable[Tuple[str, RawData]]]]
+
+
+def header_timestamp(rd: RawData) -> Optional[float]:
+    """Returns the header timestamp of a serialized message, if any, without validating the message."""
+    native = rd.get_as_native_object()
+    header = native.get("header") if isinstance(native, dict) else None
+    return header.get("timestamp") if isinstance(header, dict) else None
+
+
+@dataclasses.dataclass
+class ReplayStats:
+    # number of messages fed to the agent, in total and per topic
+    messages: int = 0
+    per_topic: Dict[str, int] = dataclasses.field(default_factory=dict)
+    # size of the payloads fed to the agent
+    bytes: int = 0
+    # number of messages published by the agent
+    outputs: int = 0
+    # time span of the replayed messages (virtual time) and time it took to replay them (wall-clock time)
+    virtual_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def messages_per_second(self) -> float:
+        return self.messages / self.wall_seconds if self.wall_seconds > 0 else math.inf
+
+    @property
+    def speedup(self) -> float:
+        """How many times faster than the original recording the replay was."""
+        return self.virtual_seconds / self.wall_seconds if self.wall_seconds > 0 else math.inf
+
+
+class VirtualClock:
+    """Simulation time, driven by the timestamps of the replayed messages."""
+
+    def __init__(self, start: float = 0.0):
+        self._now: float = start
+
+    @property
+    def now(self) -> float:
+        return self._now
+
+    def advance_to(self, t: float):
+        # time never goes backwards
+        self._now = max(self._now, t)
+
+
+class LocalSimulator:
+    """
+    In-process stand-in for the simulator side of a HIL link: it plays back recorded topics and collects the
+    messages published by the agent, stamped with the virtual time at which they were published.
+
+    Every topic must be recorded in time order. Messages of different topics are merged by timestamp; ties
+    are broken by the order in which the topics were given, then by recording order, so that a replay
+    always feeds the agent the same sequence.
+    """
+
+    def __init__(self, topics: Dict[str, Iterable[Recorded]],
+                 connection: Optional[HILConnectionConfiguration] = None,
+                 configuration: Optional[HILConfiguration] = None):
+        self.topics: Dict[str, Iterable[Recorded]] = topics
+        self.connection: Optional[HILConnectionConfiguration] = connection
+        self.configuration: HILConfiguration = configuration or HILConfiguration()
+        # (virtual time, topic, payload) of the messages published by the agent
+        self.received: List[Tuple[float, str, RawData]] = []
+
+    def events(self) -> Iterator[Tuple[float, int, int, str, RawData]]:
+        """Yields (timestamp, topic index, sequence number, topic, payload) in replay order."""
+        streams = [self._stream(i, topic, recorded)
+                   for i, (topic, recorded) in enumerate(self.topics.items())]
+        return heapq.merge(*streams)
+
+    @staticmethod
+    def _stream(index: int, topic: str, recorded: Iterable[Recorded]) -> Iterator[tuple]:
+        last: float = -math.inf
+        for seq, item in enumerate(recorded):
+            if isinstance(item, tuple):
+                t, rd = item
+            else:
+                rd = item
+                t = header_timestamp(rd)
+                if t is None:
+                    # messages without a timestamp happen at the same time as the previous one
+                    t = last if last > -math.inf else 0.0
+            if t < last:
+                raise ValueError(f"Topic '{topic}' is not in time order: message #{seq} at {t} "
+                                 f"comes after a message at {last}")
+            last = t
+            yield t, index, seq, topic, rd
+
+    def receive(self, t: float, topic: str, rd: RawData):
+        self.received.append((t, topic, rd))
+
+
+class ReplayDriver:
+    """
+    Feeds the messages played back by a `LocalSimulator` to an agent, pacing them on a virtual clock derived
+    from their header timestamps.
+
+    With ``speed=1`` messages are delivered in real time, with ``speed=10`` ten times faster, and with
+    ``speed=math.inf`` (default) as fast as the agent consumes them. The agent is called synchronously, so
+    the order in which it sees the messages does not depend on the speed nor on the machine.
+    """
+
+    def __init__(self, simulator: LocalSimulator, agent: Agent, speed: float = math.inf,
+                 sleep: Callable[[float], None] = time.sleep,
+                 monotonic: Callable[[], float] = time.monotonic):
+        if speed <= 0:
+            raise ValueError(f"The speed factor must be positive, got {speed}")
+        self.simulator: LocalSimulator = simulator
+        self.agent: Agent = agent
+        self.speed: float = speed
+        self.clock: VirtualClock = VirtualClock()
+        self._sleep: Callable[[float], None] = sleep
+        self._monotonic: Callable[[], float] = monotonic
+
+    def run(self, until: Optional[float] = None, limit: Optional[int] = None) -> ReplayStats:
+        """
+        Replays the recorded topics, up to the virtual time ``until`` and/or ``limit`` messages.
+        Returns the replay statistics.
+        """
+        stats = ReplayStats()
+        paced: bool = not math.isinf(self.speed)
+        wall_start: float = self._monotonic()
+        start: Optional[float] = None
+        for t, _, _, topic, rd in self.simulator.events():
+            if (until is not None and t > until) or (limit is not None and stats.messages >= limit):
+                break
+            if start is None:
+                start = t
+                self.clock = VirtualClock(t)
+            if paced:
+                delay: float = wall_start + (t - start) / self.speed - self._monotonic()
+                if delay > 0:
+                    self._sleep(delay)
+            self.clock.advance_to(t)
+            outputs = self.agent(topic, rd, self.clock.now)
+            stats.messages += 1
+            stats.per_topic[topic] = stats.per_topic.get(topic, 0) + 1
+            stats.bytes += len(rd.content)
+            for out_topic, out in outputs or ():
+                self.simulator.receive(self.clock.now, out_topic, out)
+                stats.outputs += 1
+        stats.virtual_seconds = self.clock.now - start if start is not None else 0.0
+        stats.wall_seconds = self._monotonic() - wall_start
+        return stats
+
+
+__all__ = [
+    "LocalSimulator",
+    "ReplayDriver",
+    "ReplayStats",
+    "VirtualClock",
+    "header_timestamp",
+]
@@ -5,4 +5,6 @@ from .float import Float
 from .header import Header
 from .integer import Integer
 from .list import List
+from .statistics import Statistics
 from .string import String
+from .trace import TraceContext
@@ -2,9 +2,10 @@ import re
 from typing import Optional
 from threading import Lock
 
-from pydantic import Field, field_validator
+from pydantic import Field, SerializerFunctionWrapHandler, field_validator, model_serializer
 
 from ..base import BaseMessage
+from .trace import TraceContext
 
 # Pre-compile regex pattern for version validation to avoid repeated compilation
 _VERSION_PATTERN = re.compile(r"^[0-9]+\.[0-9]+(\.[0-9]+)?$")
@@ -41,6 +42,8 @@ class Header(BaseMessage):
     txt: Optional[dict] = Field(description="Auxiliary data attached to the message", default=None)
     # timestamp
     timestamp: Optional[float] = Field(description="Timestamp", default=None)
+    # latency tracing context (see duckietown_messages.utils.tracing)
+    trace: Optional[TraceContext] = Field(description="Latency tracing context", default=None)
     
     @field_validator('version')
     @classmethod
@@ -50,6 +53,15 @@ class Header(BaseMessage):
             raise ValueError(f"Version must match pattern: {_VERSION_PATTERN.pattern}")
         return v
     
+    # not annotated with a return type, so the serialization schema remains the one of the fields
+    @model_serializer(mode="wrap")
+    def _serialize(self, handler: SerializerFunctionWrapHandler):
+        """Leaves the tracing context out of the payload when tracing is off, it costs nothing on the wire."""
+        data = handler(self)
+        if data.get("trace", ...) is None:
+            del data["trace"]
+        return data
+
     @classmethod
     def get_default(cls) -> 'Header':
         """Get a cached default header instance to reduce object creation."""
@@ -1,6 +1,6 @@
 from typing import TypeVar, Generic
 
-from pydantic import BaseModel, Field
+from pydantic import Field
 
 from duckietown_messages.base import BaseMessage
 from duckietown_messages.standard.header import Header, AUTO
@@ -10,7 +10,7 @@ T1 = TypeVar("T1")
 T2 = TypeVar("T2")
 
 
-class Pair(BaseModel, Generic[T1, T2], BaseMessage):
+class Pair(BaseMessage, Generic[T1, T2]):
     header: Header = AUTO
 
     first: T1 = Field(description="First element of the pair")
@@ -0,0 +1,36 @@
+from typing import List, Optional, Tuple
+
+from pydantic import Field
+
+from duckietown_messages.base import BaseMessage
+from duckietown_messages.standard.header import Header, AUTO
+
+
+class Statistics(BaseMessage):
+    header: Header = AUTO
+
+    # name of the summarized quantity (e.g., "voltage", "cell_voltage[0]")
+    quantity: str = Field(description="Name of the summarized quantity")
+
+    # time span covered by the samples in the window (seconds)
+    window: float = Field(description="Time span covered by the samples in the window (seconds)", ge=0)
+
+    # number of samples in the window with and without a value
+    count: int = Field(description="Number of samples in the window with a value", ge=0)
+    missing: int = Field(description="Number of samples in the window without a value (e.g., out-of-range)",
+                         ge=0, default=0)
+
+    # summary of the values in the window, null if the window has no values
+    minimum: Optional[float] = Field(description="Smallest value in the window", default=None)
+    maximum: Optional[float] = Field(description="Largest value in the window", default=None)
+    mean: Optional[float] = Field(description="Mean of the values in the window", default=None)
+    stddev: Optional[float] = Field(description="Standard deviation of the values in the window",
+                                    default=None)
+
+    # (level, value) pairs, e.g., (0.5, median)
+    quantiles: List[Tuple[float, float]] = Field(description="List of (level, estimated quantile) pairs",
+                                                 default_factory=list)
+
+    # rate of change (units per second), least-squares slope of the values over time
+    rate: Optional[float] = Field(description="Rate of change of the values in the window (units per second)",
+                                  default=None)
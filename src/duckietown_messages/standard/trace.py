@@ -0,0 +1,17 @@
+from typing import List, Tuple
+
+from pydantic import Field
+
+from duckietown_messages.base import BaseMessage
+
+# maximum number of stamps carried by a trace
+MAX_TRACE_STAMPS: int = 16
+
+
+class TraceContext(BaseMessage):
+    # identifier of the trace, shared by all the messages derived from the same source message
+    id: int = Field(description="Identifier of the trace", ge=0)
+
+    # (stage, monotonic time in nanoseconds) pairs, in the order the stages were traversed
+    stamps: List[Tuple[str, int]] = Field(description="List of (stage, monotonic time in nanoseconds) pairs",
+                                          default_factory=list, max_length=MAX_TRACE_STAMPS)
@@ -0,0 +1,282 @@
+import math
+import time
+from typing import ClassVar, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from duckietown_messages.base import BaseMessage
+from duckietown_messages.standard.header import Header
+from duckietown_messages.standard.statistics import Statistics
+
+Value = Union[None, float, Sequence[float]]
+
+# quantile levels reported by default
+DEFAULT_QUANTILES: Tuple[float, ...] = (0.05, 0.5, 0.95)
+
+
+class WindowedStatistics:
+    """
+    Incremental statistics of a scalar (``dim=1``) or vector quantity over a sliding window holding the
+    last ``size`` samples and/or the samples of the last ``duration`` seconds.
+
+    Samples live in a preallocated ring buffer, so memory does not grow with the length of the stream.
+    Time windows keep at most ``capacity`` samples; the oldest ones are dropped early if the stream is
+    faster than that. Mean and variance are updated incrementally (Welford's algorithm, reversed for the
+    evicted samples). Quantiles are estimated from a sliding histogram of ``bins`` bins spanning
+    ``bounds``, with an error of at most one bin width. Values outside of the bounds fall in the first or
+    last bin, and the estimates are clipped to the exact minimum and maximum of the window.
+    NaN values (and ``None``) are counted as missing samples.
+    """
+
+    def __init__(self, quantity: str, dim: int = 1, size: Optional[int] = None,
+                 duration: Optional[float] = None, capacity: int = 1024,
+                 bounds: Tuple[float, float] = (0.0, 1.0), bins: int = 256,
+                 quantiles: Sequence[float] = DEFAULT_QUANTILES):
+        if size is None and duration is None:
+            raise ValueError("Either the size or the duration of the window must be given.")
+        if size is not None and size < 1:
+            raise ValueError(f"The size of the window must be positive, got {size}")
+        if duration is not None and duration <= 0:
+            raise ValueError(f"The duration of the window must be positive, got {duration}")
+        if bounds[1] <= bounds[0]:
+            raise ValueError(f"Invalid histogram bounds {bounds}")
+        self.quantity: str = quantity
+        self.dim: int = dim
+        self.size: Optional[int] = size
+        self.duration: Optional[float] = duration
+        self.capacity: int = size if size is not None else capacity
+        self.bounds: Tuple[float, float] = (float(bounds[0]), float(bounds[1]))
+        self.bins: int = bins
+        self.levels: Tuple[float, ...] = tuple(quantiles)
+        # ring buffer
+        self._values: np.ndarray = np.full((self.capacity, dim), np.nan)
+        self._times: np.ndarray = np.zeros(self.capacity)
+        self._start: int = 0
+        self._length: int = 0
+        # running statistics of the values in the window
+        self._n: np.ndarray = np.zeros(dim, dtype=np.int64)
+        self._mean: np.ndarray = np.zeros(dim)
+        self._m2: np.ndarray = np.zeros(dim)
+        self._hist: np.ndarray = np.zeros((dim, bins), dtype=np.int64)
+        self._rows: np.ndarray = np.arange(dim)
+        self._scale: float = bins / (self.bounds[1] - self.bounds[0])
+        # removals since the running mean and variance were last recomputed from the buffer
+        self._removals: int = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def add(self, value: Value, t: float):
+        """Adds the sample ``value`` taken at time ``t`` (seconds), samples are expected in time order."""
+        if value is None:
+            x = np.full(self.dim, np.nan)
+        else:
+            x = np.asarray(value, dtype=np.float64)
+            if x.size != self.dim:
+                raise ValueError(f"Expected {self.dim} value(s) for '{self.quantity}', got {x.size}")
+            x = x.reshape(self.dim)
+        if self.duration is not None:
+            horizon: float = t - self.duration
+            while self._length and self._times[self._start] < horizon:
+                self._remove_oldest()
+        if self._length == self.capacity:
+            self._remove_oldest()
+        i: int = (self._start + self._length) % self.capacity
+        self._values[i] = x
+        self._times[i] = t
+        self._length += 1
+        valid = ~np.isnan(x)
+        if valid.any():
+            n = self._n + valid
+            delta = np.where(valid, x - self._mean, 0.0)
+            self._mean += delta / np.maximum(n, 1)
+            self._m2 += delta * np.where(valid, x - self._mean, 0.0)
+            self._n = n
+            self._hist[self._rows[valid], self._bin(x[valid])] += 1
+
+    def _remove_oldest(self):
+        i: int = self._start
+        x = self._values[i]
+        self._start = (i + 1) % self.capacity
+        self._length -= 1
+        valid = ~np.isnan(x)
+        if not valid.any():
+            return
+        n = self._n - valid
+        delta = np.where(valid, x - self._mean, 0.0)
+        mean = self._mean - delta / np.maximum(n, 1)
+        m2 = self._m2 - delta * np.where(valid, x - mean, 0.0)
+        self._mean = np.where(n > 0, mean, 0.0)
+        self._m2 = np.where(n > 0, np.maximum(m2, 0.0), 0.0)
+        self._n = n
+        self._hist[self._rows[valid], self._bin(x[valid])] -= 1
+        self._removals += 1
+        if self._removals >= self.capacity:
+            # bound the round-off accumulated by the removals, amortized O(1) per sample
+            self._recompute()
+
+    def _recompute(self):
+        self._removals = 0
+        values = self._window()[1]
+        valid = ~np.isnan(values)
+        self._n = valid.sum(axis=0)
+        filled = np.where(valid, values, 0.0)
+        self._mean = filled.sum(axis=0) / np.maximum(self._n, 1)
+        self._m2 = (np.where(valid, values - self._mean, 0.0) ** 2).sum(axis=0)
+
+    def _bin(self, x: np.ndarray) -> np.ndarray:
+        return np.clip((x - self.bounds[0]) * self._scale, 0, self.bins - 1).astype(np.int64)
+
+    def _window(self) -> Tuple[np.ndarray, np.ndarray]:
+        # (times, values) of the samples in the window, oldest first
+        idx = (self._start + np.arange(self._length)) % self.capacity
+        return self._times[idx], self._values[idx]
+
+    def _quantiles(self, d: int) -> np.ndarray:
+        counts = self._hist[d]
+        cumulative = np.cumsum(counts)
+        targets = np.asarray(self.levels) * self._n[d]
+        b = np.minimum(np.searchsorted(cumulative, targets), self.bins - 1)
+        below = cumulative[b] - counts[b]
+        fraction = np.clip((targets - below) / np.maximum(counts[b], 1), 0.0, 1.0)
+        return self.bounds[0] + (b + fraction) / self._scale
+
+    def summaries(self, header: Optional[Header] = None) -> List[Statistics]:
+        """
+        Returns a `Statistics` message per component of the quantity, named ``quantity`` for scalars and
+        ``quantity[i]`` for vectors.
+        """
+        times, values = self._window()
+        header = header or Header.get_default()
+        window: float = float(times[-1] - times[0]) if self._length else 0.0
+        out: List[Statistics] = []
+        for d in range(self.dim):
+            quantity: str = self.quantity if self.dim == 1 else f"{self.quantity}[{d}]"
+            n: int = int(self._n[d])
+            if n == 0:
+                out.append(Statistics(header=header, quantity=quantity, window=window, count=0,
+                                      missing=self._length))
+                continue
+            valid = ~np.isnan(values[:, d])
+            column = values[valid, d]
+            lo, hi = float(column.min()), float(column.max())
+            quantiles = np.clip(self._quantiles(d), lo, hi)
+            out.append(Statistics(
+                header=header,
+                quantity=quantity,
+                window=window,
+                count=n,
+                missing=self._length - n,
+                minimum=lo,
+                maximum=hi,
+                mean=float(self._mean[d]),
+                stddev=math.sqrt(self._m2[d] / (n - 1)) if n > 1 else 0.0,
+                quantiles=list(zip(self.levels, quantiles.tolist())),
+                rate=_slope(times[valid], column),
+            ))
+        return out
+
+
+def _slope(t: np.ndarray, x: np.ndarray) -> Optional[float]:
+    # least-squares slope of x(t)
+    tc = t - t.mean()
+    var: float = float(tc @ tc)
+    if var == 0:
+        return None
+    return float(tc @ (x - x.mean())) / var
+
+
+class StreamAggregator:
+    """
+    Windowed statistics of the numeric fields of a stream of messages, see `WindowedStatistics` for the
+    window options. Subclasses list the fields to aggregate together with their expected range of values
+    (used by the quantile sketches) in `FIELDS`. List fields are aggregated per element. If their length
+    changes, their window starts over.
+
+    Messages are placed in time by their header timestamp, or by the time of arrival if they do not have one.
+    Every ``emit_period`` seconds (of stream time), `update` returns the summaries of all the fields.
+    """
+
+    FIELDS: ClassVar[Dict[str, Tuple[float, float]]] = {}
+
+    def __init__(self, size: Optional[int] = None, duration: Optional[float] = None, capacity: int = 1024,
+                 emit_period: Optional[float] = 1.0, bins: int = 256,
+                 quantiles: Sequence[float] = DEFAULT_QUANTILES):
+        if size is None and duration is None:
+            raise ValueError("Either the size or the duration of the window must be given.")
+        self.emit_period: Optional[float] = emit_period
+        self._options: dict = dict(size=size, duration=duration, capacity=capacity, bins=bins,
+                                   quantiles=quantiles)
+        self._windows: Dict[str, WindowedStatistics] = {}
+        self._frame: Optional[str] = None
+        self._time: Optional[float] = None
+        self._last_emit: Optional[float] = None
+
+    def update(self, msg: BaseMessage, now: Optional[float] = None) -> Optional[List[Statistics]]:
+        """
+        Adds a message to the windows. ``now`` is the time of arrival of messages without a timestamp and
+        defaults to the current time. Returns the summaries if they are due, None otherwise.
+        """
+        t: Optional[float] = msg.header.timestamp
+        if t is None:
+            t = time.time() if now is None else now
+        for name, bounds in self.FIELDS.items():
+            value = getattr(msg, name)
+            window: Optional[WindowedStatistics] = self._windows.get(name)
+            if value is None or isinstance(value, (int, float)):
+                dim: int = window.dim if window is not None else 1
+            else:
+                dim = len(value)
+                if dim == 0:
+                    continue
+            if window is None or window.dim != dim:
+                window = self._windows[name] = WindowedStatistics(name, dim, bounds=bounds, **self._options)
+            window.add(value, t)
+        self._frame = msg.header.frame
+        self._time = t
+        if self.emit_period is None:
+            return None
+        if self._last_emit is None:
+            self._last_emit = t
+        if t - self._last_emit < self.emit_period:
+            return None
+        self._last_emit = t
+        return self.summaries()
+
+    def summaries(self) -> List[Statistics]:
+        """Returns the summaries of all the fields, stamped with the time and frame of the last message."""
+        header: Header = Header(frame=self._frame, timestamp=self._time)
+        out: List[Statistics] = []
+        for window in self._windows.values():
+            out.extend(window.summaries(header))
+        return out
+
+
+class BatteryStateAggregator(StreamAggregator):
+    FIELDS = {
+        "voltage": (0.0, 30.0),
+        "percentage": (0.0, 100.0),
+        "cell_voltage": (0.0, 5.0),
+    }
+
+
+class TemperatureAggregator(StreamAggregator):
+    FIELDS = {
+        "data": (-40.0, 125.0),
+    }
+
+
+class RangeAggregator(StreamAggregator):
+    FIELDS = {
+        "data": (0.0, 5.0),
+    }
+
+
+__all__ = [
+    "WindowedStatistics",
+    "StreamAggregator",
+    "BatteryStateAggregator",
+    "TemperatureAggregator",
+    "RangeAggregator",
+    "DEFAULT_QUANTILES",
+]
@@ -0,0 +1,169 @@
+import hashlib
+import weakref
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple, Type, TYPE_CHECKING
+
+from dtps_http import RawData
+from pydantic import ValidationError
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+# size (in bytes) of the content hashes
+DIGEST_SIZE: int = 16
+
+
+def digest(data: bytes) -> str:
+    """Content hash (hex) of a serialized payload."""
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+# id(message) -> (weak reference to the message, content hash)
+_hashes: Dict[int, Tuple[weakref.ref, str]] = {}
+_hashes_lock: Lock = Lock()
+# id(message) -> weak reference to the message, for the messages shared through the decode cache
+_frozen: Dict[int, weakref.ref] = {}
+
+
+def content_hash(msg: "BaseMessage") -> str:
+    """
+    Stable content hash of a message, the hash of its CBOR encoding. It is computed once per instance and
+    cached until the instance is garbage-collected or one of its fields is assigned. Changes made inside
+    its fields (e.g., ``msg.header.timestamp = t`` or ``msg.data.append(x)``) are not detected.
+    """
+    entry = _hashes.get(id(msg))
+    if entry is not None and entry[0]() is msg:
+        return entry[1]
+    value: str = digest(RawData.cbor_from_native_object(msg.model_dump()).content)
+    key: int = id(msg)
+    with _hashes_lock:
+        _hashes[key] = (weakref.ref(msg, lambda _, k=key: _hashes.pop(k, None)), value)
+    return value
+
+
+def assigning(msg: "BaseMessage", name: str, value: Any):
+    """
+    Called before a field of a message is assigned: refuses to modify frozen messages (see `freeze`) and
+    forgets the content hash of the message.
+    """
+    key: int = id(msg)
+    ref = _frozen.get(key)
+    if ref is not None and ref() is msg:
+        # same error as for the instances of frozen pydantic models
+        raise ValidationError.from_exception_data(
+            type(msg).__name__, [{"type": "frozen_instance", "loc": (name,), "input": value}])
+    entry = _hashes.get(key)
+    if entry is not None and entry[0]() is msg:
+        with _hashes_lock:
+            _hashes.pop(key, None)
+
+
+def freeze(msg: "BaseMessage"):
+    """
+    Makes a message and the messages nested in it read-only, as the instances of frozen pydantic models:
+    assigning their fields raises a ValidationError, while containers (e.g., lists) are not frozen.
+    The shared default header is left alone.
+    """
+    from ..base import BaseMessage
+    from ..standard.header import Header
+    default: Header = Header.get_default()
+    pending: list = [msg]
+    while pending:
+        value = pending.pop()
+        if isinstance(value, BaseMessage):
+            if value is default:
+                continue
+            key: int = id(value)
+            with _hashes_lock:
+                _frozen[key] = weakref.ref(value, lambda _, k=key: _frozen.pop(k, None))
+            pending.extend(value.__dict__.values())
+        elif isinstance(value, (list, tuple)):
+            pending.extend(value)
+        elif isinstance(value, dict):
+            pending.extend(value.values())
+
+
+class DecodeCache:
+    """
+    Bounded LRU cache of decoded messages, keyed by message class, content type and content hash of the
+    payload (its ETag). A payload that was already decoded is returned as the same, already validated,
+    instance, without parsing nor validating it again. Cached instances are shared across subscribers, so
+    they are frozen (see `freeze`), ``model_copy(deep=True)`` returns a copy that can be modified.
+
+    Message classes opt in by setting ``cache_decoded = True`` (static descriptors, e.g. `Sensor`), and all
+    of them share the process-wide instance `DECODE_CACHE`.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        if maxsize < 1:
+            raise ValueError(f"The size of the cache must be positive, got {maxsize}")
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: "OrderedDict[tuple, BaseMessage]" = OrderedDict()
+        self._lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, cls: Type["BaseMessage"], etag: str, content_type: str) -> Optional["BaseMessage"]:
+        """Returns the message of class ``cls`` decoded from the payload with the given ETag, if cached."""
+        key: tuple = (cls, content_type, etag)
+        with self._lock:
+            msg: Optional[BaseMessage] = self._entries.get(key)
+            if msg is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return msg
+
+    def put(self, cls: Type["BaseMessage"], etag: str, content_type: str, msg: "BaseMessage"):
+        key: tuple = (cls, content_type, etag)
+        with self._lock:
+            self._entries[key] = msg
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def decode(self, cls: Type["BaseMessage"], rd: RawData, allow_none: bool = False) -> "BaseMessage":
+        etag: str = digest(rd.content)
+        msg: Optional[BaseMessage] = self.get(cls, etag, rd.content_type)
+        if msg is None:
+            # noinspection PyProtectedMember
+            msg = cls._from_rawdata(rd, allow_none)
+            if msg is not None:
+                freeze(msg)
+                self.put(cls, etag, rd.content_type, msg)
+        return msg
+
+    def resize(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError(f"The size of the cache must be positive, got {maxsize}")
+        with self._lock:
+            self.maxsize = maxsize
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+DECODE_CACHE: DecodeCache = DecodeCache()
+
+
+__all__ = [
+    "DecodeCache",
+    "DECODE_CACHE",
+    "assigning",
+    "content_hash",
+    "digest",
+    "freeze",
+]
@@ -0,0 +1,151 @@
+import typing
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Type, TYPE_CHECKING
+
+from dtps_http import RawData, MIME_CBOR
+
+from duckietown_messages.utils.serialization import SerializerAbs, Serializers
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+MIME_CBOR_COMPACT: str = "application/vnd.duckietown.cbor+compact"
+
+# a nested message field: (field name, message class, whether the field holds a sequence of messages)
+NestedField = Tuple[str, Type["BaseMessage"], bool]
+
+_default_header: Optional[dict] = None
+
+
+def _default_header_native() -> dict:
+    global _default_header
+    if _default_header is None:
+        from ..standard.header import Header
+        _default_header = Header.get_default().model_dump()
+    return _default_header
+
+
+def _message_class(annotation: Any) -> Tuple[Optional[type], bool]:
+    # unwraps `X`, `Optional[X]`, `List[X]`, `Tuple[X, ...]` into (X, is_sequence) for message classes `X`
+    from ..base import BaseMessage
+    origin = typing.get_origin(annotation)
+    if origin is typing.Union:
+        args = [a for a in typing.get_args(annotation) if a is not type(None)]
+        return _message_class(args[0]) if len(args) == 1 else (None, False)
+    if origin in (list, tuple):
+        args = [a for a in typing.get_args(annotation) if a is not Ellipsis]
+        if len(set(args)) == 1:
+            sub, many = _message_class(args[0])
+            return (sub, True) if sub is not None and not many else (None, False)
+        return None, False
+    if isinstance(annotation, type) and issubclass(annotation, BaseMessage):
+        return annotation, False
+    return None, False
+
+
+@lru_cache(maxsize=None)
+def nested_fields(cls: Type["BaseMessage"]) -> Tuple[NestedField, ...]:
+    """The fields of a message class holding other messages (their headers excluded)."""
+    out: List[NestedField] = []
+    for name, field in cls.model_fields.items():
+        if name == "header":
+            continue
+        sub, many = _message_class(field.annotation)
+        if sub is not None:
+            out.append((name, sub, many))
+    return tuple(out)
+
+
+@lru_cache(maxsize=None)
+def _inherits(cls: Type["BaseMessage"], _seen: frozenset = frozenset()) -> bool:
+    # whether any message nested (at any depth) in `cls` takes its header from its parent
+    for _, sub, _ in nested_fields(cls):
+        if sub in _seen:
+            continue
+        if ("header" in sub.model_fields and sub.inherit_header) or _inherits(sub, _seen | {cls}):
+            return True
+    return False
+
+
+def _children(native: dict, fields: Tuple[NestedField, ...]) \
+        -> typing.Iterator[Tuple[Type["BaseMessage"], dict]]:
+    for name, sub, many in fields:
+        value = native.get(name)
+        if value is None:
+            continue
+        for item in (value if many else (value,)):
+            if isinstance(item, dict):
+                yield sub, item
+
+
+def strip_headers(cls: Type["BaseMessage"], native: dict, parent: Optional[dict] = None) -> dict:
+    """
+    Removes (in place) the headers of a dumped message and of the messages nested in it that would be
+    restored by `restore_headers`: those equal to the default header, or, for classes that inherit the
+    header of their parent, those equal to the header of the enclosing message.
+    """
+    header = native.get("header")
+    if isinstance(header, dict) and "header" in cls.model_fields:
+        if header == (parent if cls.inherit_header and parent is not None else _default_header_native()):
+            del native["header"]
+    for sub, item in _children(native, nested_fields(cls)):
+        strip_headers(sub, item, header)
+    return native
+
+
+def restore_headers(cls: Type["BaseMessage"], native: dict, parent: Optional[dict] = None) -> dict:
+    """
+    Puts back (in place) the headers inherited from the enclosing messages. Missing headers of the other
+    classes are left to the field default.
+    """
+    header = native.get("header")
+    if header is None and "header" in cls.model_fields:
+        if cls.inherit_header and parent is not None:
+            header = native["header"] = parent
+        else:
+            header = _default_header_native()
+    for sub, item in _children(native, nested_fields(cls)):
+        restore_headers(sub, item, header)
+    return native
+
+
+class CompactSerializer(SerializerAbs):
+    """
+    CBOR without the redundant headers: headers equal to the default one (at any depth) are omitted on
+    the wire, as are the headers of nested messages whose class sets ``inherit_header`` and that are equal
+    to the header of the enclosing message. Both are restored on decode, so the round trip is lossless.
+    """
+
+    @property
+    def name(self) -> str:
+        return "compact"
+
+    @property
+    def content_type(self) -> str:
+        return MIME_CBOR_COMPACT
+
+    def dump(self, msg: "BaseMessage") -> bytes:
+        native: dict = strip_headers(type(msg), self.native(msg))
+        return RawData.cbor_from_native_object(native).content
+
+    def load(self, cls: Type["BaseMessage"], data: bytes) -> Optional["BaseMessage"]:
+        native: object = self.load_native(cls, data)
+        return None if native is None else cls(**native)
+
+    def load_native(self, cls: Type["BaseMessage"], data: bytes) -> object:
+        native: object = RawData(content=data, content_type=MIME_CBOR).get_as_native_object()
+        if isinstance(native, dict) and _inherits(cls):
+            restore_headers(cls, native)
+        return native
+
+
+Serializers.register(CompactSerializer, "compact", MIME_CBOR_COMPACT)
+
+
+__all__ = [
+    "CompactSerializer",
+    "MIME_CBOR_COMPACT",
+    "nested_fields",
+    "restore_headers",
+    "strip_headers",
+]
@@ -0,0 +1,321 @@
+import dataclasses
+import struct
+from abc import ABC, abstractmethod
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, Literal, Optional, Sequence, Tuple, Type, \
+    TYPE_CHECKING
+
+from dtps_http import RawData, MIME_CBOR
+
+from duckietown_messages.utils.compact import MIME_CBOR_COMPACT
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+# which time a rate is measured with:
+#   - "header": the header timestamp of the messages, peeked from the payload (arrival time when missing)
+#   - "arrival": the time at which the messages are offered to the decimator (see `clock`)
+TimeBase = Literal["header", "arrival"]
+
+_CBOR_TYPES = {MIME_CBOR, MIME_CBOR_COMPACT}
+_MISSING = object()
+_HALF = struct.Struct(">e")
+_FLOAT = struct.Struct(">f")
+_DOUBLE = struct.Struct(">d")
+
+
+def _head(buf: memoryview, i: int) -> Tuple[int, int, int, int]:
+    # (major type, additional info, argument, position after the head) of the CBOR item at `i`
+    byte: int = buf[i]
+    major, info = byte >> 5, byte & 0x1F
+    i += 1
+    if info < 24 or info == 31:
+        return major, info, info, i
+    size: int = 1 << (info - 24)
+    return major, info, int.from_bytes(buf[i:i + size], "big"), i + size
+
+
+def _skip(buf: memoryview, i: int) -> int:
+    # position after the CBOR item at `i`, strings are jumped over without being copied
+    major, info, arg, i = _head(buf, i)
+    if info == 31:
+        # indefinite length, items until the "break" byte
+        while buf[i] != 0xFF:
+            i = _skip(buf, i)
+            if major == 5:
+                i = _skip(buf, i)
+        return i + 1
+    if major in (2, 3):
+        return i + arg
+    if major == 4:
+        for _ in range(arg):
+            i = _skip(buf, i)
+    elif major == 5:
+        for _ in range(2 * arg):
+            i = _skip(buf, i)
+    elif major == 6:
+        i = _skip(buf, i)
+    return i
+
+
+def _scalar(buf: memoryview, i: int) -> Any:
+    # value of the CBOR item at `i` if it is a number, a string, a boolean or null, `_MISSING` otherwise
+    major, info, arg, j = _head(buf, i)
+    while major == 6:
+        major, info, arg, j = _head(buf, j)
+    if major == 0:
+        return arg
+    if major == 1:
+        return -1 - arg
+    if major == 3 and info != 31:
+        return bytes(buf[j:j + arg]).decode("utf-8")
+    if major == 7:
+        if info == 25:
+            return _HALF.unpack_from(buf, j - 2)[0]
+        if info == 26:
+            return _FLOAT.unpack_from(buf, j - 4)[0]
+        if info == 27:
+            return _DOUBLE.unpack_from(buf, j - 8)[0]
+        return {20: False, 21: True, 22: None, 23: None}.get(info, _MISSING)
+    return _MISSING
+
+
+def _find(buf: memoryview, i: int, key: str) -> Optional[int]:
+    # position of the value of `key` in the CBOR map at `i`, None if it is not a map or has no such key
+    major, info, arg, i = _head(buf, i)
+    while major == 6:
+        major, info, arg, i = _head(buf, i)
+    if major != 5:
+        return None
+    n: int = -1 if info == 31 else arg
+    while n != 0 and buf[i] != 0xFF:
+        if _scalar(buf, i) == key:
+            return _skip(buf, i)
+        i = _skip(buf, _skip(buf, i))
+        n -= 1
+    return None
+
+
+def peek(rd: RawData, path: Sequence[str]) -> Any:
+    """
+    Reads a single (scalar) value of a payload, e.g., ``("header", "timestamp")``, without decoding nor
+    validating the rest of the message: the keys preceding the path are skipped over, so the cost does not
+    depend on the size of the payload (e.g., the pixels of an image). Returns None if the value is missing,
+    is not a scalar, or the payload is not CBOR.
+    """
+    if rd.content_type.split(";", 1)[0].strip() not in _CBOR_TYPES:
+        return None
+    buf = memoryview(rd.content)
+    i: Optional[int] = 0
+    try:
+        for key in path:
+            i = _find(buf, i, key)
+            if i is None:
+                return None
+        value = _scalar(buf, i)
+    except (IndexError, ValueError, struct.error):
+        # truncated or malformed payloads are left to the decoder
+        return None
+    return None if value is _MISSING else value
+
+
+def peek_timestamp(rd: RawData) -> Optional[float]:
+    """The header timestamp of a payload, see `peek`."""
+    t = peek(rd, ("header", "timestamp"))
+    return float(t) if isinstance(t, (int, float)) and not isinstance(t, bool) else None
+
+
+@dataclasses.dataclass
+class DecimationStats:
+    # number of payloads offered / kept / dropped
+    seen: int = 0
+    kept: int = 0
+    dropped: int = 0
+    # number of payloads without a header timestamp (timed with their arrival instead)
+    missing: int = 0
+    # number of keyframes (always kept)
+    keyframes: int = 0
+
+    @property
+    def drop_ratio(self) -> float:
+        return self.dropped / self.seen if self.seen else 0.0
+
+
+class Decimator(ABC):
+    """
+    Decides whether a message is worth decoding from its raw payload alone, so dropped messages never pay
+    for `from_rawdata` (nor for the decompression of their images). Subclasses implement `_keep`.
+
+    Decimators are callables returning the payload when it is kept and None otherwise, so they can be used
+    as a `Stage` of a `Pipeline` ahead of the decoding stage.
+    """
+
+    def __init__(self):
+        self.stats: DecimationStats = DecimationStats()
+
+    @abstractmethod
+    def _keep(self, rd: RawData) -> bool:
+        pass
+
+    def keep(self, rd: RawData) -> bool:
+        self.stats.seen += 1
+        kept: bool = self._keep(rd)
+        if kept:
+            self.stats.kept += 1
+        else:
+            self.stats.dropped += 1
+        return kept
+
+    def __call__(self, rd: RawData) -> Optional[RawData]:
+        return rd if self.keep(rd) else None
+
+    def filter(self, rds: Iterable[RawData]) -> Iterator[RawData]:
+        """Yields the payloads that are kept."""
+        for rd in rds:
+            if self.keep(rd):
+                yield rd
+
+    def decode(self, cls: Type["BaseMessage"], rd: RawData) -> Optional["BaseMessage"]:
+        """Decodes the payload if it is kept, returns None otherwise."""
+        return cls.from_rawdata(rd) if self.keep(rd) else None
+
+    def reset(self):
+        """Forgets the messages seen so far (not the counters)."""
+        pass
+
+
+class EveryNth(Decimator):
+    """Keeps one message every ``n``, starting with the ``offset``-th one."""
+
+    def __init__(self, n: int, offset: int = 0):
+        super().__init__()
+        if n < 1:
+            raise ValueError(f"Expected a positive decimation factor, got {n}")
+        self.n: int = n
+        self.offset: int = offset % n
+        self._count: int = 0
+
+    def _keep(self, rd: RawData) -> bool:
+        count, self._count = self._count, self._count + 1
+        return count % self.n == self.offset
+
+    def reset(self):
+        self._count = 0
+
+
+class RateLimit(Decimator):
+    """
+    Keeps at most ``hz`` messages per second, measured with the header timestamps (peeked from the payloads,
+    see `peek_timestamp`) or with the arrival times read from ``clock``. Messages are kept on a grid of
+    periods, each may arrive up to ``tolerance`` periods early, so that a 30 Hz stream capped to 10 Hz keeps
+    exactly one message every three despite jitter. Timestamps jumping back by more than a period (e.g., a
+    restarted publisher or a looping log) restart the schedule.
+    """
+
+    def __init__(self, hz: float, by: TimeBase = "header", clock: Callable[[], float] = time.monotonic,
+                 tolerance: float = 0.1):
+        super().__init__()
+        if hz <= 0:
+            raise ValueError(f"Expected a positive rate, got {hz}")
+        if by not in ("header", "arrival"):
+            raise ValueError(f"Unknown time base '{by}'")
+        self.hz: float = hz
+        self.by: TimeBase = by
+        self.period: float = 1.0 / hz
+        # fraction of the period a message may arrive early and still be kept
+        self.tolerance: float = tolerance
+        self._clock: Callable[[], float] = clock
+        # time of the last message kept, time from which the next one can be kept
+        self._last: float = 0.0
+        self._next: Optional[float] = None
+
+    def time(self, rd: RawData) -> float:
+        """The time of a payload in the time base of the decimator."""
+        if self.by == "header":
+            t: Optional[float] = peek_timestamp(rd)
+            if t is not None:
+                return t
+            self.stats.missing += 1
+        return self._clock()
+
+    def _keep(self, rd: RawData) -> bool:
+        return self._admit(self.time(rd))
+
+    def _admit(self, t: float, force: bool = False) -> bool:
+        nxt: Optional[float] = self._next
+        period: float = self.period
+        early: float = self.tolerance * period
+        if not (force or nxt is None or t >= nxt - early or t < self._last - period):
+            return False
+        # messages are kept on a grid of periods, so that early messages do not raise the rate
+        self._next = nxt + period if not force and nxt is not None and nxt - early <= t < nxt + period \
+            else t + period
+        self._last = t
+        return True
+
+    def reset(self):
+        self._next = None
+
+
+def _is_keyframe(rd: RawData) -> bool:
+    return bool(peek(rd, ("header", "txt", "keyframe")))
+
+
+class KeyframeAware(Decimator):
+    """
+    Always keeps the keyframes of a stream and decimates the other messages with ``policy``. Keyframes are
+    recognized from the payload by ``is_keyframe``, by default through a truthy ``keyframe`` entry in the
+    auxiliary data of the header (``header.txt``). A keyframe counts as a kept message for ``policy``, e.g.,
+    a `RateLimit` waits a full period after it before keeping another frame.
+    """
+
+    def __init__(self, policy: Decimator, is_keyframe: Callable[[RawData], bool] = _is_keyframe):
+        super().__init__()
+        self.policy: Decimator = policy
+        self.is_keyframe: Callable[[RawData], bool] = is_keyframe
+
+    def _keep(self, rd: RawData) -> bool:
+        if not self.is_keyframe(rd):
+            return self.policy.keep(rd)
+        self.stats.keyframes += 1
+        if isinstance(self.policy, RateLimit):
+            self.policy._admit(self.policy.time(rd), force=True)
+        return True
+
+    def reset(self):
+        self.policy.reset()
+
+
+class TopicDecimator:
+    """
+    Decimates several topics independently, with a decimator per topic built on first use by ``factory``
+    (None to keep all the messages of a topic).
+    """
+
+    def __init__(self, factory: Callable[[str], Optional[Decimator]]):
+        self.factory: Callable[[str], Optional[Decimator]] = factory
+        # topic -> decimator, None for the topics that are not decimated
+        self.decimators: Dict[str, Optional[Decimator]] = {}
+
+    def keep(self, topic: str, rd: RawData) -> bool:
+        decimator = self.decimators.get(topic, _MISSING)
+        if decimator is _MISSING:
+            decimator = self.decimators[topic] = self.factory(topic)
+        return True if decimator is None else decimator.keep(rd)
+
+    @property
+    def stats(self) -> Dict[str, DecimationStats]:
+        return {topic: d.stats for topic, d in self.decimators.items() if d is not None}
+
+
+__all__ = [
+    "DecimationStats",
+    "Decimator",
+    "EveryNth",
+    "KeyframeAware",
+    "RateLimit",
+    "TimeBase",
+    "TopicDecimator",
+    "peek",
+    "peek_timestamp",
+]
@@ -1,4 +1,4 @@
-from pydantic import ValidationError
+from typing import List, Optional
 
 
 class DataDecodingError(Exception):
@@ -8,5 +8,14 @@ class DataDecodingError(Exception):
         return self.args[0]
 
     @property
-    def error(self) -> ValidationError:
-        return self.args[1]
+    def error(self) -> Optional[Exception]:
+        """The underlying error, e.g., a pydantic ValidationError or an error of the parser of the format."""
+        return self.args[1] if len(self.args) > 1 else None
+
+
+class BatchDecodingError(DataDecodingError):
+
+    @property
+    def indices(self) -> List[int]:
+        """Indices of the items of the batch that failed to decode, sorted."""
+        return self.args[2]
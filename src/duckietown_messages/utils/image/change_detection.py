@@ -0,0 +1,144 @@
+import dataclasses
+import time
+from typing import Optional, Union, TYPE_CHECKING
+
+import numpy as np
+
+from duckietown_messages.utils.image.jpeg import jpeg_to_rgb
+
+if TYPE_CHECKING:
+    from duckietown_messages.sensors.compressed_image import CompressedImage
+    from duckietown_messages.sensors.image import Image
+
+Frame = Union[np.ndarray, "Image", "CompressedImage"]
+
+
+@dataclasses.dataclass
+class ChangeDetectorStats:
+    # number of frames inspected so far
+    frames: int
+    # number of frames that were published (changed enough, first frame or keyframes)
+    published: int
+    # number of frames that were skipped
+    skipped: int
+    # fraction of the blocks of the last frame that changed with respect to the last published frame
+    last_score: float
+    # largest mean absolute difference of a block of the last frame (grey levels)
+    last_difference: float
+
+    @property
+    def skip_ratio(self) -> float:
+        return self.skipped / self.frames if self.frames else 0.0
+
+
+class ChangeDetector:
+    """
+    Detects whether a frame differs enough from the last published one to be worth encoding and sending.
+
+    Frames are reduced to a signature: the mean intensity (over all the channels) of each block of
+    ``block`` x ``block`` pixels of a subsample taking one pixel every ``stride`` pixels in each direction.
+    Raw images are subsampled in place (no copy of the full frame), JPEG images are decoded at a reduced
+    scale. A block changed if its mean moved by more than ``threshold`` grey levels, a frame changed if the
+    fraction of changed blocks exceeds ``min_changed_fraction``.
+
+    Frames are compared with the last *published* frame, so that slow drifts eventually trigger a change.
+    With ``keyframe_interval`` a frame is published at least every that many seconds, even if the scene is
+    static.
+    """
+
+    def __init__(self,
+                 threshold: float = 4.0,
+                 min_changed_fraction: float = 0.0,
+                 stride: int = 4,
+                 block: int = 8,
+                 keyframe_interval: Optional[float] = None):
+        if stride < 1 or block < 1:
+            raise ValueError("Stride and block size must be positive.")
+        self.threshold: float = threshold
+        self.min_changed_fraction: float = min_changed_fraction
+        self.stride: int = stride
+        self.block: int = block
+        self.keyframe_interval: Optional[float] = keyframe_interval
+        # signature and time of the last published frame
+        self._reference: Optional[np.ndarray] = None
+        self._published_at: float = 0.0
+        self._frames: int = 0
+        self._published: int = 0
+        self._last_score: float = 0.0
+        self._last_difference: float = 0.0
+
+    @property
+    def stats(self) -> ChangeDetectorStats:
+        return ChangeDetectorStats(
+            frames=self._frames,
+            published=self._published,
+            skipped=self._frames - self._published,
+            last_score=self._last_score,
+            last_difference=self._last_difference,
+        )
+
+    def reset(self):
+        """Forgets the last published frame, the next frame is always published."""
+        self._reference = None
+
+    def signature(self, frame: Frame) -> np.ndarray:
+        """Returns the (rows, columns) grid of block means of a frame, see `ChangeDetector`."""
+        from duckietown_messages.sensors.compressed_image import CompressedImage
+        from duckietown_messages.sensors.image import Image
+        stride: int = self.stride
+        if isinstance(frame, Image):
+            im = frame._raw_array()
+            if frame.encoding == "mono1":
+                im = im * np.uint8(255)
+        elif isinstance(frame, CompressedImage):
+            # decode at the largest DCT scale not coarser than the stride
+            scale: int = max(s for s in (1, 2, 4, 8) if s <= stride) if frame.format == "jpeg" else 1
+            im = frame.as_array() if scale == 1 else jpeg_to_rgb(frame.data, scale)
+            stride = max(1, stride // scale)
+        else:
+            im = frame
+        if im.ndim == 2:
+            im = im[:, :, None]
+        sub = im[::stride, ::stride]
+        h, w = sub.shape[0], sub.shape[1]
+        block: int = max(1, min(self.block, h, w))
+        rows, cols = h // block, w // block
+        sub = sub[:rows * block, :cols * block].astype(np.float32)
+        return sub.reshape((rows, block, cols, block, -1)).mean(axis=(1, 3, 4))
+
+    def changed(self, frame: Frame, t: Optional[float] = None) -> bool:
+        """
+        Returns whether the frame should be published and, if so, makes it the new reference.
+        ``t`` is the time of the frame in seconds, it defaults to the header timestamp (messages) or to the
+        current time.
+        """
+        if t is None:
+            t = getattr(getattr(frame, "header", None), "timestamp", None)
+            if t is None:
+                t = time.monotonic()
+        self._frames += 1
+        signature = self.signature(frame)
+        publish: bool = self._reference is None or self._reference.shape != signature.shape
+        if publish:
+            self._last_score, self._last_difference = 1.0, float("inf")
+        else:
+            difference = np.abs(signature - self._reference)
+            self._last_difference = float(difference.max()) if difference.size else 0.0
+            self._last_score = float(np.count_nonzero(difference > self.threshold)) / max(difference.size, 1)
+            publish = self._last_score > self.min_changed_fraction or (
+                self.keyframe_interval is not None and t - self._published_at >= self.keyframe_interval)
+        if publish:
+            self._reference = signature
+            self._published_at = t
+            self._published += 1
+        return publish
+
+    def filter(self, frame: Frame, t: Optional[float] = None) -> Optional[Frame]:
+        """Returns the frame if it should be published, None otherwise."""
+        return frame if self.changed(frame, t) else None
+
+
+__all__ = [
+    "ChangeDetector",
+    "ChangeDetectorStats",
+]
@@ -0,0 +1,257 @@
+import dataclasses
+import itertools
+import random
+import time
+import zlib
+from collections import OrderedDict, deque
+from typing import Callable, Deque, List, Optional, Tuple, Union
+
+import numpy as np
+
+from duckietown_messages.sensors.chunked_image import ChunkedImage
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.sensors.image_chunk import ImageChunk
+
+# default size (in bytes) of the chunks, rows are never split across chunks
+CHUNK_SIZE: int = 64 * 1024
+
+# default maximum size (in bytes) of the frames reassembled, larger frames are rejected
+MAX_FRAME_SIZE: int = 64 * 1024 * 1024
+
+# frame ids start at a random value in every process, so that the frames of a restarted publisher (or of
+# another publisher) are not mistaken for frames already reassembled
+_frames = itertools.count(random.SystemRandom().getrandbits(48))
+
+
+def split(image: Image, chunk_size: int = CHUNK_SIZE, frame: Optional[int] = None) \
+        -> Tuple[ChunkedImage, List[ImageChunk]]:
+    """
+    Splits an image into a header message and chunks carrying bands of full rows of about ``chunk_size``
+    bytes each, with their sequence numbers and checksums. Frames are numbered automatically unless
+    ``frame`` is given.
+    """
+    image = image.compact()
+    step: int = image.step
+    rows_per_chunk: int = max(1, chunk_size // step) if step else max(1, image.height)
+    frame = next(_frames) if frame is None else frame
+    view = memoryview(image.data)
+    chunks: List[ImageChunk] = []
+    for index, row in enumerate(range(0, image.height, rows_per_chunk)):
+        data = bytes(view[row * step:min(image.height, row + rows_per_chunk) * step])
+        chunks.append(ImageChunk(header=image.header, frame=frame, index=index, row=row,
+                                 checksum=zlib.crc32(data), data=data))
+    info = ChunkedImage(
+        header=image.header,
+        frame=frame,
+        width=image.width,
+        height=image.height,
+        encoding=image.encoding,
+        step=step,
+        is_bigendian=image.is_bigendian,
+        rows_per_chunk=rows_per_chunk,
+        chunks=len(chunks),
+    )
+    return info, chunks
+
+
+@dataclasses.dataclass
+class ReassemblerStats:
+    # number of chunks received / dropped because their checksum did not match / already received
+    chunks: int = 0
+    corrupted: int = 0
+    duplicates: int = 0
+    # number of frames completed / given up after the timeout / evicted to make room for newer frames
+    completed: int = 0
+    expired: int = 0
+    evicted: int = 0
+    # number of frames rejected because their header message is inconsistent or they are too large
+    rejected: int = 0
+
+
+class PartialFrame:
+    """A frame being reassembled, its rows are written in a preallocated buffer as the chunks arrive."""
+
+    def __init__(self, frame: int, created: float):
+        self.frame: int = frame
+        self.created: float = created
+        self.info: Optional[ChunkedImage] = None
+        self.buffer: Optional[np.ndarray] = None
+        # which chunks were received
+        self.received: Optional[np.ndarray] = None
+        # chunks received before the header message
+        self.early: List[ImageChunk] = []
+
+    def start(self, info: ChunkedImage):
+        self.info = info
+        self.buffer = np.zeros(info.height * info.step, dtype=np.uint8)
+        self.received = np.zeros(info.chunks, dtype=bool)
+
+    def write(self, chunk: ImageChunk) -> bool:
+        """Copies the rows of a chunk into the buffer, returns False if the chunk was already received."""
+        if self.received[chunk.index]:
+            return False
+        start: int = chunk.row * self.info.step
+        self.buffer[start:start + len(chunk.data)] = np.frombuffer(chunk.data, dtype=np.uint8)
+        self.received[chunk.index] = True
+        return True
+
+    @property
+    def complete(self) -> bool:
+        return self.received is not None and bool(self.received.all())
+
+    @property
+    def progress(self) -> float:
+        """Fraction of the chunks received."""
+        if self.received is None:
+            return 0.0
+        return float(self.received.mean()) if self.received.size else 1.0
+
+    def rows(self) -> np.ndarray:
+        """Boolean mask of the rows received so far."""
+        info = self.info
+        if info is None:
+            return np.zeros(0, dtype=bool)
+        return np.repeat(self.received, info.rows_per_chunk)[:info.height]
+
+    def image(self) -> Optional[Image]:
+        """The frame as an image, rows not received yet are zeros. None until the header arrives."""
+        info = self.info
+        if info is None:
+            return None
+        return Image(
+            header=info.header,
+            width=info.width,
+            height=info.height,
+            encoding=info.encoding,
+            step=info.step,
+            data=self.buffer.tobytes(),
+            is_bigendian=info.is_bigendian,
+        )
+
+
+class ImageReassembler:
+    """
+    Reassembles images split with `split`. Chunks can arrive in any order, before or after the header
+    message of their frame, and are written into a buffer preallocated when the header arrives; corrupted
+    and duplicate chunks are dropped.
+
+    At most ``max_frames`` frames are reassembled at the same time (the oldest is evicted to make room),
+    frames still incomplete ``timeout`` seconds after their first message are given up, and frames larger
+    than ``max_frame_size`` bytes or whose number of chunks does not match their size are rejected (along
+    with their chunks), so memory stays bounded on lossy links and with untrusted publishers. Incomplete
+    frames can be inspected with `partial`.
+    """
+
+    def __init__(self, timeout: float = 1.0, max_frames: int = 4, max_early_chunks: int = 256,
+                 max_frame_size: int = MAX_FRAME_SIZE, clock: Callable[[], float] = time.monotonic):
+        if max_frames < 1:
+            raise ValueError(f"At least one frame must be reassembled at a time, got {max_frames}")
+        self.timeout: float = timeout
+        self.max_frames: int = max_frames
+        self.max_early_chunks: int = max_early_chunks
+        self.max_frame_size: int = max_frame_size
+        self.stats: ReassemblerStats = ReassemblerStats()
+        self._clock: Callable[[], float] = clock
+        self._frames: "OrderedDict[int, PartialFrame]" = OrderedDict()
+        # frames recently completed, their late chunks are duplicates
+        self._done: Deque[int] = deque(maxlen=4 * max_frames)
+        # frames recently rejected, their chunks are dropped
+        self._rejected: Deque[int] = deque(maxlen=4 * max_frames)
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def add(self, msg: Union[ChunkedImage, ImageChunk]) -> Optional[Image]:
+        """Adds a header or chunk message, returns the image of its frame if it is now complete."""
+        now: float = self._clock()
+        self.expire(now)
+        if msg.frame in self._done:
+            if isinstance(msg, ImageChunk):
+                self.stats.chunks += 1
+                self.stats.duplicates += 1
+            return None
+        if msg.frame in self._rejected:
+            if isinstance(msg, ImageChunk):
+                self.stats.chunks += 1
+            return None
+        if isinstance(msg, ChunkedImage) and not self.accepts(msg):
+            self._frames.pop(msg.frame, None)
+            self._rejected.append(msg.frame)
+            self.stats.rejected += 1
+            return None
+        state: PartialFrame = self._frame(msg.frame, now)
+        if isinstance(msg, ChunkedImage):
+            if state.info is not None:
+                return None
+            state.start(msg)
+            early, state.early = state.early, []
+            for chunk in early:
+                self._write(state, chunk)
+        else:
+            self.stats.chunks += 1
+            if not msg.is_valid():
+                self.stats.corrupted += 1
+                return None
+            if state.info is None:
+                if len(state.early) < self.max_early_chunks:
+                    state.early.append(msg)
+                return None
+            self._write(state, msg)
+        if not state.complete:
+            return None
+        del self._frames[msg.frame]
+        self._done.append(msg.frame)
+        self.stats.completed += 1
+        return state.image()
+
+    def accepts(self, info: ChunkedImage) -> bool:
+        """Whether the geometry of a frame is consistent and its size within ``max_frame_size``."""
+        size: int = info.height * info.step
+        return size <= self.max_frame_size and info.chunks == -(-info.height // info.rows_per_chunk)
+
+    def _frame(self, frame: int, now: float) -> PartialFrame:
+        state: Optional[PartialFrame] = self._frames.get(frame)
+        if state is None:
+            while len(self._frames) >= self.max_frames:
+                self._frames.popitem(last=False)
+                self.stats.evicted += 1
+            state = self._frames[frame] = PartialFrame(frame, now)
+        return state
+
+    def _write(self, state: PartialFrame, chunk: ImageChunk):
+        info: ChunkedImage = state.info
+        row: int = chunk.index * info.rows_per_chunk
+        # the checksum only covers the data, the position and size of the band are checked against the header
+        if chunk.index >= info.chunks or chunk.row != row or \
+                len(chunk.data) != min(info.rows_per_chunk, info.height - row) * info.step:
+            self.stats.corrupted += 1
+        elif not state.write(chunk):
+            self.stats.duplicates += 1
+
+    def partial(self, frame: Optional[int] = None) -> Optional[PartialFrame]:
+        """Returns the given frame being reassembled, or the most recent one, None if there is none."""
+        if frame is None:
+            return next(reversed(self._frames.values()), None)
+        return self._frames.get(frame)
+
+    def expire(self, now: Optional[float] = None) -> List[PartialFrame]:
+        """Gives up the frames older than the timeout, returns them."""
+        now = self._clock() if now is None else now
+        expired: List[PartialFrame] = []
+        while self._frames:
+            state: PartialFrame = next(iter(self._frames.values()))
+            if now - state.created < self.timeout:
+                break
+            expired.append(self._frames.popitem(last=False)[1])
+        self.stats.expired += len(expired)
+        return expired
+
+
+__all__ = [
+    "CHUNK_SIZE",
+    "MAX_FRAME_SIZE",
+    "ImageReassembler",
+    "PartialFrame",
+    "ReassemblerStats",
+    "split",
+]
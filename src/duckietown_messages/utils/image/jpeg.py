@@ -1,11 +1,12 @@
 import io
 import warnings
 from abc import ABC, abstractmethod
-from typing import Type, List
+from typing import Type, List, Optional
 
 import numpy as np
 
 from duckietown_messages.utils.image.pil import pil_to_np
+from duckietown_messages.utils.metrics import Metrics
 
 
 class JPEGEngineAbs(ABC):
@@ -16,11 +17,12 @@ class JPEGEngineAbs(ABC):
         pass
 
     @abstractmethod
-    def encode(self, im: np.ndarray) -> bytes:
+    def encode(self, im: np.ndarray, quality: Optional[int] = None) -> bytes:
         pass
 
     @abstractmethod
-    def decode(self, im: bytes) -> np.ndarray:
+    def decode(self, im: bytes, scale: int = 1) -> np.ndarray:
+        """Decodes an image, ``scale`` (1, 2, 4 or 8) shrinks it while decoding (in the DCT domain)."""
         pass
 
 
@@ -34,11 +36,15 @@ class TurboJPEGEngine(JPEGEngineAbs):
     def name(self) -> str:
         return "turbojpeg"
 
-    def encode(self, im: np.ndarray) -> bytes:
-        return self.engine.encode(im)
+    def encode(self, im: np.ndarray, quality: Optional[int] = None) -> bytes:
+        if quality is None:
+            return self.engine.encode(im)
+        return self.engine.encode(im, quality=quality)
 
-    def decode(self, im: bytes) -> np.ndarray:
-        return self.engine.decode(im)
+    def decode(self, im: bytes, scale: int = 1) -> np.ndarray:
+        if scale == 1:
+            return self.engine.decode(im)
+        return self.engine.decode(im, scaling_factor=(1, scale))
 
 
 class PillowJPEGEngine(JPEGEngineAbs):
@@ -51,19 +57,25 @@ class PillowJPEGEngine(JPEGEngineAbs):
     def name(self) -> str:
         return "Pillow"
 
-    def encode(self, im: np.ndarray) -> bytes:
+    def encode(self, im: np.ndarray, quality: Optional[int] = None) -> bytes:
         # convert numpy to Image
         im = self.Image.fromarray(im)
         # export as JPEG bytes
         buffer = io.BytesIO()
-        im.save(buffer, format='JPEG')
+        if quality is None:
+            im.save(buffer, format='JPEG')
+        else:
+            im.save(buffer, format='JPEG', quality=quality)
         return buffer.getvalue()
 
-    def decode(self, im: bytes) -> np.ndarray:
+    def decode(self, im: bytes, scale: int = 1) -> np.ndarray:
         # convert bytes to stream (file-like object in memory)
         buffer = io.BytesIO(im)
         # create Image object
         image = self.Image.open(buffer)
+        if scale > 1:
+            # let the decoder skip the detail coefficients
+            image.draft(image.mode, (image.width // scale, image.height // scale))
         # convert to numpy
         return pil_to_np(image)
 
@@ -90,14 +102,28 @@ class JPEG:
                 raise RuntimeError("No JPEG engine available.")
 
 
-def rgb_to_jpeg(im: np.ndarray) -> bytes:
+def rgb_to_jpeg(im: np.ndarray, quality: Optional[int] = None) -> bytes:
     JPEG.init()
-    return JPEG.engine.encode(im)
+    if not Metrics.enabled:
+        return JPEG.engine.encode(im, quality)
+    name: str = type(JPEG.engine).__name__
+    t0: int = Metrics.start(name, "encode")
+    data: bytes = JPEG.engine.encode(im, quality)
+    Metrics.stop(name, "encode", t0, bytes_out=len(data))
+    return data
 
 
-def jpeg_to_rgb(im: bytes) -> np.ndarray:
+def jpeg_to_rgb(im: bytes, scale: int = 1) -> np.ndarray:
     JPEG.init()
-    return JPEG.engine.decode(im)
+    if scale not in (1, 2, 4, 8):
+        raise ValueError(f"JPEG images can only be scaled down by 1, 2, 4 or 8 while decoding, got {scale}")
+    if not Metrics.enabled:
+        return JPEG.engine.decode(im, scale)
+    name: str = type(JPEG.engine).__name__
+    t0: int = Metrics.start(name, "decode")
+    data: np.ndarray = JPEG.engine.decode(im, scale)
+    Metrics.stop(name, "decode", t0, bytes_in=len(im))
+    return data
 
 
 __all__ = [
@@ -0,0 +1,169 @@
+import dataclasses
+import math
+from collections import deque
+from typing import Deque, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+from duckietown_messages.utils.image.change_detection import ChangeDetector
+from duckietown_messages.utils.image.jpeg import rgb_to_jpeg
+from duckietown_messages.utils.image.resize import box_downsample
+
+if TYPE_CHECKING:
+    from duckietown_messages.sensors.compressed_image import CompressedImage
+    from duckietown_messages.standard.header import Header
+
+
+@dataclasses.dataclass
+class RateControlStats:
+    # number of frames encoded so far
+    frames: int
+    # target bitrate in bits per second
+    target_bitrate: float
+    # bitrate achieved over the last second of frames (at the nominal frame rate), in bits per second
+    achieved_bitrate: float
+    # JPEG quality used for the last frame
+    quality: int
+    # downsampling factor used for the last frame (1 means full resolution)
+    scale: int
+    # size of the last frame in bytes
+    last_frame_size: int
+
+
+class AdaptiveJPEGEncoder:
+    """
+    Stateful JPEG encoder for image streams that adapts the quality (and optionally the resolution)
+    of each frame to meet a target bitrate.
+
+    The controller works in the log domain: after every frame it compares the per-frame byte budget
+    (``target_bitrate / fps / 8``) with an exponential moving average of the sizes of the previous frames
+    and moves the quality by ``gain`` quality points per octave of error. When the quality saturates at
+    ``min_quality`` while still over budget (or at ``max_quality`` while well under budget) and
+    ``allow_scaling`` is set, the resolution is halved (or doubled) by integer box downsampling.
+
+    The controller only depends on the sizes of the frames it produced, so a recorded sequence of frames
+    always results in the same sequence of qualities.
+
+    With a ``change_detector``, `compress` skips (returns None for) the frames that do not differ enough
+    from the last published one, without encoding them nor affecting the controller.
+    """
+
+    SCALES: Tuple[int, ...] = (1, 2, 4, 8)
+
+    def __init__(self,
+                 target_bitrate: float,
+                 fps: float,
+                 initial_quality: int = 75,
+                 min_quality: int = 10,
+                 max_quality: int = 95,
+                 gain: float = 8.0,
+                 smoothing: float = 0.5,
+                 allow_scaling: bool = False,
+                 scaling_hysteresis: float = 1.0,
+                 change_detector: Optional[ChangeDetector] = None):
+        if target_bitrate <= 0 or fps <= 0:
+            raise ValueError("Target bitrate and frame rate must be positive.")
+        if not (1 <= min_quality <= initial_quality <= max_quality <= 100):
+            raise ValueError("Qualities must satisfy 1 <= min_quality <= initial_quality <= max_quality <= 100.")
+        self.target_bitrate: float = target_bitrate
+        self.fps: float = fps
+        self.min_quality: int = min_quality
+        self.max_quality: int = max_quality
+        self.gain: float = gain
+        self.smoothing: float = smoothing
+        self.allow_scaling: bool = allow_scaling
+        # error (in octaves) beyond which the resolution is changed once the quality is saturated
+        self.scaling_hysteresis: float = scaling_hysteresis
+        self.change_detector: Optional[ChangeDetector] = change_detector
+        # controller state
+        self._quality: float = float(initial_quality)
+        self._scale_idx: int = 0
+        self._avg_size: Optional[float] = None
+        self._frames: int = 0
+        self._last_size: int = 0
+        self._window: Deque[int] = deque(maxlen=max(1, int(round(fps))))
+
+    @property
+    def frame_budget(self) -> float:
+        """Target size of a single frame in bytes."""
+        return self.target_bitrate / self.fps / 8.0
+
+    @property
+    def quality(self) -> int:
+        """Quality that will be used for the next frame."""
+        return int(round(self._quality))
+
+    @property
+    def scale(self) -> int:
+        """Downsampling factor that will be used for the next frame."""
+        return self.SCALES[self._scale_idx]
+
+    @property
+    def stats(self) -> RateControlStats:
+        seconds: float = len(self._window) / self.fps
+        return RateControlStats(
+            frames=self._frames,
+            target_bitrate=self.target_bitrate,
+            achieved_bitrate=(sum(self._window) * 8.0 / seconds) if seconds else 0.0,
+            quality=self.quality,
+            scale=self.scale,
+            last_frame_size=self._last_size,
+        )
+
+    def encode(self, im: np.ndarray) -> bytes:
+        """Encodes a frame with the current quality and scale, then updates the controller."""
+        if self.scale > 1:
+            im = box_downsample(im, self.scale)
+        data: bytes = rgb_to_jpeg(im, self.quality)
+        self.update(len(data))
+        return data
+
+    def compress(self, im: np.ndarray, header: Optional["Header"] = None) -> Optional["CompressedImage"]:
+        """
+        Same as ``encode`` but returns a ``CompressedImage`` message, or None if the change detector
+        (if any) deems the frame static.
+        """
+        from duckietown_messages.sensors.compressed_image import CompressedImage
+        from duckietown_messages.standard.header import Header
+        if self.change_detector is not None and \
+                not self.change_detector.changed(im, header.timestamp if header is not None else None):
+            return None
+        return CompressedImage(
+            header=header or Header.get_default(),
+            format="jpeg",
+            data=self.encode(im),
+        )
+
+    def update(self, size: int):
+        """Feeds the size in bytes of the last encoded frame to the controller."""
+        self._frames += 1
+        self._last_size = size
+        self._window.append(size)
+        if self._avg_size is None:
+            self._avg_size = float(size)
+        else:
+            self._avg_size = self.smoothing * size + (1.0 - self.smoothing) * self._avg_size
+        # error in octaves, positive when there is room for more bytes
+        error: float = math.log2(self.frame_budget / max(self._avg_size, 1.0))
+        quality: float = self._quality + self.gain * error
+        self._quality = min(max(quality, self.min_quality), self.max_quality)
+        if not self.allow_scaling:
+            return
+        # change resolution once the quality alone cannot meet the budget
+        if quality < self.min_quality and error < -self.scaling_hysteresis and \
+                self._scale_idx < len(self.SCALES) - 1:
+            self._scale_idx += 1
+            self._rescale_average(1 / 4)
+        elif quality > self.max_quality and error > self.scaling_hysteresis and self._scale_idx > 0:
+            self._scale_idx -= 1
+            self._rescale_average(4)
+
+    def _rescale_average(self, factor: float):
+        # the number of pixels changes by `factor`, so does (roughly) the size of the next frames
+        self._avg_size *= factor
+
+
+__all__ = [
+    "AdaptiveJPEGEncoder",
+    "RateControlStats",
+]
@@ -0,0 +1,56 @@
+import numpy as np
+
+
+def box_downsample(im: np.ndarray, factor: int) -> np.ndarray:
+    """
+    Area (box) downsampling by an integer factor. Every output pixel is the rounded mean of a
+    ``factor x factor`` block of input pixels, trailing rows/columns that do not fill a block are dropped.
+
+    :param im: array of shape (H, W) or (H, W, C) with an unsigned integer dtype
+    :param factor: integer downsampling factor (>= 1)
+    :return: array of shape (H // factor, W // factor[, C]) with the same dtype as the input
+    """
+    if factor < 1:
+        raise ValueError(f"Downsampling factor must be a positive integer, got {factor}.")
+    if factor == 1:
+        return im
+    h, w = im.shape[0] // factor, im.shape[1] // factor
+    if h == 0 or w == 0:
+        raise ValueError(f"Image of shape {im.shape} is too small to be downsampled by {factor}.")
+    n: int = factor * factor
+    # accumulate in a wider integer type, rows first and then columns, one strided slice at a time
+    acc_dtype = np.uint16 if n * np.iinfo(im.dtype).max <= np.iinfo(np.uint16).max else np.uint32
+    im = im[:h * factor, :w * factor]
+    rows = im[0::factor].astype(acc_dtype)
+    for i in range(1, factor):
+        rows += im[i::factor]
+    out = rows[:, 0::factor].copy()
+    for j in range(1, factor):
+        out += rows[:, j::factor]
+    # round to nearest
+    out += n // 2
+    out //= n
+    return out.astype(im.dtype, copy=False)
+
+
+def resize_nearest(im: np.ndarray, width: int, height: int) -> np.ndarray:
+    """
+    Nearest-neighbor resize sampling the input at the center of each output pixel.
+
+    :param im: array of shape (H, W) or (H, W, C)
+    :param width: width of the output image
+    :param height: height of the output image
+    :return: array of shape (height, width[, C]) with the same dtype as the input
+    """
+    if width <= 0 or height <= 0:
+        raise ValueError(f"Output size must be positive, got {width}x{height}.")
+    h, w = im.shape[:2]
+    rows = ((np.arange(height) * 2 + 1) * h) // (2 * height)
+    cols = ((np.arange(width) * 2 + 1) * w) // (2 * width)
+    return im.take(rows, axis=0).take(cols, axis=1)
+
+
+__all__ = [
+    "box_downsample",
+    "resize_nearest",
+]
@@ -0,0 +1,187 @@
+import dataclasses
+import itertools
+import time
+from threading import Lock
+from typing import Callable, Dict, Generic, List, Optional, Tuple, TypeVar, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+M = TypeVar("M", bound="BaseMessage")
+
+
+@dataclasses.dataclass
+class MailboxStats:
+    # number of messages put / read (with `take`)
+    puts: int = 0
+    takes: int = 0
+    # number of messages replaced by a newer one before being read
+    overwritten: int = 0
+
+
+class Mailbox(Generic[M]):
+    """
+    Holds the latest message of a source: putting a message replaces the previous one instead of queueing
+    it, so a slow consumer always acts on the most recent command and never on a backlog.
+
+    The slot is a single (sequence number, message, arrival time) tuple swapped atomically, so neither
+    writers nor the reader need locks. Meant for a single reader (see `take`).
+    """
+
+    __slots__ = ("name", "stats", "_clock", "_seq", "_slot", "_taken")
+
+    def __init__(self, name: Optional[str] = None, clock: Callable[[], float] = time.time):
+        self.name: Optional[str] = name
+        self.stats: MailboxStats = MailboxStats()
+        self._clock: Callable[[], float] = clock
+        self._seq = itertools.count(1)
+        self._slot: Optional[Tuple[int, M, float]] = None
+        # sequence number of the last message taken
+        self._taken: int = 0
+
+    def put(self, msg: M):
+        previous = self._slot
+        self._slot = (next(self._seq), msg, self._clock())
+        self.stats.puts += 1
+        if previous is not None and previous[0] > self._taken:
+            self.stats.overwritten += 1
+
+    def peek(self) -> Optional[M]:
+        """The latest message, None if nothing was put yet."""
+        slot = self._slot
+        return None if slot is None else slot[1]
+
+    def take(self) -> Optional[M]:
+        """The latest message if it was not taken already, None otherwise."""
+        slot = self._slot
+        if slot is None or slot[0] == self._taken:
+            return None
+        self._taken = slot[0]
+        self.stats.takes += 1
+        return slot[1]
+
+    @property
+    def arrival(self) -> Optional[float]:
+        """Time at which the latest message was put."""
+        slot = self._slot
+        return None if slot is None else slot[2]
+
+    def clear(self):
+        self._slot = None
+
+
+@dataclasses.dataclass
+class MuxStats:
+    # number of commands received
+    received: int = 0
+    # number of commands dropped because they were already expired / older than the last one of their source
+    expired: int = 0
+    out_of_order: int = 0
+    # number of times the selected source changed, as seen by the reader
+    switches: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class _Source:
+    name: str
+    priority: int
+    timeout: float
+
+
+class PriorityMux(Generic[M]):
+    """
+    Selects the command to act on among several sources (e.g., safety, joystick, autopilot), each with a
+    priority, a timeout and a `Mailbox` holding its latest command. The winner is the latest command of the
+    highest priority source whose command is still fresh, that is, no older than the timeout of the source
+    according to ``header.timestamp`` (or the arrival time, for commands without a header or a timestamp,
+    e.g., `DroneControl`). When a source stops publishing, control falls back to the next one as soon as
+    its last command expires.
+
+    Every `put` publishes an immutable snapshot of the candidates sorted by priority, with their expiry
+    times, so `current` reads it without locks and returns on the first (almost always the only) candidate
+    it checks. Times are read from ``clock``, which must share the time base of the header timestamps.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.stats: MuxStats = MuxStats()
+        self.mailboxes: Dict[str, Mailbox[M]] = {}
+        self._clock: Callable[[], float] = clock
+        self._sources: Dict[str, _Source] = {}
+        # expiry time of the latest command of every source
+        self._expiry: Dict[str, float] = {}
+        # (expiry time, source, command) sorted by decreasing priority
+        self._snapshot: Tuple[Tuple[float, str, M], ...] = ()
+        self._selected: Optional[str] = None
+        self._lock: Lock = Lock()
+
+    def add_source(self, name: str, priority: int, timeout: float):
+        """Declares a source, the commands of higher priority sources win."""
+        if name in self._sources:
+            raise ValueError(f"Source '{name}' already declared")
+        if timeout <= 0:
+            raise ValueError(f"The timeout must be positive, got {timeout}")
+        if any(s.priority == priority for s in self._sources.values()):
+            raise ValueError(f"Another source already has priority {priority}")
+        self._sources[name] = _Source(name, priority, timeout)
+        self.mailboxes[name] = Mailbox(name, self._clock)
+
+    def put(self, source: str, msg: M) -> bool:
+        """Sets the latest command of a source, returns False if it was dropped (expired or out of order)."""
+        info: _Source = self._sources[source]
+        self.stats.received += 1
+        header = getattr(msg, "header", None)
+        t: Optional[float] = None if header is None else header.timestamp
+        with self._lock:
+            expiry: float = (self._clock() if t is None else t) + info.timeout
+            if expiry < self._expiry.get(source, -float("inf")):
+                self.stats.out_of_order += 1
+                return False
+            if expiry <= self._clock():
+                self.stats.expired += 1
+                return False
+            self.mailboxes[source].put(msg)
+            self._expiry[source] = expiry
+            self._publish()
+        return True
+
+    def _publish(self):
+        order: List[str] = sorted(self._expiry, key=lambda s: -self._sources[s].priority)
+        self._snapshot = tuple((self._expiry[s], s, self.mailboxes[s].peek()) for s in order)
+
+    def select(self) -> Optional[Tuple[str, M]]:
+        """The winning (source, command), None if no source has a fresh command."""
+        now: float = self._clock()
+        for expiry, source, msg in self._snapshot:
+            if now < expiry:
+                if source != self._selected:
+                    self._selected = source
+                    self.stats.switches += 1
+                return source, msg
+        self._selected = None
+        return None
+
+    def current(self, default: Optional[M] = None) -> Optional[M]:
+        """The winning command, ``default`` (e.g., a stop command) if no source has a fresh one."""
+        selected = self.select()
+        return default if selected is None else selected[1]
+
+    @property
+    def selected(self) -> Optional[str]:
+        """Source of the command returned by the last `select`/`current`."""
+        return self._selected
+
+    def clear(self, source: Optional[str] = None):
+        """Forgets the commands of the given source, or of all of them."""
+        with self._lock:
+            for name in ([source] if source is not None else list(self._expiry)):
+                self._expiry.pop(name, None)
+                self.mailboxes[name].clear()
+            self._publish()
+
+
+__all__ = [
+    "Mailbox",
+    "MailboxStats",
+    "MuxStats",
+    "PriorityMux",
+]
@@ -0,0 +1,201 @@
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+# upper bounds (in seconds) of the latency histogram buckets, the last bucket (+Inf) is implicit
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 1e-1, 5e-1, 1.0
+)
+_LATENCY_BUCKETS_NS: Tuple[int, ...] = tuple(int(b * 1e9) for b in LATENCY_BUCKETS)
+
+PreHook = Callable[[str, str], None]
+PostHook = Callable[[str, str, int], None]
+
+
+class OperationStats:
+    """Counters and latency histogram of a single (message class, operation) pair."""
+
+    __slots__ = ("count", "failures", "total_ns", "buckets")
+
+    def __init__(self):
+        self.count: int = 0
+        self.failures: int = 0
+        self.total_ns: int = 0
+        # one slot per bucket plus the +Inf bucket, non-cumulative
+        self.buckets: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe(self, duration_ns: int, failed: bool):
+        self.count += 1
+        self.total_ns += duration_ns
+        self.buckets[bisect_left(_LATENCY_BUCKETS_NS, duration_ns)] += 1
+        if failed:
+            self.failures += 1
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "total_seconds": self.total_ns * 1e-9,
+            "buckets": dict(zip(LATENCY_BUCKETS + (float("inf"),), self.buckets)),
+        }
+
+
+class ClassMetrics:
+    """All the metrics collected for a single message class (or JPEG engine)."""
+
+    __slots__ = ("operations", "bytes_in", "bytes_out", "validation_failures")
+
+    def __init__(self):
+        self.operations: Dict[str, OperationStats] = {}
+        self.bytes_in: int = 0
+        self.bytes_out: int = 0
+        self.validation_failures: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "operations": {op: stats.as_dict() for op, stats in self.operations.items()},
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "validation_failures": self.validation_failures,
+        }
+
+
+def _timed_init(self, /, **data):
+    name: str = type(self).__name__
+    t0: int = Metrics.start(name, "construct")
+    failed: bool = True
+    try:
+        BaseModel.__init__(self, **data)
+        failed = False
+    finally:
+        Metrics.stop(name, "construct", t0, failed=failed)
+
+
+class Metrics:
+    """
+    Process-wide serialization metrics.
+
+    Instrumented code checks ``Metrics.enabled`` before doing anything else, so the cost of the
+    instrumentation when metrics are disabled is a single attribute lookup. Constructor timing is
+    installed on ``BaseMessage`` only while metrics are enabled.
+    """
+
+    enabled: bool = False
+    _lock: Lock = Lock()
+    _classes: Dict[str, ClassMetrics] = {}
+    _pre_hooks: List[PreHook] = []
+    _post_hooks: List[PostHook] = []
+
+    @classmethod
+    def enable(cls):
+        from ..base import BaseMessage
+        BaseMessage.__init__ = _timed_init
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls):
+        from ..base import BaseMessage
+        cls.enabled = False
+        if "__init__" in BaseMessage.__dict__:
+            del BaseMessage.__init__
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._classes = {}
+
+    @classmethod
+    def add_hook(cls, pre: Optional[PreHook] = None, post: Optional[PostHook] = None):
+        """
+        Registers profiling hooks. ``pre(name, operation)`` is called right before an instrumented
+        operation starts, ``post(name, operation, duration_ns)`` right after it ends.
+        """
+        if pre is not None:
+            cls._pre_hooks.append(pre)
+        if post is not None:
+            cls._post_hooks.append(post)
+
+    @classmethod
+    def remove_hook(cls, pre: Optional[PreHook] = None, post: Optional[PostHook] = None):
+        if pre is not None and pre in cls._pre_hooks:
+            cls._pre_hooks.remove(pre)
+        if post is not None and post in cls._post_hooks:
+            cls._post_hooks.remove(post)
+
+    @classmethod
+    def start(cls, name: str, operation: str) -> int:
+        for hook in cls._pre_hooks:
+            hook(name, operation)
+        return time.perf_counter_ns()
+
+    @classmethod
+    def stop(cls, name: str, operation: str, t0: int, bytes_in: int = 0, bytes_out: int = 0,
+             failed: bool = False):
+        duration_ns: int = time.perf_counter_ns() - t0
+        with cls._lock:
+            metrics: Optional[ClassMetrics] = cls._classes.get(name)
+            if metrics is None:
+                metrics = cls._classes[name] = ClassMetrics()
+            stats: Optional[OperationStats] = metrics.operations.get(operation)
+            if stats is None:
+                stats = metrics.operations[operation] = OperationStats()
+            stats.observe(duration_ns, failed)
+            metrics.bytes_in += bytes_in
+            metrics.bytes_out += bytes_out
+            if failed and operation == "validate":
+                metrics.validation_failures += 1
+        for hook in cls._post_hooks:
+            hook(name, operation, duration_ns)
+
+    @classmethod
+    def snapshot(cls) -> Dict[str, dict]:
+        with cls._lock:
+            return {name: metrics.as_dict() for name, metrics in cls._classes.items()}
+
+    @classmethod
+    def to_prometheus(cls, prefix: str = "duckietown_messages") -> str:
+        """Dumps the current metrics in the Prometheus text exposition format."""
+        snapshot: Dict[str, dict] = cls.snapshot()
+        lines: List[str] = [
+            f"# HELP {prefix}_operation_seconds Latency of serialization operations",
+            f"# TYPE {prefix}_operation_seconds histogram",
+        ]
+        for name, metrics in snapshot.items():
+            for operation, stats in metrics["operations"].items():
+                labels: str = f'message="{name}",operation="{operation}"'
+                cumulative: int = 0
+                for bound, count in stats["buckets"].items():
+                    cumulative += count
+                    le: str = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{prefix}_operation_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f"{prefix}_operation_seconds_sum{{{labels}}} {stats['total_seconds']!r}")
+                lines.append(f"{prefix}_operation_seconds_count{{{labels}}} {stats['count']}")
+        lines += [
+            f"# HELP {prefix}_operation_failures_total Number of failed serialization operations",
+            f"# TYPE {prefix}_operation_failures_total counter",
+        ]
+        for name, metrics in snapshot.items():
+            for operation, stats in metrics["operations"].items():
+                lines.append(f'{prefix}_operation_failures_total{{message="{name}",operation="{operation}"}} '
+                             f'{stats["failures"]}')
+        for key, help_txt in [
+            ("bytes_in", "Number of bytes decoded"),
+            ("bytes_out", "Number of bytes encoded"),
+            ("validation_failures", "Number of payloads that failed validation"),
+        ]:
+            lines += [
+                f"# HELP {prefix}_{key}_total {help_txt}",
+                f"# TYPE {prefix}_{key}_total counter",
+            ]
+            for name, metrics in snapshot.items():
+                lines.append(f'{prefix}_{key}_total{{message="{name}"}} {metrics[key]}')
+        return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "Metrics",
+    "LATENCY_BUCKETS",
+]
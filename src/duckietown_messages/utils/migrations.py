@@ -0,0 +1,194 @@
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Tuple, Type, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+# an upgrade function takes the native (decoded, not validated) message at a version and returns it at the
+# next version, it is free to modify its input
+Upgrade = Callable[[dict], dict]
+
+# version of payloads without a header or a version (the default of `Header.version`)
+DEFAULT_VERSION: str = "1.0"
+
+_MISSING = object()
+
+
+def _compose(steps: List[Upgrade], target: str) -> Upgrade:
+    # a single function applying all the steps of a chain, then stamping the version reached
+    def transform(native: dict) -> dict:
+        for step in steps:
+            native = step(native)
+        header = native.get("header")
+        if isinstance(header, dict):
+            header["version"] = target
+        else:
+            native["header"] = {"version": target}
+        return native
+
+    return transform
+
+
+class Migrations:
+    """
+    Registry of the upgrade functions of message classes, keyed on the version in their header.
+
+    Every class declares the functions upgrading its payloads from a version to the next one, the current
+    version of the class being the last of the chain. When a payload is decoded, the chain from the version
+    it was sent with to the current version is looked up once per (class, version), composed into a single
+    transform that is cached, and applied before validation.
+
+    Decoders check ``Migrations.enabled`` (set as soon as a migration is registered) and then the per-class
+    table, so classes without migrations and payloads already at the current version pay (almost) nothing.
+    Encoders write the current version in the header (see `stamp`). This holds for every serialization
+    format able to parse a payload without validating it (see `SerializerAbs.load_native`), the others
+    (e.g., "struct") refuse the classes with migrations.
+    """
+
+    enabled: bool = False
+
+    # class -> source version -> (target version, upgrade function)
+    _upgrades: Dict[type, Dict[str, Tuple[str, Upgrade]]] = {}
+    # class -> source version -> composed transform (None for the current version)
+    _chains: Dict[type, Dict[str, Optional[Upgrade]]] = {}
+    # class -> current version (computed on first use), written in the header of the payloads encoded
+    _versions: Dict[type, Optional[str]] = {}
+    _lock: Lock = Lock()
+
+    @classmethod
+    def register(cls, msg_cls: Type["BaseMessage"], source: str, target: str, upgrade: Upgrade):
+        """Registers the function upgrading payloads of ``msg_cls`` from version ``source`` to ``target``."""
+        if source == target:
+            raise ValueError(f"An upgrade of {msg_cls.__name__} must change the version, "
+                             f"got {source} -> {target}")
+        with cls._lock:
+            upgrades = cls._upgrades.setdefault(msg_cls, {})
+            if source in upgrades:
+                raise ValueError(f"An upgrade of {msg_cls.__name__} from version {source} "
+                                 f"is already registered")
+            upgrades[source] = (target, upgrade)
+            # chains are composed again on demand, as is the current version
+            cls._chains[msg_cls] = {}
+            cls._versions.pop(msg_cls, None)
+            cls.enabled = True
+
+    @classmethod
+    def unregister(cls, msg_cls: Type["BaseMessage"]):
+        """Removes all the upgrades of the given class."""
+        with cls._lock:
+            cls._upgrades.pop(msg_cls, None)
+            cls._chains.pop(msg_cls, None)
+            cls._versions.pop(msg_cls, None)
+            cls.enabled = bool(cls._upgrades)
+
+    @classmethod
+    def registered(cls, msg_cls: Type["BaseMessage"]) -> bool:
+        """Whether the given class has migrations."""
+        return msg_cls in cls._chains
+
+    @classmethod
+    def current(cls, msg_cls: Type["BaseMessage"]) -> Optional[str]:
+        """
+        Current version of the given class, None if it has no migrations. Raises a ValueError if its upgrades
+        do not lead to a single version (e.g., two upgrades from different versions to different versions).
+        """
+        upgrades = cls._upgrades.get(msg_cls)
+        if not upgrades:
+            return None
+        targets = {target for target, _ in upgrades.values()}
+        ends = targets.difference(upgrades)
+        if len(ends) != 1:
+            raise ValueError(f"The upgrades of {msg_cls.__name__} do not lead to a single current version, "
+                             f"they end at {sorted(ends) or 'no version (cycle)'}")
+        return ends.pop()
+
+    @classmethod
+    def version(cls, msg_cls: Type["BaseMessage"]) -> Optional[str]:
+        """Same as `current`, cached."""
+        version = cls._versions.get(msg_cls, _MISSING)
+        if version is _MISSING:
+            version = cls._versions[msg_cls] = cls.current(msg_cls)
+        return version
+
+    @classmethod
+    def chain(cls, msg_cls: Type["BaseMessage"], version: str) -> Optional[Upgrade]:
+        """
+        Returns the (cached) transform upgrading payloads of the given class from ``version`` to the current
+        version, None if there is nothing to do.
+        """
+        chains = cls._chains.get(msg_cls)
+        if chains is None:
+            return None
+        transform = chains.get(version, _MISSING)
+        if transform is _MISSING:
+            transform = cls._build(msg_cls, version)
+            chains[version] = transform
+        return transform
+
+    @classmethod
+    def _build(cls, msg_cls: Type["BaseMessage"], version: str) -> Optional[Upgrade]:
+        upgrades = cls._upgrades.get(msg_cls, {})
+        steps: List[Upgrade] = []
+        seen = {version}
+        while version in upgrades:
+            version, upgrade = upgrades[version]
+            if version in seen:
+                raise ValueError(f"The upgrades of {msg_cls.__name__} form a cycle through version {version}")
+            seen.add(version)
+            steps.append(upgrade)
+        return _compose(steps, version) if steps else None
+
+    @classmethod
+    def upgrade(cls, msg_cls: Type["BaseMessage"], native: object) -> object:
+        """Upgrades a native (decoded, not validated) payload of the given class to the current version."""
+        chains = cls._chains.get(msg_cls)
+        if chains is None or not isinstance(native, dict):
+            return native
+        header = native.get("header")
+        version = header.get("version", DEFAULT_VERSION) if isinstance(header, dict) else DEFAULT_VERSION
+        transform = chains.get(version, _MISSING)
+        if transform is _MISSING:
+            transform = cls.chain(msg_cls, version)
+        return transform(native) if transform is not None else native
+
+    @classmethod
+    def stamp(cls, msg_cls: Type["BaseMessage"], native: object) -> object:
+        """
+        Writes the current version of the given class in the header of a dumped message, so that payloads
+        encoded by the current code are not upgraded again when decoded.
+        """
+        if msg_cls not in cls._chains:
+            return native
+        version: Optional[str] = cls.version(msg_cls)
+        if version is None or not isinstance(native, dict):
+            return native
+        header = native.get("header")
+        if isinstance(header, dict):
+            header["version"] = version
+        else:
+            native["header"] = {"version": version}
+        return native
+
+
+def migration(msg_cls: Type["BaseMessage"], source: str, target: str) -> Callable[[Upgrade], Upgrade]:
+    """
+    Decorator registering an upgrade function, e.g.,
+
+        @migration(Range, "1.0", "1.1")
+        def _range_1_1(native: dict) -> dict:
+            native["distance"] = native.pop("data")
+            return native
+    """
+    def decorator(upgrade: Upgrade) -> Upgrade:
+        Migrations.register(msg_cls, source, target, upgrade)
+        return upgrade
+
+    return decorator
+
+
+__all__ = [
+    "DEFAULT_VERSION",
+    "Migrations",
+    "Upgrade",
+    "migration",
+]
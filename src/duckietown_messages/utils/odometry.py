@@ -0,0 +1,149 @@
+import math
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from duckietown_messages.actuators.dc_motor import DCMotor
+from duckietown_messages.geometry_3d.transformation import Transformation
+from duckietown_messages.geometry_3d.twist import Twist
+from duckietown_messages.geometry_3d.vector import Vector3
+from duckietown_messages.sensors.wheel_encoder import WheelEncoder
+from duckietown_messages.standard.header import Header
+
+
+def ticks_per_revolution(encoder: WheelEncoder, motor: Optional[DCMotor] = None) -> float:
+    """
+    Number of encoder ticks per revolution of the wheel. When the motor is given, the encoder is assumed to
+    sit on the motor shaft, before the gearbox.
+    """
+    ticks: float = float(encoder.resolution) * (motor.gear_ratio if motor is not None else 1.0)
+    if ticks <= 0:
+        raise ValueError(f"Invalid number of ticks per wheel revolution ({ticks}) "
+                         f"for encoder '{encoder.name}'")
+    return ticks
+
+
+def align(t_left: np.ndarray, left: np.ndarray,
+          t_right: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aligns the tick streams of the two wheels, sampled at different times, on the union of their
+    timestamps (within the time span covered by both) by linear interpolation of the tick counts.
+    """
+    t_left, t_right = np.asarray(t_left, dtype=np.float64), np.asarray(t_right, dtype=np.float64)
+    t = np.union1d(t_left, t_right)
+    t = t[(t >= max(t_left[0], t_right[0])) & (t <= min(t_left[-1], t_right[-1]))]
+    return t, np.interp(t, t_left, left), np.interp(t, t_right, right)
+
+
+class WheelOdometry:
+    """
+    Dead reckoning of a differential-drive robot from the cumulative tick counts of its wheel encoders.
+
+    Batches of samples (timestamps and tick counts of both wheels at those timestamps, see `align` for
+    streams sampled at different times) are integrated with vectorized numpy using exact arc integration
+    (the robot moves along a circular arc between consecutive samples). The state carries over from one
+    batch to the next, so a recorded log can be re-integrated in a single call or streamed in batches
+    with the same result.
+
+    Poses are returned as (N, 7) arrays ``[x, y, z, qw, qx, qy, qz]`` (as in `Transformation.from_pq`) and
+    velocities as (N, 6) arrays ``[vx, vy, vz, wx, wy, wz]`` in the body frame.
+    """
+
+    def __init__(self, left: WheelEncoder, right: WheelEncoder, wheel_radius: float, baseline: float,
+                 left_motor: Optional[DCMotor] = None, right_motor: Optional[DCMotor] = None,
+                 frame: str = "odom", child_frame: str = "footprint"):
+        if wheel_radius <= 0 or baseline <= 0:
+            raise ValueError(f"Wheel radius and baseline must be positive, got {wheel_radius} and {baseline}")
+        # distance traveled by each wheel per tick (meters)
+        self.left_step: float = 2 * math.pi * wheel_radius / ticks_per_revolution(left, left_motor)
+        self.right_step: float = 2 * math.pi * wheel_radius / ticks_per_revolution(right, right_motor)
+        self.baseline: float = baseline
+        self.frame: str = frame
+        self.child_frame: str = child_frame
+        # (x, y, theta) of the robot and time and tick counts of the last sample
+        self._pose: Tuple[float, float, float] = (0.0, 0.0, 0.0)
+        self._last: Optional[Tuple[float, float, float]] = None
+
+    @property
+    def pose(self) -> Tuple[float, float, float]:
+        """Current (x, y, theta) of the robot."""
+        return self._pose
+
+    def reset(self, x: float = 0.0, y: float = 0.0, theta: float = 0.0):
+        """Moves the robot to the given pose, the next sample starts the integration over."""
+        self._pose = (x, y, theta)
+        self._last = None
+
+    def integrate(self, t: np.ndarray, left: np.ndarray, right: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Integrates a batch of N samples, returns the poses (N, 7) and the velocities (N, 6) of the robot at
+        the sample times. The very first sample only sets the reference tick counts.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        left = np.asarray(left, dtype=np.float64)
+        right = np.asarray(right, dtype=np.float64)
+        if not (t.shape == left.shape == right.shape) or t.ndim != 1:
+            raise ValueError(f"Expected three 1D arrays of the same length, got shapes "
+                             f"{t.shape}, {left.shape}, {right.shape}")
+        n: int = t.size
+        if n == 0:
+            return np.zeros((0, 7)), np.zeros((0, 6))
+        last = self._last if self._last is not None else (t[0], left[0], right[0])
+        # displacement of each wheel since the previous sample
+        dl = np.diff(left, prepend=last[1]) * self.left_step
+        dr = np.diff(right, prepend=last[2]) * self.right_step
+        dt = np.diff(t, prepend=last[0])
+        ds = (dl + dr) / 2
+        dtheta = (dr - dl) / self.baseline
+        x0, y0, theta0 = self._pose
+        theta = theta0 + np.cumsum(dtheta)
+        # exact arc: chord of length ds * sin(dtheta / 2) / (dtheta / 2) along the mean heading of the step
+        half = dtheta * 0.5
+        chord = ds * np.divide(np.sin(half), half, out=np.ones(n), where=half != 0)
+        heading = theta - half
+        x = x0 + np.cumsum(chord * np.cos(heading))
+        y = y0 + np.cumsum(chord * np.sin(heading))
+        poses = np.zeros((n, 7))
+        poses[:, 0], poses[:, 1] = x, y
+        qw, qz = np.cos(theta * 0.5), np.sin(theta * 0.5)
+        # q and -q are the same rotation, keep w non-negative
+        poses[:, 3] = np.abs(qw)
+        poses[:, 6] = np.where(qw < 0, -qz, qz)
+        velocities = np.zeros((n, 6))
+        moving = dt > 0
+        velocities[moving, 0] = ds[moving] / dt[moving]
+        velocities[moving, 5] = dtheta[moving] / dt[moving]
+        self._pose = (float(x[-1]), float(y[-1]), math.remainder(float(theta[-1]), 2 * math.pi))
+        self._last = (float(t[-1]), float(left[-1]), float(right[-1]))
+        return poses, velocities
+
+    def update(self, t: float, left: int, right: int) -> Tuple[Transformation, Twist]:
+        """Integrates a single sample, returns the pose and velocity of the robot as messages."""
+        poses, velocities = self.integrate(np.array([t]), np.array([left]), np.array([right]))
+        return self.transformations(np.array([t]), poses)[0], self.twists(np.array([t]), velocities)[0]
+
+    def transformations(self, t: np.ndarray, poses: np.ndarray) -> List[Transformation]:
+        """Converts an (N, 7) array of poses into `Transformation` messages from `frame` to `child_frame`."""
+        return [
+            Transformation.from_pq(pq, source=self.frame, target=self.child_frame,
+                                   header=Header(frame=self.frame, timestamp=float(ti)))
+            for ti, pq in zip(t, poses)
+        ]
+
+    def twists(self, t: np.ndarray, velocities: np.ndarray) -> List[Twist]:
+        """Converts an (N, 6) array of velocities into `Twist` messages in `child_frame`."""
+        return [
+            Twist(
+                header=Header(frame=self.child_frame, timestamp=float(ti)),
+                linear_velocity=Vector3.from_p(v[:3]),
+                angular_velocity=Vector3.from_p(v[3:]),
+            )
+            for ti, v in zip(t, velocities)
+        ]
+
+
+__all__ = [
+    "WheelOdometry",
+    "align",
+    "ticks_per_revolution",
+]
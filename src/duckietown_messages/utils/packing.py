@@ -0,0 +1,255 @@
+import enum
+import math
+import operator
+import struct
+import zlib
+from functools import lru_cache
+from typing import Any, Callable, Iterable, List, Tuple, Type, Union, TYPE_CHECKING
+
+import numpy as np
+from annotated_types import Ge, Gt, Le, Lt
+
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.exceptions import DataDecodingError
+from duckietown_messages.utils.migrations import Migrations
+from duckietown_messages.utils.serialization import SerializerAbs, Serializers
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+# version of the packed layout format, bump when the way layouts are derived from the fields changes
+PACKING_VERSION: int = 1
+
+MIME_STRUCT: str = "application/vnd.duckietown.struct"
+
+# little-endian prefix of every packed message: schema hash (uint32) and packing version (uint8)
+_PREFIX: str = "<IB"
+
+_CHECKS: List[Tuple[type, str, Callable[[Any, Any], bool]]] = [
+    (Ge, "ge", operator.ge),
+    (Gt, "gt", operator.gt),
+    (Le, "le", operator.le),
+    (Lt, "lt", operator.lt),
+]
+
+
+class PackedLayout:
+    """
+    Fixed little-endian binary layout of a message class with only numeric fields, derived from its
+    pydantic fields: ``float`` -> float64, ``int`` -> int32, ``bool`` -> bool, ``IntEnum`` -> uint8.
+    The ``header`` (if any) is reduced to its timestamp (float64, NaN when missing), all other header
+    fields are restored to their defaults when unpacking.
+
+    Range constraints (``ge``, ``gt``, ``le``, ``lt``) declared on the fields are checked on unpack,
+    while the (expensive) pydantic validation is skipped.
+    """
+
+    def __init__(self, cls: Type["BaseMessage"]):
+        self.cls = cls
+        self.names: List[str] = []
+        self.kinds: List[Union[str, Type[enum.Enum]]] = []
+        fmts: List[str] = []
+        # (position in the unpacked tuple, field name, comparison, bound)
+        self.checks: List[Tuple[int, str, Callable[[Any, Any], bool], Any]] = []
+        for name, field in cls.model_fields.items():
+            annotation = field.annotation
+            if name == "header":
+                kind, fmt = "timestamp", "d"
+            elif isinstance(annotation, type) and issubclass(annotation, enum.IntEnum):
+                kind, fmt = annotation, "B"
+            elif annotation is bool:
+                kind, fmt = "bool", "?"
+            elif annotation is int:
+                kind, fmt = "int", "i"
+            elif annotation is float:
+                kind, fmt = "float", "d"
+            else:
+                raise TypeError(f"Field '{name}' of type {annotation!r} of message {cls.__name__} "
+                                f"cannot be packed into a fixed binary layout.")
+            for m in field.metadata:
+                for constraint, attr, op in _CHECKS:
+                    if isinstance(m, constraint):
+                        self.checks.append((len(self.names), name, op, getattr(m, attr)))
+            self.names.append(name)
+            self.kinds.append(kind)
+            fmts.append(fmt)
+        description: str = cls.__name__ + ";" + ";".join(f"{n}:{f}" for n, f in zip(self.names, fmts))
+        self.schema_hash: int = zlib.crc32(description.encode("utf-8"))
+        self.struct: struct.Struct = struct.Struct(_PREFIX + "".join(fmts))
+        self.dtype: np.dtype = np.dtype([(n, "<" + f if f != "?" else f) for n, f in zip(self.names, fmts)])
+        self._has_conversions: bool = any(k not in ("int", "float", "bool") for k in self.kinds)
+
+    @property
+    def size(self) -> int:
+        return self.struct.size
+
+    def pack(self, msg: "BaseMessage") -> bytes:
+        return self.struct.pack(self.schema_hash, PACKING_VERSION, *self._row(msg))
+
+    def unpack(self, data: bytes) -> "BaseMessage":
+        try:
+            values: tuple = self.struct.unpack(data)
+        except struct.error as e:
+            raise DataDecodingError(f"Error while unpacking {self.cls.__name__}: {e}", e)
+        if values[0] != self.schema_hash or values[1] != PACKING_VERSION:
+            raise DataDecodingError(f"Packed payload does not match the layout of {self.cls.__name__} "
+                                    f"(schema {values[0]:08x}/v{values[1]}, expected "
+                                    f"{self.schema_hash:08x}/v{PACKING_VERSION})")
+        values = values[2:]
+        for i, name, op, bound in self.checks:
+            if not op(values[i], bound):
+                raise DataDecodingError(f"Error while unpacking {self.cls.__name__}: field '{name}' "
+                                        f"must be {op.__name__} {bound}, got {values[i]}")
+        return self._construct(values)
+
+    def pack_many(self, msgs: Iterable["BaseMessage"]) -> np.ndarray:
+        return np.array([tuple(self._row(msg)) for msg in msgs], dtype=self.dtype)
+
+    def pack_many_bytes(self, msgs: Iterable["BaseMessage"]) -> bytes:
+        """Packs a batch into a buffer carrying the schema hash and packing version, see `unpack_many`."""
+        return struct.pack(_PREFIX, self.schema_hash, PACKING_VERSION) + self.pack_many(msgs).tobytes()
+
+    def unpack_many(self, arr: Union[np.ndarray, bytes]) -> List["BaseMessage"]:
+        """
+        Unpacks a batch, either an array returned by `pack_many` (whose dtype must match the layout) or a
+        buffer returned by `pack_many_bytes` (whose schema hash and packing version must match).
+        """
+        if isinstance(arr, np.ndarray):
+            if arr.dtype != self.dtype:
+                raise DataDecodingError(f"Packed array does not match the layout of {self.cls.__name__} "
+                                        f"(dtype {arr.dtype}, expected {self.dtype})")
+        else:
+            arr = self._from_buffer(arr)
+        for _, name, op, bound in self.checks:
+            bad = np.flatnonzero(~op(arr[name], bound))
+            if bad.size:
+                raise DataDecodingError(f"Error while unpacking {self.cls.__name__}: field '{name}' "
+                                        f"must be {op.__name__} {bound} at indices {bad.tolist()}")
+        return [self._construct(values) for values in arr.tolist()]
+
+    def _from_buffer(self, data: bytes) -> np.ndarray:
+        prefix: int = struct.calcsize(_PREFIX)
+        if len(data) < prefix or (len(data) - prefix) % self.dtype.itemsize:
+            raise DataDecodingError(f"Packed batch of {len(data)}B does not match the layout of "
+                                    f"{self.cls.__name__} ({self.dtype.itemsize}B per message)")
+        schema, version = struct.unpack_from(_PREFIX, data)
+        if schema != self.schema_hash or version != PACKING_VERSION:
+            raise DataDecodingError(f"Packed batch does not match the layout of {self.cls.__name__} "
+                                    f"(schema {schema:08x}/v{version}, expected "
+                                    f"{self.schema_hash:08x}/v{PACKING_VERSION})")
+        return np.frombuffer(data, dtype=self.dtype, offset=prefix)
+
+    def _row(self, msg: "BaseMessage") -> list:
+        row: list = []
+        for name, kind in zip(self.names, self.kinds):
+            if kind == "timestamp":
+                timestamp = msg.header.timestamp
+                row.append(float("nan") if timestamp is None else timestamp)
+            else:
+                row.append(getattr(msg, name))
+        return row
+
+    def _construct(self, values: tuple) -> "BaseMessage":
+        if not self._has_conversions:
+            return _construct_unchecked(self.cls, dict(zip(self.names, values)))
+        fields: dict = {}
+        for name, kind, value in zip(self.names, self.kinds, values):
+            if kind == "timestamp":
+                # NaN means no timestamp
+                fields[name] = Header.get_default() if math.isnan(value) else \
+                    _construct_unchecked(Header, {**Header.get_default().__dict__, "timestamp": value})
+            elif isinstance(kind, type):
+                try:
+                    fields[name] = kind(value)
+                except ValueError as e:
+                    raise DataDecodingError(f"Error while unpacking {self.cls.__name__}: {e}", e)
+            else:
+                fields[name] = value
+        return _construct_unchecked(self.cls, fields)
+
+
+def _construct_unchecked(cls: Type["BaseMessage"], fields: dict) -> "BaseMessage":
+    # same as `cls.model_construct(**fields)` for a complete set of fields, without the per-field overhead
+    msg = cls.__new__(cls)
+    object.__setattr__(msg, "__dict__", fields)
+    object.__setattr__(msg, "__pydantic_fields_set__", set(fields))
+    object.__setattr__(msg, "__pydantic_extra__", None)
+    object.__setattr__(msg, "__pydantic_private__", None)
+    return msg
+
+
+@lru_cache(maxsize=None)
+def packed_layout(cls: Type["BaseMessage"]) -> PackedLayout:
+    return PackedLayout(cls)
+
+
+class Packable:
+    """
+    Mixin for fixed-shape numeric messages adding a compact binary representation (see `PackedLayout`).
+    """
+
+    def pack(self) -> bytes:
+        return packed_layout(type(self)).pack(self)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "BaseMessage":
+        return packed_layout(cls).unpack(data)
+
+    @classmethod
+    def pack_many(cls, msgs: Iterable["BaseMessage"]) -> np.ndarray:
+        return packed_layout(cls).pack_many(msgs)
+
+    @classmethod
+    def pack_many_bytes(cls, msgs: Iterable["BaseMessage"]) -> bytes:
+        return packed_layout(cls).pack_many_bytes(msgs)
+
+    @classmethod
+    def unpack_many(cls, arr: Union[np.ndarray, bytes]) -> List["BaseMessage"]:
+        return packed_layout(cls).unpack_many(arr)
+
+
+def _packable(cls: Type["BaseMessage"]) -> bool:
+    return isinstance(cls, type) and issubclass(cls, Packable)
+
+
+class StructSerializer(SerializerAbs):
+    """
+    Packed binary layout of the messages mixing in `Packable`, other classes are refused even if their
+    fields could be packed: their layout is not part of their contract.
+    """
+
+    @property
+    def name(self) -> str:
+        return "struct"
+
+    @property
+    def content_type(self) -> str:
+        return MIME_STRUCT
+
+    def dump(self, msg: "BaseMessage") -> bytes:
+        if not _packable(type(msg)):
+            raise TypeError(f"Message {type(msg).__name__} is not Packable, "
+                            f"it cannot be serialized in the 'struct' format")
+        if Migrations.enabled and Migrations.registered(type(msg)):
+            # packed layouts do not carry the version of the header, payloads could not be upgraded
+            raise TypeError(f"Message {type(msg).__name__} has migrations, "
+                            f"it cannot be serialized in the 'struct' format")
+        return packed_layout(type(msg)).pack(msg)
+
+    def load(self, cls: Type["BaseMessage"], data: bytes) -> "BaseMessage":
+        if not _packable(cls):
+            raise DataDecodingError(f"Message {cls.__name__} is not Packable, "
+                                    f"it cannot be decoded from the 'struct' format")
+        return packed_layout(cls).unpack(data)
+
+
+Serializers.register(StructSerializer, "struct", MIME_STRUCT)
+
+
+__all__ = [
+    "Packable",
+    "PackedLayout",
+    "packed_layout",
+    "PACKING_VERSION",
+    "MIME_STRUCT",
+]
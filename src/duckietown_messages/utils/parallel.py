@@ -0,0 +1,121 @@
+import itertools
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Deque, Iterable, Iterator, List, Optional, Tuple, Type, Union, TYPE_CHECKING
+
+from dtps_http import RawData
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+# (message or decoding error, name of the shared memory block holding its `data`, size of `data`)
+_Decoded = Tuple[Union["BaseMessage", Exception, None], Optional[str], int]
+
+
+def _decode_chunk(cls: Type["BaseMessage"], chunk: List[RawData], allow_none: bool,
+                  shm_threshold: int) -> List[_Decoded]:
+    # runs in the worker processes
+    out: List[_Decoded] = []
+    for rd in chunk:
+        try:
+            msg = cls.from_rawdata(rd, allow_none=allow_none)
+        except Exception as e:
+            # the error is raised in the parent once the consumer reaches this message
+            out.append((e, None, 0))
+            break
+        data = getattr(msg, "data", None)
+        if not isinstance(data, bytes) or len(data) < shm_threshold:
+            out.append((msg, None, 0))
+            continue
+        # large binary payloads (e.g., Image.data) travel back through shared memory instead of a pipe
+        shm = SharedMemory(create=True, size=len(data))
+        shm.buf[:len(data)] = data
+        # ownership of the block moves to the parent process, which unlinks it
+        resource_tracker.unregister(shm._name, "shared_memory")
+        msg.data = b""
+        out.append((msg, shm.name, len(data)))
+        shm.close()
+    return out
+
+
+def _restore(decoded: _Decoded) -> "BaseMessage":
+    msg, shm_name, size = decoded
+    if isinstance(msg, Exception):
+        raise msg
+    if shm_name is None:
+        return msg
+    shm = SharedMemory(name=shm_name)
+    try:
+        msg.data = bytes(shm.buf[:size])
+    finally:
+        shm.close()
+        shm.unlink()
+    return msg
+
+
+def decode_parallel(cls: Type["BaseMessage"],
+                    payloads: Iterable[RawData],
+                    workers: Optional[int] = None,
+                    chunksize: int = 256,
+                    max_pending: Optional[int] = None,
+                    allow_none: bool = False,
+                    shm_threshold: int = 64 * 1024) -> Iterator["BaseMessage"]:
+    """
+    Decodes a stream of payloads into messages of type ``cls`` using a pool of worker processes.
+
+    Payloads are sent to the workers in chunks of ``chunksize``, and results are yielded in the same order
+    as the input. At most ``max_pending`` chunks (default: two per worker) are in flight at any time,
+    so the input is consumed only as fast as the results are. ``bytes`` payloads of at least
+    ``shm_threshold`` bytes stored in the ``data`` field of the decoded messages (e.g., ``Image``,
+    ``CompressedImage``) are returned through shared memory instead of being pickled.
+
+    Decoding errors are raised when the failing message is reached in the output stream.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for rd in payloads:
+            yield cls.from_rawdata(rd, allow_none=allow_none)
+        return
+    max_pending = max_pending or 2 * workers
+    payloads = iter(payloads)
+    pending: Deque[Future] = deque()
+    ready: Deque[_Decoded] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        try:
+            while True:
+                # keep the pool busy, but never more than `max_pending` chunks ahead of the consumer
+                while len(pending) < max_pending:
+                    chunk: List[RawData] = list(itertools.islice(payloads, chunksize))
+                    if not chunk:
+                        break
+                    pending.append(pool.submit(_decode_chunk, cls, chunk, allow_none, shm_threshold))
+                if not pending:
+                    return
+                ready.extend(pending.popleft().result())
+                while ready:
+                    yield _restore(ready.popleft())
+        finally:
+            # release the shared memory of results that will never be consumed
+            for future in pending:
+                if not future.cancel():
+                    try:
+                        ready.extend(future.result())
+                    except Exception:
+                        pass
+            for _, shm_name, _ in ready:
+                if shm_name is not None:
+                    _unlink(shm_name)
+
+
+def _unlink(shm_name: str):
+    shm = SharedMemory(name=shm_name)
+    shm.close()
+    shm.unlink()
+
+
+__all__ = [
+    "decode_parallel",
+]
@@ -0,0 +1,400 @@
+import asyncio
+import dataclasses
+import inspect
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Type, \
+    TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+    from ..standard.header import Header
+
+# what to do when a bounded queue is full:
+#   - "block": the producer waits for room (backpressure)
+#   - "drop_oldest": the oldest item is dropped to make room, for real-time topics where fresh data matters
+#   - "drop_newest": the new item is dropped
+Policy = Literal["block", "drop_oldest", "drop_newest"]
+POLICIES: Tuple[str, ...] = ("block", "drop_oldest", "drop_newest")
+
+
+class QueueClosed(Exception):
+    """Raised by `BoundedQueue.get` once the queue is closed and drained, and by `put` on closed queues."""
+
+
+class BoundedQueue:
+    """Thread-safe FIFO queue with a maximum size and a policy for when it is full."""
+
+    def __init__(self, maxsize: int, policy: Policy = "block"):
+        if maxsize < 1:
+            raise ValueError(f"The size of the queue must be positive, got {maxsize}")
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}', expected one of {POLICIES}")
+        self.maxsize: int = maxsize
+        self.policy: Policy = policy
+        # number of items dropped because the queue was full
+        self.dropped: int = 0
+        self.closed: bool = False
+        self._items: Deque[Any] = deque()
+        self._cond: threading.Condition = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """
+        Adds an item to the queue, returns False if the item was dropped. Raises `queue.Full` if the queue is
+        still full after ``timeout`` seconds with the "block" policy.
+        """
+        with self._cond:
+            if self.closed:
+                raise QueueClosed("Cannot put items in a closed queue")
+            if len(self._items) >= self.maxsize:
+                if self.policy == "drop_newest":
+                    self.dropped += 1
+                    return False
+                if self.policy == "drop_oldest":
+                    self._items.popleft()
+                    self.dropped += 1
+                elif not self._cond.wait_for(lambda: len(self._items) < self.maxsize or self.closed, timeout):
+                    raise queue.Full()
+                elif self.closed:
+                    raise QueueClosed("Cannot put items in a closed queue")
+            self._items.append(item)
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """
+        Removes and returns the oldest item. Raises `queue.Empty` if no item arrives within ``timeout``
+        seconds and `QueueClosed` if the queue is closed and there are no items left.
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self.closed, timeout):
+                raise queue.Empty()
+            if not self._items:
+                raise QueueClosed()
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self, discard: bool = False):
+        """
+        No more items can be added, consumers get the remaining ones (none if ``discard`` is set) and then
+        `QueueClosed`.
+        """
+        with self._cond:
+            self.closed = True
+            if discard:
+                self._items.clear()
+            self._cond.notify_all()
+
+
+@dataclasses.dataclass
+class StageStats:
+    # number of items taken from the input queue / produced / dropped by the input queue / that failed
+    processed: int = 0
+    emitted: int = 0
+    dropped: int = 0
+    errors: int = 0
+    # time spent processing items, summed over the workers
+    busy_seconds: float = 0.0
+    # time between an item entering the input queue and its outputs being produced (queueing included)
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    # time of the first and the last processed item (monotonic clock)
+    first: Optional[float] = None
+    last: Optional[float] = None
+
+    @property
+    def latency_mean(self) -> float:
+        return self.latency_total / self.processed if self.processed else 0.0
+
+    @property
+    def throughput(self) -> float:
+        """Processed items per second, between the first and the last item."""
+        if self.first is None or self.last is None or self.last <= self.first:
+            return 0.0
+        return self.processed / (self.last - self.first)
+
+
+_local = threading.local()
+
+
+def _apply(fn: Callable, item: Any) -> List[Any]:
+    # calls a stage function and collects its outputs, generators may produce any number of outputs,
+    # coroutines are run on an event loop owned by the calling thread, None outputs are filtered out
+    out = fn(item)
+    if inspect.iscoroutine(out):
+        loop = getattr(_local, "loop", None)
+        if loop is None:
+            loop = _local.loop = asyncio.new_event_loop()
+        out = loop.run_until_complete(out)
+    if inspect.isgenerator(out):
+        return [o for o in out if o is not None]
+    return [] if out is None else [out]
+
+
+class Stage:
+    """
+    A step of a `Pipeline`, running ``fn`` on every item of its input queue with ``workers`` threads, or
+    processes if ``processes`` is set (``fn`` and the items must then be picklable).
+
+    ``fn`` returns the output for an item, None to filter the item out, or is a generator (or async
+    function) producing any number of outputs. With more than one worker, outputs may be reordered.
+    Items whose processing raises are counted in the stats and passed to ``on_error``, if given.
+    """
+
+    def __init__(self, fn: Callable[[Any], Any], name: Optional[str] = None, workers: int = 1,
+                 processes: bool = False, queue_size: Optional[int] = None, policy: Optional[Policy] = None,
+                 on_error: Optional[Callable[[Any, Exception], None]] = None):
+        if workers < 1:
+            raise ValueError(f"A stage needs at least one worker, got {workers}")
+        self.fn: Callable[[Any], Any] = fn
+        self.name: str = name or getattr(fn, "__name__", "stage")
+        self.workers: int = workers
+        self.processes: bool = processes
+        self.queue_size: Optional[int] = queue_size
+        self.policy: Optional[Policy] = policy
+        self.on_error: Optional[Callable[[Any, Exception], None]] = on_error
+        self.stats: StageStats = StageStats()
+        self.input: Optional[BoundedQueue] = None
+        self.output: Optional[BoundedQueue] = None
+        self._threads: List[threading.Thread] = []
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock: threading.Lock = threading.Lock()
+        self._running: int = 0
+
+    def start(self, input_queue: BoundedQueue, output_queue: BoundedQueue):
+        self.input, self.output = input_queue, output_queue
+        self.stats = StageStats()
+        if self.processes:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._running = self.workers
+        self._threads = [threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def join(self, timeout: Optional[float] = None):
+        for thread in self._threads:
+            thread.join(timeout)
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _work(self):
+        stats: StageStats = self.stats
+        try:
+            while True:
+                try:
+                    t_in, item = self.input.get()
+                except QueueClosed:
+                    break
+                t0: float = time.monotonic()
+                try:
+                    if self._pool is not None:
+                        outputs = self._pool.submit(_apply, self.fn, item).result()
+                    else:
+                        outputs = _apply(self.fn, item)
+                except Exception as e:
+                    outputs = []
+                    with self._lock:
+                        stats.errors += 1
+                    if self.on_error is not None:
+                        self.on_error(item, e)
+                t1: float = time.monotonic()
+                with self._lock:
+                    stats.processed += 1
+                    stats.emitted += len(outputs)
+                    stats.busy_seconds += t1 - t0
+                    stats.latency_total += t1 - t_in
+                    stats.latency_max = max(stats.latency_max, t1 - t_in)
+                    stats.first = t0 if stats.first is None else stats.first
+                    stats.last = t1
+                for out in outputs:
+                    try:
+                        self.output.put((t1, out))
+                    except QueueClosed:
+                        return
+        finally:
+            # the event loop of the worker (see `_apply`)
+            loop = getattr(_local, "loop", None)
+            if loop is not None:
+                loop.close()
+                _local.loop = None
+            with self._lock:
+                stats.dropped = self.input.dropped
+                self._running -= 1
+                last: bool = self._running == 0
+            # the last worker to leave closes the queue of the next stage
+            if last:
+                self.output.close()
+
+
+class Pipeline:
+    """
+    Chain of `Stage`s connected by bounded queues, e.g., decode -> process -> encode, each stage running
+    on its own workers.
+
+    Every stage reads from a queue of ``queue_size`` items (unless the stage sets its own) that applies
+    ``policy`` when full: "block" propagates backpressure to the producer, "drop_oldest" keeps real-time
+    topics fresh. The results are collected in a last queue, read through `results`.
+
+        with Pipeline([decode(Image), to_array(), Stage(detect, workers=2), encode()]) as pipeline:
+            for rd in pipeline.run(payloads):
+                ...
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 8, policy: Policy = "block",
+                 output_size: Optional[int] = None, output_policy: Policy = "block"):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages: List[Stage] = stages
+        self.queues: List[BoundedQueue] = [
+            BoundedQueue(stage.queue_size or queue_size, stage.policy or policy) for stage in stages
+        ]
+        self.queues.append(BoundedQueue(output_size or queue_size, output_policy))
+        self._started: bool = False
+
+    def start(self) -> 'Pipeline':
+        if not self._started:
+            for i, stage in enumerate(self.stages):
+                stage.start(self.queues[i], self.queues[i + 1])
+            self._started = True
+        return self
+
+    def put(self, item: Any, timeout: Optional[float] = None) -> bool:
+        """Feeds an item to the first stage, returns False if the item was dropped."""
+        return self.queues[0].put((time.monotonic(), item), timeout)
+
+    def close(self):
+        """Stops accepting items, the items already in the pipeline are still processed."""
+        self.queues[0].close()
+
+    def results(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Yields the outputs of the last stage until the pipeline is closed and drained."""
+        while True:
+            try:
+                _, out = self.queues[-1].get(timeout)
+            except QueueClosed:
+                return
+            yield out
+
+    def run(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Feeds all the items to the pipeline from a background thread and yields the outputs."""
+        self.start()
+
+        def feed():
+            try:
+                for item in items:
+                    self.put(item)
+            except QueueClosed:
+                pass
+            finally:
+                self.close()
+
+        feeder = threading.Thread(target=feed, name="pipeline-feeder", daemon=True)
+        feeder.start()
+        try:
+            yield from self.results()
+        finally:
+            # the consumer may stop early, the feeder and the workers blocked on full queues are released
+            # (the feeder once it gets its next item) and the items still in flight are discarded
+            self.stop()
+            feeder.join()
+            self.join()
+
+    def join(self, timeout: Optional[float] = None):
+        for stage in self.stages:
+            stage.join(timeout)
+
+    def stats(self) -> Dict[str, StageStats]:
+        for stage, q in zip(self.stages, self.queues):
+            stage.stats.dropped = q.dropped
+        return {stage.name: stage.stats for stage in self.stages}
+
+    def __enter__(self) -> 'Pipeline':
+        return self.start()
+
+    def stop(self):
+        """Closes all the queues, the items still in flight are discarded and blocked workers released."""
+        for q in self.queues:
+            q.close(discard=True)
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+        self.join()
+
+
+class _Decode:
+    # picklable stage functions, so that they can run in process workers
+
+    def __init__(self, cls: Type["BaseMessage"], allow_none: bool):
+        self.cls, self.allow_none = cls, allow_none
+
+    def __call__(self, rd):
+        return self.cls.from_rawdata(rd, allow_none=self.allow_none)
+
+
+class _Encode:
+
+    def __init__(self, format: Optional[str]):
+        self.format = format
+
+    def __call__(self, msg: "BaseMessage"):
+        return msg.to_rawdata(self.format)
+
+
+def _to_array(msg) -> Tuple["Header", np.ndarray]:
+    return msg.header, msg.as_array()
+
+
+class _Compress:
+
+    def __init__(self, quality: Optional[int]):
+        self.quality = quality
+
+    def __call__(self, frame: Tuple["Header", np.ndarray]):
+        from ..sensors.compressed_image import CompressedImage
+        header, im = frame
+        return CompressedImage.from_rgb(im, "jpeg", header, quality=self.quality)
+
+
+def decode(cls: Type["BaseMessage"], allow_none: bool = False, **kwargs) -> Stage:
+    """Stage decoding `RawData` payloads into messages of class ``cls``."""
+    return Stage(_Decode(cls, allow_none), name=kwargs.pop("name", f"decode:{cls.__name__}"), **kwargs)
+
+
+def encode(format: Optional[str] = None, **kwargs) -> Stage:
+    """Stage serializing messages into `RawData` payloads (see `BaseMessage.to_rawdata`)."""
+    return Stage(_Encode(format), name=kwargs.pop("name", "encode"), **kwargs)
+
+
+def to_array(**kwargs) -> Stage:
+    """Stage turning `Image` and `CompressedImage` messages into (header, numpy array) pairs."""
+    return Stage(_to_array, name=kwargs.pop("name", "to_array"), **kwargs)
+
+
+def compress(quality: Optional[int] = None, **kwargs) -> Stage:
+    """Stage compressing (header, RGB array) pairs into JPEG `CompressedImage` messages."""
+    return Stage(_Compress(quality), name=kwargs.pop("name", "compress"), **kwargs)
+
+
+__all__ = [
+    "BoundedQueue",
+    "Pipeline",
+    "Policy",
+    "QueueClosed",
+    "Stage",
+    "StageStats",
+    "compress",
+    "decode",
+    "encode",
+    "to_array",
+]
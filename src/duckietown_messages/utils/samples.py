@@ -0,0 +1,112 @@
+import enum
+import importlib
+import pkgutil
+import typing
+import warnings
+from typing import Any, Dict, List, Type, TYPE_CHECKING
+
+from annotated_types import Ge, Gt, Le, Lt, MinLen
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+
+def all_message_classes() -> List[Type["BaseMessage"]]:
+    """
+    Imports every module of the package and returns all the concrete message classes, sorted by name.
+    Modules that fail to import are skipped with a warning.
+    Unparametrized generic messages (e.g., ``Pair``) are excluded.
+    """
+    import duckietown_messages
+    from ..base import BaseMessage
+    for module in pkgutil.walk_packages(duckietown_messages.__path__, prefix="duckietown_messages."):
+        try:
+            importlib.import_module(module.name)
+        except Exception as e:
+            warnings.warn(f"Module '{module.name}' could not be imported: {e}")
+    classes: Dict[str, Type[BaseMessage]] = {}
+    queue: List[type] = [BaseMessage]
+    while queue:
+        cls = queue.pop()
+        for sub in cls.__subclasses__():
+            queue.append(sub)
+            if sub.__pydantic_generic_metadata__["parameters"] or sub.__pydantic_generic_metadata__["origin"]:
+                continue
+            if not sub.__module__.startswith("duckietown_messages."):
+                continue
+            classes[f"{sub.__module__}.{sub.__qualname__}"] = sub
+    return [classes[k] for k in sorted(classes)]
+
+
+def sample(cls: Type["BaseMessage"]) -> "BaseMessage":
+    """
+    Builds a valid instance of the given message class with every field (including optional ones)
+    populated with a placeholder value satisfying the field constraints. Headers and strings with a
+    default value keep their default.
+    """
+    values: Dict[str, Any] = {}
+    for name, field in cls.model_fields.items():
+        if name == "header":
+            continue
+        if field.annotation is str and isinstance(field.default, str):
+            # strings with a default (e.g., versions) may be constrained by a validator
+            continue
+        values[name] = _sample_value(field.annotation, field.metadata)
+    return cls(**values)
+
+
+def _bounds(metadata: list) -> typing.Tuple[float, float]:
+    lo, hi = -float("inf"), float("inf")
+    for m in metadata:
+        if isinstance(m, Ge):
+            lo = m.ge
+        elif isinstance(m, Gt):
+            lo = m.gt
+        elif isinstance(m, Le):
+            hi = m.le
+        elif isinstance(m, Lt):
+            hi = m.lt
+    return lo, hi
+
+
+def _sample_value(annotation: Any, metadata: list) -> Any:
+    from ..base import BaseMessage
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union:
+        return _sample_value(next(a for a in args if a is not type(None)), metadata)
+    if origin is typing.Literal:
+        return args[0]
+    if origin is tuple:
+        return tuple(_sample_value(a, []) for a in args)
+    if origin in (list, List):
+        n: int = next((m.min_length for m in metadata if isinstance(m, MinLen)), 3)
+        return [_sample_value(args[0] if args else float, []) for _ in range(n)]
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseMessage):
+            return sample(annotation)
+        if issubclass(annotation, enum.Enum):
+            return list(annotation)[-1]
+        if issubclass(annotation, bool):
+            return True
+        if issubclass(annotation, (int, float)):
+            lo, hi = _bounds(metadata)
+            value = min(max(1, lo), hi)
+            if lo > 0 and hi < float("inf"):
+                value = (lo + hi) / 2
+            return annotation(value)
+        if issubclass(annotation, str):
+            return "sample"
+        if issubclass(annotation, bytes):
+            return bytes(range(64))
+        if issubclass(annotation, dict):
+            return {"key": "value"}
+        if issubclass(annotation, list):
+            return [1.0, 2.0, 3.0]
+    raise TypeError(f"Cannot build a sample value for type {annotation!r}")
+
+
+__all__ = [
+    "all_message_classes",
+    "sample",
+]
@@ -0,0 +1,202 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Type, TYPE_CHECKING
+
+from dtps_http import RawData, MIME_CBOR, MIME_JSON
+
+from duckietown_messages.utils.migrations import Migrations
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+MIME_MSGPACK: str = "application/msgpack"
+
+
+class SerializerAbs(ABC):
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        pass
+
+    @property
+    @abstractmethod
+    def content_type(self) -> str:
+        pass
+
+    @abstractmethod
+    def dump(self, msg: "BaseMessage") -> bytes:
+        pass
+
+    @abstractmethod
+    def load(self, cls: Type["BaseMessage"], data: bytes) -> Optional["BaseMessage"]:
+        """Parses and validates a message of type `cls`, returns None if the payload is null."""
+        pass
+
+    def load_native(self, cls: Type["BaseMessage"], data: bytes) -> object:
+        """
+        Parses a payload into native objects without validating it, so that payloads of classes with
+        migrations can be upgraded before `validate` (see `Migrations`).
+        """
+        raise NotImplementedError(f"The '{self.name}' format does not support migrations")
+
+    def validate(self, cls: Type["BaseMessage"], native: object) -> "BaseMessage":
+        """Validates the native objects returned by `load_native`."""
+        return cls(**native)
+
+    def to_rawdata(self, msg: "BaseMessage") -> RawData:
+        return RawData(content=self.dump(msg), content_type=self.content_type)
+
+    @staticmethod
+    def native(msg: "BaseMessage") -> dict:
+        # the message as native objects, at the current version of its class (see `Migrations.stamp`)
+        native: dict = msg.model_dump()
+        if Migrations.enabled:
+            Migrations.stamp(type(msg), native)
+        return native
+
+
+class CBORSerializer(SerializerAbs):
+
+    @property
+    def name(self) -> str:
+        return "cbor"
+
+    @property
+    def content_type(self) -> str:
+        return MIME_CBOR
+
+    def dump(self, msg: "BaseMessage") -> bytes:
+        return self.to_rawdata(msg).content
+
+    def load(self, cls: Type["BaseMessage"], data: bytes) -> Optional["BaseMessage"]:
+        native: object = self.load_native(cls, data)
+        return None if native is None else cls(**native)
+
+    def load_native(self, cls: Type["BaseMessage"], data: bytes) -> object:
+        return RawData(content=data, content_type=MIME_CBOR).get_as_native_object()
+
+    def to_rawdata(self, msg: "BaseMessage") -> RawData:
+        return RawData.cbor_from_native_object(self.native(msg))
+
+
+class MsgpackSerializer(SerializerAbs):
+
+    def __init__(self):
+        import msgpack
+        self.msgpack = msgpack
+
+    @property
+    def name(self) -> str:
+        return "msgpack"
+
+    @property
+    def content_type(self) -> str:
+        return MIME_MSGPACK
+
+    def dump(self, msg: "BaseMessage") -> bytes:
+        return self.msgpack.packb(self.native(msg), use_bin_type=True)
+
+    def load(self, cls: Type["BaseMessage"], data: bytes) -> Optional["BaseMessage"]:
+        native: object = self.load_native(cls, data)
+        return None if native is None else cls(**native)
+
+    def load_native(self, cls: Type["BaseMessage"], data: bytes) -> object:
+        return self.msgpack.unpackb(data, raw=False)
+
+
+class JSONSerializer(SerializerAbs):
+    """
+    JSON through pydantic-core: messages are serialized and validated straight from/to JSON bytes,
+    without building an intermediate Python object. ``bytes`` fields are base64-encoded.
+    """
+
+    @property
+    def name(self) -> str:
+        return "json"
+
+    @property
+    def content_type(self) -> str:
+        return MIME_JSON
+
+    def dump(self, msg: "BaseMessage") -> bytes:
+        if Migrations.enabled and Migrations.registered(type(msg)):
+            # the version is written in the header of the dumped message, see `Migrations.stamp`
+            native: dict = Migrations.stamp(type(msg), msg.model_dump(mode="json"))
+            return json.dumps(native, separators=(",", ":")).encode("utf-8")
+        return msg.__pydantic_serializer__.to_json(msg)
+
+    def load(self, cls: Type["BaseMessage"], data: bytes) -> Optional["BaseMessage"]:
+        if data.strip() == b"null":
+            return None
+        return cls.model_validate_json(data)
+
+    def load_native(self, cls: Type["BaseMessage"], data: bytes) -> object:
+        return json.loads(data)
+
+    def validate(self, cls: Type["BaseMessage"], native: object) -> "BaseMessage":
+        # back to JSON, so that pydantic decodes the base64 strings of the `bytes` fields
+        return cls.model_validate_json(json.dumps(native))
+
+
+class Serializers:
+    __serializers: Dict[str, Type[SerializerAbs]] = {
+        "cbor": CBORSerializer,
+        "msgpack": MsgpackSerializer,
+        "json": JSONSerializer,
+    }
+    __content_types: Dict[str, str] = {
+        MIME_CBOR: "cbor",
+        MIME_MSGPACK: "msgpack",
+        "application/x-msgpack": "msgpack",
+        MIME_JSON: "json",
+    }
+    __instances: Dict[str, SerializerAbs] = {}
+
+    @classmethod
+    def register(cls, serializer: Type[SerializerAbs], name: str, *content_types: str):
+        cls.__serializers[name] = serializer
+        cls.__instances.pop(name, None)
+        for content_type in content_types:
+            cls.__content_types[content_type] = name
+
+    @classmethod
+    def get(cls, name: str) -> SerializerAbs:
+        serializer: Optional[SerializerAbs] = cls.__instances.get(name)
+        if serializer is None:
+            if name not in cls.__serializers:
+                raise ValueError(f"Unknown serialization format '{name}'. "
+                                 f"Known formats are {sorted(cls.__serializers)}.")
+            try:
+                serializer = cls.__instances[name] = cls.__serializers[name]()
+            except ImportError as e:
+                raise RuntimeError(f"Serialization format '{name}' not available: {e}")
+        return serializer
+
+    @classmethod
+    def for_content_type(cls, content_type: str) -> Optional[SerializerAbs]:
+        name: Optional[str] = cls.__content_types.get(content_type.split(";", 1)[0].strip())
+        return None if name is None else cls.get(name)
+
+    @classmethod
+    def names(cls) -> List[str]:
+        return list(cls.__serializers)
+
+    @classmethod
+    def available(cls) -> List[str]:
+        """Names of the formats whose backend can be loaded in this environment."""
+        available: List[str] = []
+        for name in cls.__serializers:
+            try:
+                cls.get(name)
+                available.append(name)
+            except RuntimeError:
+                pass
+        return available
+
+
+__all__ = [
+    "SerializerAbs",
+    "Serializers",
+    "MIME_MSGPACK",
+]
@@ -0,0 +1,166 @@
+import dataclasses
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from typing import Callable, Deque, Dict, List, Literal, Optional, Sequence, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+# what to do with messages without a header timestamp:
+#   - "drop": they are dropped (and counted)
+#   - "arrival": they are stamped with the time at which they are added (see `clock`)
+MissingPolicy = Literal["drop", "arrival"]
+
+
+@dataclasses.dataclass
+class SynchronizerStats:
+    # number of messages added / emitted as part of a matched tuple
+    received: int = 0
+    matched: int = 0
+    # number of tuples emitted
+    tuples: int = 0
+    # number of messages dropped because they can no longer be part of a match
+    stale: int = 0
+    # number of messages dropped because they arrived after newer messages of the same stream were used
+    late: int = 0
+    # number of messages dropped because they had no timestamp
+    missing: int = 0
+    # number of messages dropped because the queue of their stream was full
+    overflow: int = 0
+
+
+class _Stream:
+    # messages of a stream sorted by timestamp, with the timestamps kept apart for bisection
+
+    __slots__ = ("times", "msgs", "horizon")
+
+    def __init__(self):
+        self.times: Deque[float] = deque()
+        self.msgs: Deque["BaseMessage"] = deque()
+        # timestamp of the last message consumed (matched or dropped), older messages are late
+        self.horizon: float = -float("inf")
+
+    def insert(self, t: float, msg: "BaseMessage"):
+        if not self.times or t >= self.times[-1]:
+            self.times.append(t)
+            self.msgs.append(msg)
+            return
+        # out-of-order arrival
+        i: int = bisect_right(self.times, t)
+        self.times.insert(i, t)
+        self.msgs.insert(i, msg)
+
+    def pop(self) -> "BaseMessage":
+        self.horizon = self.times.popleft()
+        return self.msgs.popleft()
+
+
+class ApproximateTimeSynchronizer:
+    """
+    Groups messages of several streams whose ``header.timestamp`` values are within ``slop`` seconds of
+    each other, emitting one tuple (in stream order) per match, e.g., an image with the IMU, encoder and
+    range readings closest to it.
+
+    Each stream keeps a queue of at most ``queue_size`` messages sorted by timestamp (oldest dropped when
+    full), so messages may arrive out of order. Matches are searched around the pivot, the newest of the
+    oldest messages of each stream: every tuple must contain a message at least as recent as the pivot, so
+    older messages further than ``slop`` from it are stale and dropped. For every stream the message
+    closest to the pivot is picked by bisection, and the tuple is emitted once no closer message can arrive.
+    Messages older than a message already consumed from their stream are dropped as late.
+
+    The output only depends on the order in which messages are added, never on the wall clock (unless
+    ``missing="arrival"``).
+    """
+
+    def __init__(self, streams: Sequence[str], slop: float, queue_size: int = 64,
+                 missing: MissingPolicy = "drop", clock: Callable[[], float] = time.time):
+        if slop < 0:
+            raise ValueError(f"The slop must be non-negative, got {slop}")
+        if queue_size < 1:
+            raise ValueError(f"The size of the queues must be positive, got {queue_size}")
+        if missing not in ("drop", "arrival"):
+            raise ValueError(f"Unknown policy '{missing}' for messages without a timestamp")
+        self.names: List[str] = list(streams)
+        self.slop: float = slop
+        self.queue_size: int = queue_size
+        self.missing: MissingPolicy = missing
+        self.stats: SynchronizerStats = SynchronizerStats()
+        self._clock: Callable[[], float] = clock
+        self._index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self._streams: List[_Stream] = [_Stream() for _ in self.names]
+
+    def add(self, stream: str, msg: "BaseMessage") -> List[Tuple["BaseMessage", ...]]:
+        """Adds a message to the given stream, returns the tuples matched thanks to it (often none)."""
+        queue: _Stream = self._streams[self._index[stream]]
+        self.stats.received += 1
+        t: Optional[float] = msg.header.timestamp
+        if t is None:
+            if self.missing == "drop":
+                self.stats.missing += 1
+                return []
+            t = self._clock()
+        if t < queue.horizon:
+            self.stats.late += 1
+            return []
+        queue.insert(t, msg)
+        if len(queue.times) > self.queue_size:
+            queue.pop()
+            self.stats.overflow += 1
+        return self._match()
+
+    def _match(self) -> List[Tuple["BaseMessage", ...]]:
+        out: List[Tuple[BaseMessage, ...]] = []
+        streams: List[_Stream] = self._streams
+        slop: float = self.slop
+        while all(s.times for s in streams):
+            pivot: float = max(s.times[0] for s in streams)
+            # messages too old to be matched with the pivot (or anything newer) are stale
+            for s in streams:
+                while s.times and s.times[0] < pivot - slop:
+                    s.pop()
+                    self.stats.stale += 1
+            if not all(s.times for s in streams):
+                break
+            picks: List[int] = []
+            for s in streams:
+                i: int = bisect_left(s.times, pivot)
+                if i == len(s.times):
+                    # a closer message may still arrive
+                    return out
+                if i > 0 and pivot - s.times[i - 1] <= s.times[i] - pivot:
+                    i -= 1
+                picks.append(i)
+            chosen: List[float] = [s.times[i] for s, i in zip(streams, picks)]
+            if max(chosen) - min(chosen) > slop:
+                # the pivot cannot be matched, drop it
+                for s in streams:
+                    if s.times[0] == pivot:
+                        s.pop()
+                        self.stats.stale += 1
+                        break
+                continue
+            match: List[BaseMessage] = []
+            for s, i in zip(streams, picks):
+                for _ in range(i):
+                    s.pop()
+                    self.stats.stale += 1
+                match.append(s.pop())
+            self.stats.matched += len(match)
+            self.stats.tuples += 1
+            out.append(tuple(match))
+        return out
+
+    def pending(self) -> Dict[str, int]:
+        """Number of messages waiting in the queue of each stream."""
+        return {name: len(s.times) for name, s in zip(self.names, self._streams)}
+
+    def reset(self):
+        self._streams = [_Stream() for _ in self.names]
+
+
+__all__ = [
+    "ApproximateTimeSynchronizer",
+    "MissingPolicy",
+    "SynchronizerStats",
+]
@@ -0,0 +1,142 @@
+import random
+import time
+from threading import Lock
+from typing import Dict, List, Optional, Union, TYPE_CHECKING
+
+from duckietown_messages.utils.metrics import OperationStats
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+    from ..standard.header import Header
+    from ..standard.trace import TraceContext
+
+HeaderLike = Union["Header", "BaseMessage"]
+
+
+def _trace_of(obj: HeaderLike) -> Optional["TraceContext"]:
+    # `obj` is either a header or a message with a header
+    return getattr(getattr(obj, "header", obj), "trace", None)
+
+
+class Tracing:
+    """
+    End-to-end latency tracing through ``Header.trace``.
+
+    A trace is started on a source message (e.g., a camera frame) with `start`, carried over to the
+    messages derived from it with `propagate`, and stamped with (stage, monotonic ns) pairs along the way.
+    When tracing is enabled, `BaseMessage.from_rawdata` and `BaseMessage.to_rawdata` stamp traced
+    messages automatically with the stages ``decode:<class>`` and ``encode:<class>``.
+
+    Stamps use the monotonic clock, so they are comparable only among processes running on the same host.
+    All the functions are no-ops while tracing is disabled.
+    """
+
+    enabled: bool = False
+
+    @classmethod
+    def enable(cls):
+        cls.enabled = True
+
+    @classmethod
+    def disable(cls):
+        cls.enabled = False
+
+    @classmethod
+    def start(cls, header: Optional["Header"] = None, stage: str = "source") -> "Header":
+        """Returns a copy of ``header`` (or a new header) carrying a new trace stamped with ``stage``."""
+        from ..standard.header import Header
+        from ..standard.trace import TraceContext
+        header = header or Header.get_default()
+        if not cls.enabled:
+            return header
+        trace = TraceContext(id=random.getrandbits(63), stamps=[(stage, time.monotonic_ns())])
+        return header.model_copy(update={"trace": trace})
+
+    @classmethod
+    def stamp(cls, obj: HeaderLike, stage: str):
+        """
+        Appends a stamp to the trace of a header (or of the header of a message), if it has one.
+        Once the trace is full, the oldest stamps after the first one are dropped.
+        """
+        if not cls.enabled:
+            return
+        from ..standard.trace import MAX_TRACE_STAMPS
+        trace: Optional[TraceContext] = _trace_of(obj)
+        if trace is None:
+            return
+        stamps = trace.stamps
+        if len(stamps) >= MAX_TRACE_STAMPS:
+            del stamps[1]
+        stamps.append((stage, time.monotonic_ns()))
+
+    @classmethod
+    def propagate(cls, source: HeaderLike, header: Optional["Header"] = None) -> "Header":
+        """
+        Returns a copy of ``header`` (or a new header) carrying a copy of the trace of ``source``, so that
+        an output message can be built from an input message without sharing the stamps.
+        """
+        from ..standard.header import Header
+        from ..standard.trace import TraceContext
+        header = header or Header.get_default()
+        if not cls.enabled:
+            return header
+        trace: Optional[TraceContext] = _trace_of(source)
+        if trace is None:
+            return header
+        return header.model_copy(update={"trace": TraceContext(id=trace.id, stamps=list(trace.stamps))})
+
+
+class TraceAggregator:
+    """
+    Builds per-stage latency histograms out of the traces of the received messages.
+
+    For every observed trace, the time between consecutive stamps is recorded under the key
+    ``"<previous stage> -> <stage>"`` and the time between the first and the last stamp under
+    ``"<first stage> -> <last stage>"`` with the ``end-to-end`` prefix.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._segments: Dict[str, OperationStats] = {}
+
+    def observe(self, obj: HeaderLike, stage: Optional[str] = None):
+        """
+        Records the trace of a message. If ``stage`` is given, the message is stamped with it first
+        (e.g., ``"received"``).
+        """
+        trace: Optional[TraceContext] = _trace_of(obj)
+        if trace is None:
+            return
+        stamps: List[tuple] = list(trace.stamps)
+        if stage is not None:
+            stamps.append((stage, time.monotonic_ns()))
+        if len(stamps) < 2:
+            return
+        with self._lock:
+            for (stage0, t0), (stage1, t1) in zip(stamps[:-1], stamps[1:]):
+                self._record(f"{stage0} -> {stage1}", t1 - t0)
+            self._record(f"end-to-end {stamps[0][0]} -> {stamps[-1][0]}", stamps[-1][1] - stamps[0][1])
+
+    def _record(self, segment: str, duration_ns: int):
+        stats: Optional[OperationStats] = self._segments.get(segment)
+        if stats is None:
+            stats = self._segments[segment] = OperationStats()
+        stats.observe(max(duration_ns, 0), False)
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            out: Dict[str, dict] = {}
+            for segment, stats in self._segments.items():
+                out[segment] = stats.as_dict()
+                out[segment]["mean_seconds"] = stats.total_ns * 1e-9 / stats.count
+            return out
+
+    def reset(self):
+        with self._lock:
+            self._segments = {}
+
+
+__all__ = [
+    "Tracing",
+    "TraceAggregator",
+]
@@ -0,0 +1,45 @@
+import time
+import warnings
+from typing import Dict, Iterable, Optional, Type, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ..base import BaseMessage
+
+
+def is_built(cls: Type["BaseMessage"]) -> bool:
+    """Whether the validator and serializer of the given message class were already built."""
+    return bool(cls.__pydantic_complete__)
+
+
+def warmup(classes: Optional[Iterable[Type["BaseMessage"]]] = None,
+           sample: bool = True) -> Dict[Type["BaseMessage"], float]:
+    """
+    Message classes build their validators and serializers the first time they are used rather than at
+    import time, so that tools importing a few classes start fast. Long-running nodes call this function at
+    boot to pay that cost ahead of the first real message.
+
+    Builds the given message classes (all of them by default) and, if ``sample`` is set, runs an
+    encode/decode cycle of a sample instance of each, which also warms up the serialization code paths.
+    Returns the time (seconds) spent on each class. Classes that fail to warm up are skipped with a warning.
+    """
+    from .samples import all_message_classes, sample as sample_of
+    if classes is None:
+        classes = all_message_classes()
+    times: Dict[Type[BaseMessage], float] = {}
+    for cls in classes:
+        t0: float = time.perf_counter()
+        try:
+            cls.model_rebuild()
+            if sample:
+                cls.from_rawdata(sample_of(cls).to_rawdata())
+        except Exception as e:
+            warnings.warn(f"Message class '{cls.__name__}' could not be warmed up: {e}")
+            continue
+        times[cls] = time.perf_counter() - t0
+    return times
+
+
+__all__ = [
+    "is_built",
+    "warmup",
+]
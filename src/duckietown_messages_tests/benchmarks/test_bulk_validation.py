@@ -0,0 +1,48 @@
+# In this file we compare the validation of a batch of messages through a single TypeAdapter(List[cls])
+# call against the per-message `cls(**data)` loop.
+
+import timeit
+import unittest
+
+from duckietown_messages.geometry_3d.position import Position
+from duckietown_messages.geometry_3d.quaternion import Quaternion
+from duckietown_messages.geometry_3d.transformation import Transformation
+from duckietown_messages.sensors.angular_velocities import AngularVelocities
+from duckietown_messages.sensors.imu import Imu
+from duckietown_messages.sensors.linear_accelerations import LinearAccelerations
+from duckietown_messages.sensors.wheel_encoder import WheelEncoder
+
+
+class TestBulkValidationPerformance(unittest.TestCase):
+
+    def _benchmark(self, msg, batch=1000, n=10):
+        cls = type(msg)
+        data = [msg.model_dump() for _ in range(batch)]
+        t1 = timeit.timeit(lambda: [cls(**d) for d in data], number=n)
+        t2 = timeit.timeit(lambda: cls.model_validate_many(data), number=n)
+        self.assertEqual(cls.model_validate_many(data)[0], msg)
+        print(
+            f"Benchmark for message '{cls.__module__}.{cls.__name__}' (batch of {batch}):\n"
+            f"    t1  [loop]: {t1 / n * 1e3:.3f}ms\n"
+            f"    t2  [many]: {t2 / n * 1e3:.3f}ms\n"
+        )
+
+    def test_benchmark__imu(self):
+        self._benchmark(Imu(
+            orientation=Quaternion(w=1.0, x=0.0, y=0.0, z=0.0),
+            orientation_covariance=[0.0] * 9,
+            angular_velocity=AngularVelocities(x=0.1, y=0.2, z=0.3),
+            angular_velocity_covariance=[0.0] * 9,
+            linear_acceleration=LinearAccelerations(x=0.0, y=0.0, z=9.81),
+            linear_acceleration_covariance=[0.0] * 9,
+        ))
+
+    def test_benchmark__wheel_encoder(self):
+        self._benchmark(WheelEncoder(name="left_wheel_encoder", type="encoder", simulated=False, resolution=135))
+
+    def test_benchmark__transformation(self):
+        self._benchmark(Transformation(
+            source="world", target="base",
+            position=Position(x=1.0, y=2.0, z=3.0),
+            rotation=Quaternion(w=1.0, x=0.0, y=0.0, z=0.0),
+        ))
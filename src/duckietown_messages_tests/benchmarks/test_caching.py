@@ -0,0 +1,40 @@
+# In this file we compare decoding static descriptors through the content-addressed decode cache against
+# parsing and validating them every time.
+
+import timeit
+import unittest
+
+from duckietown_messages.calibrations.camera_intrinsic import CameraIntrinsicCalibration
+from duckietown_messages.sensors.camera import Camera
+from duckietown_messages.utils.caching import DECODE_CACHE
+
+
+class TestDecodeCachePerformance(unittest.TestCase):
+
+    def _benchmark(self, msg, n=5000):
+        cls = type(msg)
+        rd = msg.to_rawdata()
+        # noinspection PyProtectedMember
+        t1 = timeit.timeit(lambda: cls._from_rawdata(rd, False), number=n)
+        cls.from_rawdata(rd)
+        t2 = timeit.timeit(lambda: cls.from_rawdata(rd), number=n)
+        t3 = timeit.timeit(lambda: msg.content_hash(), number=n)
+        print(
+            f"Benchmark for message '{cls.__module__}.{cls.__name__}' ({len(rd.content)}B):\n"
+            f"    decode  [uncached]: {t1 / n * 1e6:.2f}us\n"
+            f"    decode    [cached]: {t2 / n * 1e6:.2f}us\n"
+            f"    content hash      : {t3 / n * 1e6:.2f}us\n"
+        )
+        DECODE_CACHE.clear()
+
+    def test_benchmark__camera(self):
+        self._benchmark(Camera(name="front_camera", type="camera", simulated=False, width=640, height=480,
+                               fov=2.0, description="Front camera", frame_id="camera_optical_frame"))
+
+    def test_benchmark__camera_intrinsic_calibration(self):
+        self._benchmark(CameraIntrinsicCalibration(
+            K=[320.0, 0.0, 320.0, 0.0, 320.0, 240.0, 0.0, 0.0, 1.0],
+            D=[-0.2, 0.03, 0.0, 0.0, 0.0],
+            P=[300.0, 0.0, 320.0, 0.0, 0.0, 300.0, 240.0, 0.0, 0.0, 0.0, 1.0, 0.0],
+            R=[1.0, 0.0, 0.0, 0.0, 1.0, 0.0, 0.0, 0.0, 1.0],
+        ))
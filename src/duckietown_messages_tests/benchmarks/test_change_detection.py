@@ -0,0 +1,34 @@
+# In this file we compare the cost of the change detector signature against encoding the frame as JPEG.
+
+import timeit
+import unittest
+
+import numpy as np
+
+from duckietown_messages.sensors.compressed_image import CompressedImage
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.image.change_detection import ChangeDetector
+from duckietown_messages.utils.image.jpeg import rgb_to_jpeg
+
+
+class TestChangeDetectionPerformance(unittest.TestCase):
+
+    def test_benchmark__signature(self):
+        y, x = np.mgrid[0:480, 0:640]
+        im = (128 + 60 * np.sin(x / 25.0) * np.cos(y / 30.0)).astype(np.uint8)[:, :, None].repeat(3, axis=2)
+        image = Image.from_rgb(im)
+        compressed = CompressedImage.from_rgb(im, "jpeg", Header.get_default())
+        detector = ChangeDetector()
+        n = 200
+        t1 = timeit.timeit(lambda: rgb_to_jpeg(im), number=n)
+        t2 = timeit.timeit(lambda: detector.signature(image), number=n)
+        t3 = timeit.timeit(lambda: detector.signature(compressed), number=n)
+        t4 = timeit.timeit(lambda: compressed.as_array(), number=n)
+        print(
+            f"Benchmark for change detection on a 640x480 RGB frame:\n"
+            f"    jpeg encode            : {t1 / n * 1e3:.3f}ms\n"
+            f"    signature [Image]      : {t2 / n * 1e3:.3f}ms\n"
+            f"    jpeg decode            : {t4 / n * 1e3:.3f}ms\n"
+            f"    signature [Compressed] : {t3 / n * 1e3:.3f}ms\n"
+        )
@@ -0,0 +1,46 @@
+# In this file we compare sending a 1280x720 RGB image as a single message against sending it in chunks:
+# total time to rebuild the frame, and time until the first rows are available to the receiver.
+
+import timeit
+import unittest
+
+import numpy as np
+
+from duckietown_messages.sensors.chunked_image import ChunkedImage
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.sensors.image_chunk import ImageChunk
+from duckietown_messages.utils.image.chunking import ImageReassembler, split
+
+
+class TestChunkingPerformance(unittest.TestCase):
+
+    def test_benchmark__hd_frame(self, n=20):
+        image = Image.from_rgb(np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8))
+        whole = image.to_rawdata()
+        info, chunks = split(image)
+        payloads = [info.to_rawdata()] + [c.to_rawdata() for c in chunks]
+
+        def single():
+            return Image.from_rawdata(whole).as_rgb()
+
+        def chunked():
+            reassembler = ImageReassembler()
+            reassembler.add(ChunkedImage.from_rawdata(payloads[0]))
+            for rd in payloads[1:]:
+                out = reassembler.add(ImageChunk.from_rawdata(rd))
+            return out.as_rgb()
+
+        def first_band():
+            reassembler = ImageReassembler()
+            reassembler.add(ChunkedImage.from_rawdata(payloads[0]))
+            reassembler.add(ImageChunk.from_rawdata(payloads[1]))
+
+        t1 = timeit.timeit(single, number=n) / n
+        t2 = timeit.timeit(chunked, number=n) / n
+        t3 = timeit.timeit(first_band, number=n) / n
+        print(
+            f"Benchmark for a 1280x720 RGB frame ({len(whole.content)}B):\n"
+            f"    single message: {t1 * 1e3:.2f}ms to decode the frame\n"
+            f"    {len(chunks)} chunks     : {t2 * 1e3:.2f}ms to decode the frame, "
+            f"{t3 * 1e3:.2f}ms until the first {info.rows_per_chunk} rows\n"
+        )
@@ -0,0 +1,33 @@
+# In this file we compare the size and the encoding/decoding time of the "compact" wire format (nested
+# default headers omitted) against plain CBOR, for every message class with nested messages.
+
+import timeit
+import unittest
+import warnings
+
+from duckietown_messages.utils.compact import nested_fields
+from duckietown_messages.utils.samples import all_message_classes, sample
+
+warnings.filterwarnings("ignore")
+
+
+class TestCompactPerformance(unittest.TestCase):
+
+    def test_benchmark__nested_classes(self, n=2000):
+        rows = []
+        for cls in all_message_classes():
+            if not nested_fields(cls):
+                continue
+            msg = sample(cls)
+            rd, rc = msg.to_rawdata("cbor"), msg.to_rawdata("compact")
+            t1 = timeit.timeit(lambda: msg.to_rawdata("cbor"), number=n)
+            t2 = timeit.timeit(lambda: msg.to_rawdata("compact"), number=n)
+            t3 = timeit.timeit(lambda: cls.from_rawdata(rd), number=n)
+            t4 = timeit.timeit(lambda: cls.from_rawdata(rc), number=n)
+            rows.append((cls.__name__, len(rd.content), len(rc.content),
+                         t1 / n * 1e6, t2 / n * 1e6, t3 / n * 1e6, t4 / n * 1e6))
+        print(f"{'class':<28}{'cbor':>8}{'compact':>9}{'saved':>8}"
+              f"{'enc cbor':>11}{'enc compact':>13}{'dec cbor':>11}{'dec compact':>13}")
+        for name, s1, s2, t1, t2, t3, t4 in rows:
+            print(f"{name:<28}{s1:>7}B{s2:>8}B{1 - s2 / s1:>8.0%}"
+                  f"{t1:>9.2f}us{t2:>11.2f}us{t3:>9.2f}us{t4:>11.2f}us")
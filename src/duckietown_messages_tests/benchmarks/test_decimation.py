@@ -0,0 +1,56 @@
+# In this file we measure the cost of peeking the header timestamp of a payload against decoding it, and the
+# time spent by a consumer keeping one message in ten when it decimates before or after decoding.
+
+import timeit
+import unittest
+
+import numpy as np
+
+from duckietown_messages.sensors.compressed_image import CompressedImage
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.sensors.imu import Imu
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.decimation import RateLimit, peek_timestamp
+
+
+class TestDecimationPerformance(unittest.TestCase):
+
+    def _benchmark(self, cls, make, decode=lambda msg: msg, n=300):
+        rds = [make(Header(timestamp=i / 30)).to_rawdata() for i in range(n)]
+        t1 = timeit.timeit(lambda: peek_timestamp(rds[0]), number=n)
+        t2 = timeit.timeit(lambda: cls.from_rawdata(rds[0]), number=n)
+
+        def after():
+            d = RateLimit(3)
+            for rd in rds:
+                msg = cls.from_rawdata(rd)
+                decode(msg)
+                d._admit(msg.header.timestamp)
+
+        def before():
+            d = RateLimit(3)
+            for rd in rds:
+                if d.keep(rd):
+                    decode(cls.from_rawdata(rd))
+
+        t3 = timeit.timeit(after, number=1)
+        t4 = timeit.timeit(before, number=1)
+        print(
+            f"Benchmark for message '{cls.__module__}.{cls.__name__}' ({len(rds[0].content)}B):\n"
+            f"    peek_timestamp          : {t1 / n * 1e6:.2f}us\n"
+            f"    from_rawdata            : {t2 / n * 1e6:.2f}us\n"
+            f"    30Hz->3Hz, decode+drop  : {t3 / n * 1e6:.2f}us/msg\n"
+            f"    30Hz->3Hz, peek+drop    : {t4 / n * 1e6:.2f}us/msg\n"
+        )
+
+    def test_benchmark__image(self):
+        rgb = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        self._benchmark(Image, lambda h: Image.from_rgb(rgb, h))
+
+    def test_benchmark__compressed_image(self):
+        rgb = np.tile(np.arange(640, dtype=np.uint8)[None, :, None], (480, 1, 3))
+        self._benchmark(CompressedImage, lambda h: CompressedImage.from_rgb(rgb, "jpeg", h),
+                        decode=lambda msg: msg.as_array())
+
+    def test_benchmark__imu(self):
+        self._benchmark(Imu, lambda h: Imu(header=h, orientation_covariance=[0.0] * 9))
@@ -0,0 +1,27 @@
+# In this file we measure the throughput of BaseMessage.decode_parallel for an increasing number of workers.
+
+import os
+import time
+import unittest
+
+from duckietown_messages.geometry_3d.position import Position
+from duckietown_messages.geometry_3d.quaternion import Quaternion
+from duckietown_messages.geometry_3d.transformation import Transformation
+
+
+class TestDecodeParallelPerformance(unittest.TestCase):
+
+    def test_benchmark__transformation(self, n=20000):
+        msg = Transformation(
+            source="world", target="base",
+            position=Position(x=1.0, y=2.0, z=3.0),
+            rotation=Quaternion(w=1.0, x=0.0, y=0.0, z=0.0),
+        )
+        payloads = [msg.to_rawdata()] * n
+        print(f"Benchmark for 'decode_parallel' ({n} x {Transformation.__name__}, {os.cpu_count()} CPUs):")
+        for workers in [1, 2, 4, 8]:
+            t0 = time.perf_counter()
+            count = sum(1 for _ in Transformation.decode_parallel(payloads, workers=workers, chunksize=512))
+            t = time.perf_counter() - t0
+            self.assertEqual(count, n)
+            print(f"    workers={workers}: {n / t:.0f} msg/s")
@@ -0,0 +1,51 @@
+# In this file we compare the numpy-only crop/downsample/resize path of Image against the
+# PIL based path (as_array -> PIL resize -> from_rgb).
+
+import timeit
+import unittest
+
+import numpy as np
+from PIL import Image as PILImage
+
+from duckietown_messages.geometry_2d.roi import ROI
+from duckietown_messages.sensors.image import Image
+
+
+class TestImageResizePerformance(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.img = Image.from_rgb(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8))
+
+    def _pil(self, resample, size):
+        im = PILImage.fromarray(self.img.as_rgb()).resize(size, resample=resample)
+        return Image.from_rgb(np.asarray(im))
+
+    def _benchmark(self, name, ours, pil, n=50):
+        t1 = timeit.timeit(ours, number=n)
+        t2 = timeit.timeit(pil, number=n)
+        print(
+            f"Benchmark for '{name}':\n"
+            f"    t1   [numpy]: {t1 / n * 1e3:.3f}ms\n"
+            f"    t2     [PIL]: {t2 / n * 1e3:.3f}ms\n"
+        )
+
+    def test_benchmark__downsample(self):
+        out = self.img.downsample(4)
+        self.assertEqual((out.width, out.height), (160, 120))
+        self._benchmark("downsample 640x480 -> 160x120",
+                        lambda: self.img.downsample(4),
+                        lambda: self._pil(PILImage.BOX, (160, 120)))
+
+    def test_benchmark__resize_nearest(self):
+        out = self.img.resize(160, 120)
+        self.assertEqual((out.width, out.height), (160, 120))
+        self._benchmark("nearest 640x480 -> 160x120",
+                        lambda: self.img.resize(160, 120),
+                        lambda: self._pil(PILImage.NEAREST, (160, 120)))
+
+    def test_benchmark__crop(self):
+        roi = ROI(x=0, y=240, width=640, height=240)
+        self._benchmark("crop lower half",
+                        lambda: self.img.crop(roi),
+                        lambda: Image.from_rgb(self.img.as_rgb()[240:]))
@@ -0,0 +1,36 @@
+# In this file we compare a packed LED frame against a list of RGBA messages for a 144-LED strip.
+
+import timeit
+import unittest
+
+import numpy as np
+from dtps_http import RawData
+
+from duckietown_messages.actuators.led_frame import LEDFrame
+from duckietown_messages.colors.rgba import RGBA
+
+
+class TestLEDFramePerformance(unittest.TestCase):
+
+    def test_benchmark__strip(self, n=200):
+        values = np.random.default_rng(0).random((144, 4))
+
+        def rgba_frame():
+            colors = [RGBA(r=r, g=g, b=b, a=a) for r, g, b, a in values.tolist()]
+            rd = RawData.cbor_from_native_object([c.model_dump() for c in colors])
+            return [RGBA(**c) for c in rd.get_as_native_object()]
+
+        def led_frame():
+            rd = LEDFrame.from_float(values).to_rawdata()
+            return LEDFrame.from_rawdata(rd).as_float()
+
+        t1 = timeit.timeit(rgba_frame, number=n)
+        t2 = timeit.timeit(led_frame, number=n)
+        size1 = len(RawData.cbor_from_native_object(
+            [RGBA(r=r, g=g, b=b, a=a).model_dump() for r, g, b, a in values.tolist()]).content)
+        size2 = len(LEDFrame.from_float(values).to_rawdata().content)
+        print(
+            f"Benchmark for a 144-LED RGBA frame (build, encode, decode):\n"
+            f"    List[RGBA]: {t1 / n * 1e6:.2f}us, {size1}B\n"
+            f"    LEDFrame  : {t2 / n * 1e6:.2f}us, {size2}B\n"
+        )
@@ -0,0 +1,88 @@
+# In this file we measure the latency of a safety command reaching a slow consumer while a joystick floods
+# it with lower priority commands, with a FIFO queue and with the latest-value priority mux.
+
+import queue
+import threading
+import time
+import timeit
+import unittest
+
+from duckietown_messages.actuators.differential_pwm import DifferentialPWM
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.mailbox import PriorityMux
+
+# time spent by the consumer acting on every command
+WORK: float = 0.0005
+
+
+def _flood(put, stop: threading.Event):
+    cmd = DifferentialPWM(left=0.5, right=0.5)
+    while not stop.is_set():
+        put(cmd.model_copy(update={"header": Header(timestamp=time.time())}))
+
+
+def _consume(get, seen: dict, stop: threading.Event):
+    while not stop.is_set():
+        cmd = get()
+        time.sleep(WORK)
+        if cmd is not None and cmd.header.txt:
+            # id of the last safety command acted on
+            seen["id"] = cmd.header.txt["id"]
+
+
+class TestMailboxPerformance(unittest.TestCase):
+
+    def _latency(self, flood, put, get, n: int = 10) -> float:
+        stop, seen = threading.Event(), {"id": None}
+        threads = [
+            threading.Thread(target=_flood, args=(flood, stop), daemon=True),
+            threading.Thread(target=_consume, args=(get, seen, stop), daemon=True),
+        ]
+        for thread in threads:
+            thread.start()
+        latencies = []
+        try:
+            for i in range(n):
+                time.sleep(0.02)
+                t0 = time.perf_counter()
+                put(DifferentialPWM(header=Header(timestamp=time.time(), txt={"id": i}), left=0, right=0))
+                while seen["id"] != i and time.perf_counter() - t0 < 10:
+                    time.sleep(0.0001)
+                latencies.append(time.perf_counter() - t0)
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return sorted(latencies)[len(latencies) // 2]
+
+    def test_benchmark__safety_latency(self):
+        fifo = queue.Queue(maxsize=200)
+
+        def fifo_put(cmd):
+            try:
+                fifo.put(cmd, timeout=0.01)
+            except queue.Full:
+                pass
+
+        def fifo_get():
+            try:
+                return fifo.get(timeout=0.01)
+            except queue.Empty:
+                return None
+
+        t_fifo = self._latency(fifo_put, fifo.put, fifo_get)
+
+        mux = PriorityMux()
+        mux.add_source("safety", priority=1, timeout=0.1)
+        mux.add_source("joystick", priority=0, timeout=1.0)
+        t_mux = self._latency(lambda cmd: mux.put("joystick", cmd), lambda cmd: mux.put("safety", cmd),
+                              mux.current)
+
+        n = 100000
+        t_read = timeit.timeit(mux.current, number=n)
+        print(
+            f"Safety command latency under a joystick flood (consumer busy {WORK * 1e3:.1f}ms per command):\n"
+            f"    fifo queue  : {t_fifo * 1e3:.2f}ms\n"
+            f"    priority mux: {t_mux * 1e3:.2f}ms\n"
+            f"    mux.current : {t_read / n * 1e9:.0f}ns\n"
+        )
@@ -0,0 +1,37 @@
+# In this file we measure the cost of version-aware decoding for payloads that need to be upgraded and for
+# payloads already at the current version.
+
+import timeit
+import unittest
+
+from dtps_http import RawData
+
+from duckietown_messages.sensors.range import Range
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.migrations import Migrations
+
+
+def _rename(native: dict) -> dict:
+    native["data"] = native.pop("distance")
+    return native
+
+
+class TestMigrationsPerformance(unittest.TestCase):
+
+    def test_benchmark__decode(self, n=20000):
+        current = Range(header=Header(timestamp=1.0), data=1.0).to_rawdata()
+        old = RawData.cbor_from_native_object({"header": {"version": "0.9"}, "distance": 1.0})
+        t0 = timeit.timeit(lambda: Range.from_rawdata(current), number=n)
+        Migrations.register(Range, "0.9", "0.95", _rename)
+        Migrations.register(Range, "0.95", "1.0", lambda native: native)
+        try:
+            t1 = timeit.timeit(lambda: Range.from_rawdata(current), number=n)
+            t2 = timeit.timeit(lambda: Range.from_rawdata(old), number=n)
+        finally:
+            Migrations.unregister(Range)
+        print(
+            f"Benchmark for decoding a Range:\n"
+            f"    no migrations             : {t0 / n * 1e6:.2f}us\n"
+            f"    at the current version    : {t1 / n * 1e6:.2f}us\n"
+            f"    upgraded through 2 steps  : {t2 / n * 1e6:.2f}us\n"
+        )
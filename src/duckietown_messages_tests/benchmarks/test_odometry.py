@@ -0,0 +1,47 @@
+# In this file we compare the vectorized wheel odometry against a per-sample Python loop.
+
+import math
+import timeit
+import unittest
+
+import numpy as np
+
+from duckietown_messages.sensors.wheel_encoder import WheelEncoder
+from duckietown_messages.utils.odometry import WheelOdometry
+
+
+def _loop(t, left, right, step, baseline):
+    x = y = theta = 0.0
+    for k in range(1, len(t)):
+        dl = (left[k] - left[k - 1]) * step
+        dr = (right[k] - right[k - 1]) * step
+        ds, dtheta = (dl + dr) / 2, (dr - dl) / baseline
+        chord = ds * (math.sin(dtheta / 2) / (dtheta / 2) if dtheta else 1.0)
+        x += chord * math.cos(theta + dtheta / 2)
+        y += chord * math.sin(theta + dtheta / 2)
+        theta += dtheta
+    return x, y, theta
+
+
+class TestOdometryPerformance(unittest.TestCase):
+
+    def test_benchmark__integrate(self):
+        encoder = WheelEncoder(name="wheel", type="wheel_encoder", simulated=True, resolution=135)
+        rng = np.random.default_rng(0)
+        for n in (100, 10000, 1000000):
+            t = np.arange(n) * 0.01
+            left = np.cumsum(rng.integers(0, 10, n))
+            right = np.cumsum(rng.integers(0, 10, n))
+            number = max(1, 100000 // n)
+
+            def vectorized():
+                WheelOdometry(encoder, encoder, wheel_radius=0.0318, baseline=0.1).integrate(t, left, right)
+
+            lt, ll, lr = t.tolist(), left.tolist(), right.tolist()
+            t1 = timeit.timeit(lambda: _loop(lt, ll, lr, 2 * math.pi * 0.0318 / 135, 0.1), number=number)
+            t2 = timeit.timeit(vectorized, number=number)
+            print(
+                f"Benchmark for wheel odometry over {n} samples:\n"
+                f"    python loop: {t1 / number * 1e3:.3f}ms\n"
+                f"    vectorized:  {t2 / number * 1e3:.3f}ms\n"
+            )
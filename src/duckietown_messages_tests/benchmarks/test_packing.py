@@ -0,0 +1,38 @@
+# In this file we compare the fixed-layout binary packing of the flight/motor command messages against CBOR.
+
+import timeit
+import unittest
+
+from duckietown_messages.actuators.drone_control import DroneControl
+from duckietown_messages.actuators.drone_motor_command import DroneMotorCommand
+from duckietown_messages.standard.header import Header
+
+
+class TestPackingPerformance(unittest.TestCase):
+
+    def _benchmark(self, msg, n=5000):
+        cls = type(msg)
+        rd = msg.to_rawdata()
+        data = msg.pack()
+        t1 = timeit.timeit(lambda: msg.to_rawdata(), number=n)
+        t2 = timeit.timeit(lambda: cls.from_rawdata(rd), number=n)
+        t3 = timeit.timeit(lambda: msg.pack(), number=n)
+        t4 = timeit.timeit(lambda: cls.unpack(data), number=n)
+        arr = cls.pack_many([msg] * 1000)
+        t5 = timeit.timeit(lambda: cls.unpack_many(arr), number=n // 1000)
+        print(
+            f"Benchmark for message '{cls.__module__}.{cls.__name__}':\n"
+            f"    size       [cbor]: {len(rd.content)}B\n"
+            f"    size     [packed]: {len(data)}B\n"
+            f"    encode     [cbor]: {t1 / n * 1e6:.2f}us\n"
+            f"    decode     [cbor]: {t2 / n * 1e6:.2f}us\n"
+            f"    encode   [packed]: {t3 / n * 1e6:.2f}us\n"
+            f"    decode   [packed]: {t4 / n * 1e6:.2f}us\n"
+            f"    decode [unpack_many]: {t5 / n * 1e6:.2f}us\n"
+        )
+
+    def test_benchmark__drone_control(self):
+        self._benchmark(DroneControl(roll=1500, pitch=1500, yaw=1500, throttle=1200))
+
+    def test_benchmark__drone_motor_command(self):
+        self._benchmark(DroneMotorCommand(header=Header(timestamp=1.0), m1=1100, m2=1200, m3=1300, m4=1400))
@@ -0,0 +1,39 @@
+# In this file we compare the usual serial node loop (decode, convert to numpy, compress, encode) against
+# the same steps run as a pipeline with the JPEG compression spread over several workers.
+
+import time
+import unittest
+
+import numpy as np
+
+from duckietown_messages.sensors.compressed_image import CompressedImage
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.utils.pipeline import Pipeline, compress, decode, encode, to_array
+
+
+class TestPipelinePerformance(unittest.TestCase):
+
+    def test_benchmark__camera_node(self, n=200):
+        y, x = np.mgrid[0:480, 0:640]
+        im = np.stack([x % 256, y % 256, (x + y) % 256], axis=2).astype(np.uint8)
+        payloads = [Image.from_rgb(im).to_rawdata() for _ in range(n)]
+
+        t0 = time.perf_counter()
+        for rd in payloads:
+            msg = Image.from_rawdata(rd)
+            CompressedImage.from_rgb(msg.as_array(), "jpeg", msg.header).to_rawdata()
+        t1 = time.perf_counter() - t0
+
+        pipeline = Pipeline([decode(Image), to_array(), compress(workers=4), encode()])
+        t0 = time.perf_counter()
+        for _ in pipeline.run(payloads):
+            pass
+        t2 = time.perf_counter() - t0
+        stats = pipeline.stats()
+        print(
+            f"Benchmark for compressing {n} 640x480 frames:\n"
+            f"    serial  : {n / t1:.1f} frames/s\n"
+            f"    pipeline: {n / t2:.1f} frames/s\n" +
+            "".join(f"        {name:<14}: {s.throughput:8.1f} items/s, mean latency "
+                    f"{s.latency_mean * 1e3:.2f}ms\n" for name, s in stats.items())
+        )
@@ -0,0 +1,39 @@
+# In this file we compare a 300-segment lane detection frame sent as a list of pairs of Point messages and
+# as a packed SegmentList.
+
+import timeit
+import unittest
+
+import numpy as np
+from dtps_http import RawData
+
+from duckietown_messages.geometry_2d.point import Point
+from duckietown_messages.geometry_2d.segment_list import SegmentList
+
+
+class TestPointListsPerformance(unittest.TestCase):
+
+    def test_benchmark__segments(self, n=100):
+        segments = np.random.default_rng(0).random((300, 2, 2))
+
+        def points():
+            pairs = [[Point(x=x0, y=y0).model_dump(), Point(x=x1, y=y1).model_dump()]
+                     for (x0, y0), (x1, y1) in segments.tolist()]
+            rd = RawData.cbor_from_native_object(pairs)
+            return [(Point(**a), Point(**b)) for a, b in rd.get_as_native_object()]
+
+        def packed():
+            rd = SegmentList.from_array(segments).to_rawdata()
+            return SegmentList.from_rawdata(rd).as_array()
+
+        t1 = timeit.timeit(points, number=n)
+        t2 = timeit.timeit(packed, number=n)
+        size1 = len(RawData.cbor_from_native_object(
+            [[Point(x=x0, y=y0).model_dump(), Point(x=x1, y=y1).model_dump()]
+             for (x0, y0), (x1, y1) in segments.tolist()]).content)
+        size2 = len(SegmentList.from_array(segments).to_rawdata().content)
+        print(
+            f"Benchmark for a frame of 300 segments (build, encode, decode):\n"
+            f"    List[(Point, Point)]: {t1 / n * 1e6:.2f}us, {size1}B\n"
+            f"    SegmentList         : {t2 / n * 1e6:.2f}us, {size2}B\n"
+        )
@@ -0,0 +1,25 @@
+# In this file we measure how much faster than real time the HIL replay driver feeds a recorded session to
+# a trivial agent.
+
+import unittest
+
+from duckietown_messages.sensors.range import Range
+from duckietown_messages.simulation.hil.replay import LocalSimulator, ReplayDriver
+from duckietown_messages.standard.header import Header
+
+
+class TestReplayPerformance(unittest.TestCase):
+
+    def test_benchmark__replay(self, seconds=10):
+        # 10s of a 1kHz IMU-like stream and a 30Hz range stream
+        imu = [(i / 1000, Range(header=Header(timestamp=i / 1000), data=0.5).to_rawdata())
+               for i in range(seconds * 1000)]
+        tof = [Range(header=Header(timestamp=i / 30), data=1.0).to_rawdata() for i in range(seconds * 30)]
+        simulator = LocalSimulator({"imu": imu, "tof": tof})
+        stats = ReplayDriver(simulator, lambda topic, rd, t: None).run()
+        print(
+            f"Benchmark for replaying {stats.messages} messages ({stats.virtual_seconds:.1f}s):\n"
+            f"    wall time: {stats.wall_seconds * 1e3:.1f}ms\n"
+            f"    rate     : {stats.messages_per_second:.0f} msg/s\n"
+            f"    speedup  : {stats.speedup:.0f}x\n"
+        )
@@ -0,0 +1,39 @@
+# In this file we compare the size and encode/decode time of a sparse VGA segmentation mask sent as a mono8
+# image, a mono1 (bit-packed) image and an RLE mask.
+
+import timeit
+import unittest
+
+import numpy as np
+
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.sensors.rle_mask import RLEMask
+
+
+class TestRLEMaskPerformance(unittest.TestCase):
+
+    def test_benchmark__mask(self, n=200):
+        mask = np.zeros((480, 640), dtype=np.uint8)
+        mask[200:260, 300:380] = 1
+        mask[400:420, 0:50] = 1
+        mask[100:300, 600:610] = 1
+
+        def mono8():
+            return Image.from_rawdata(Image.from_mono8(mask * 255).to_rawdata()).as_array()
+
+        def mono1():
+            return Image.from_rawdata(Image.from_np(mask, "mono1").to_rawdata()).as_array()
+
+        def rle():
+            return RLEMask.from_rawdata(RLEMask.from_mask(mask).to_rawdata()).to_mask()
+
+        sizes = [len(Image.from_mono8(mask * 255).to_rawdata().content),
+                 len(Image.from_np(mask, "mono1").to_rawdata().content),
+                 len(RLEMask.from_mask(mask).to_rawdata().content)]
+        times = [timeit.timeit(f, number=n) / n for f in (mono8, mono1, rle)]
+        print(
+            f"Benchmark for a sparse 640x480 mask (encode, decode):\n"
+            f"    mono8  : {times[0] * 1e6:.2f}us, {sizes[0]}B\n"
+            f"    mono1  : {times[1] * 1e6:.2f}us, {sizes[1]}B\n"
+            f"    RLEMask: {times[2] * 1e6:.2f}us, {sizes[2]}B\n"
+        )
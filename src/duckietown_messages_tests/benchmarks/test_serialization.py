@@ -0,0 +1,31 @@
+# In this file we compare the size and the speed of the available wire formats for every message class.
+
+import timeit
+import unittest
+import warnings
+
+from duckietown_messages.utils.packing import Packable
+from duckietown_messages.utils.samples import all_message_classes, sample
+from duckietown_messages.utils.serialization import Serializers
+
+warnings.filterwarnings("ignore")
+
+
+class TestSerializationPerformance(unittest.TestCase):
+
+    def test_benchmark__all_formats(self, n=200):
+        formats = Serializers.available()
+        print("Benchmark of wire formats (size [B] / encode [us] / decode [us]):")
+        print(f"    {'message':<28}" + "".join(f"{fmt:>24}" for fmt in formats))
+        for cls in all_message_classes():
+            msg = sample(cls)
+            row = f"    {cls.__name__:<28}"
+            for fmt in formats:
+                if fmt == "struct" and not issubclass(cls, Packable):
+                    row += f"{'-':>24}"
+                    continue
+                rd = msg.to_rawdata(fmt)
+                t_enc = timeit.timeit(lambda: msg.to_rawdata(fmt), number=n) / n * 1e6
+                t_dec = timeit.timeit(lambda: cls.from_rawdata(rd), number=n) / n * 1e6
+                row += f"{len(rd.content):>8} /{t_enc:>6.1f} /{t_dec:>6.1f}"
+            print(row)
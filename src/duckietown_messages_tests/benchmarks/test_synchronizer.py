@@ -0,0 +1,49 @@
+# In this file we measure the throughput of the approximate-time synchronizer on a 1kHz IMU stream and a
+# 30Hz camera stream, against a synchronizer scanning Python lists on every arrival.
+
+import time
+import unittest
+
+from duckietown_messages.sensors.range import Range
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.synchronizer import ApproximateTimeSynchronizer
+
+
+def naive(events, slop, size=1000):
+    # scans the buffered messages of the other stream on every arrival
+    buffers = {"camera": [], "imu": []}
+    matches = 0
+    for name, msg in events:
+        other = buffers["imu" if name == "camera" else "camera"]
+        best = min(other, key=lambda m: abs(m.header.timestamp - msg.header.timestamp), default=None)
+        if best is not None and abs(best.header.timestamp - msg.header.timestamp) <= slop:
+            other.remove(best)
+            matches += 1
+        else:
+            buffers[name].append(msg)
+            del buffers[name][:-size]
+    return matches
+
+
+class TestSynchronizerPerformance(unittest.TestCase):
+
+    def test_benchmark__imu_camera(self, seconds=20):
+        events = [("imu", Range(header=Header(timestamp=i / 1000), data=1.0)) for i in range(seconds * 1000)]
+        events += [("camera", Range(header=Header(timestamp=i / 30 + 0.0002), data=1.0))
+                   for i in range(seconds * 30)]
+        events.sort(key=lambda e: e[1].header.timestamp)
+
+        t0 = time.perf_counter()
+        sync = ApproximateTimeSynchronizer(["camera", "imu"], slop=0.001, queue_size=100)
+        for name, msg in events:
+            sync.add(name, msg)
+        t1 = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        matches = naive(events, 0.001)
+        t2 = time.perf_counter() - t0
+        print(
+            f"Benchmark for synchronizing {seconds}s of 1kHz IMU + 30Hz camera ({len(events)} messages):\n"
+            f"    ApproximateTimeSynchronizer: {len(events) / t1:.0f} msg/s, {sync.stats.tuples} tuples\n"
+            f"    list scan                  : {len(events) / t2:.0f} msg/s, {matches} tuples\n"
+        )
@@ -0,0 +1,48 @@
+# In this file we compare the cold-import time and the latency of the first message with and without
+# warming up the message classes. Every measurement runs in a fresh interpreter.
+
+import json
+import subprocess
+import sys
+import unittest
+
+SCRIPT = """
+import json, sys, time
+import duckietown_messages.base
+from dtps_http import RawData
+t0 = time.perf_counter()
+from duckietown_messages.sensors.range import Range
+from duckietown_messages.actuators.differential_pwm import DifferentialPWM
+t1 = time.perf_counter()
+warmup = 0.0
+if sys.argv[1] == "warm":
+    import duckietown_messages
+    duckietown_messages.warmup([Range, DifferentialPWM])
+    warmup = time.perf_counter() - t1
+rd = RawData.cbor_from_native_object({"header": {"timestamp": 1.0}, "data": 0.5})
+t2 = time.perf_counter()
+# a control tick: read a range, publish a command
+Range.from_rawdata(rd)
+DifferentialPWM(left=0.1, right=0.1).to_rawdata()
+t3 = time.perf_counter()
+print(json.dumps({"import": t1 - t0, "warmup": warmup, "first": t3 - t2}))
+"""
+
+
+def measure(mode: str, n: int) -> dict:
+    runs = [json.loads(subprocess.check_output([sys.executable, "-c", SCRIPT, mode])) for _ in range(n)]
+    return {k: min(r[k] for r in runs) for k in runs[0]}
+
+
+class TestWarmupPerformance(unittest.TestCase):
+
+    def test_benchmark__first_message(self, n=3):
+        cold = measure("cold", n)
+        warm = measure("warm", n)
+        print(
+            f"Benchmark for importing Range and DifferentialPWM and handling their first message:\n"
+            f"    import       : {cold['import'] * 1e3:.2f}ms\n"
+            f"    first message: {cold['first'] * 1e3:.2f}ms (cold)\n"
+            f"    first message: {warm['first'] * 1e3:.2f}ms (warm)\n"
+            f"    warmup       : {warm['warmup'] * 1e3:.2f}ms\n"
+        )
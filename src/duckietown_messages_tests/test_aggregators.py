@@ -0,0 +1,134 @@
+import unittest
+
+import numpy as np
+
+from duckietown_messages.sensors.battery import BatteryState
+from duckietown_messages.sensors.range import Range
+from duckietown_messages.sensors.temperature import Temperature
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.aggregators import (
+    WindowedStatistics,
+    BatteryStateAggregator,
+    RangeAggregator,
+    TemperatureAggregator,
+)
+
+
+class TestWindowedStatistics(unittest.TestCase):
+
+    def assertMatches(self, stats, values, times, bin_width):
+        self.assertEqual(stats.count, len(values))
+        self.assertEqual(stats.minimum, values.min())
+        self.assertEqual(stats.maximum, values.max())
+        self.assertAlmostEqual(stats.mean, values.mean(), places=9)
+        self.assertAlmostEqual(stats.stddev, values.std(ddof=1), places=9)
+        for level, value in stats.quantiles:
+            self.assertLessEqual(abs(value - np.quantile(values, level)), 2 * bin_width)
+        self.assertAlmostEqual(stats.rate, np.polyfit(times, values, 1)[0], places=6)
+
+    def test_count_window(self):
+        rng = np.random.default_rng(0)
+        values = rng.normal(20.0, 3.0, 5000)
+        times = np.arange(values.size) * 0.1
+        window = WindowedStatistics("data", size=500, bounds=(0.0, 40.0), bins=400)
+        for t, x in zip(times, values):
+            window.add(x, t)
+        self.assertEqual(len(window), 500)
+        self.assertEqual(window._values.shape, (500, 1))
+        stats, = window.summaries()
+        self.assertMatches(stats, values[-500:], times[-500:], 0.1)
+        self.assertAlmostEqual(stats.window, times[-1] - times[-500])
+
+    def test_time_window(self):
+        rng = np.random.default_rng(1)
+        times = np.cumsum(rng.uniform(0.01, 0.05, 3000))
+        values = 12.0 - 0.01 * times + rng.normal(0, 0.05, times.size)
+        window = WindowedStatistics("voltage", duration=5.0, capacity=1024, bounds=(0.0, 30.0), bins=3000)
+        for t, x in zip(times, values):
+            window.add(x, t)
+        inside = times >= times[-1] - 5.0
+        stats, = window.summaries()
+        self.assertMatches(stats, values[inside], times[inside], 0.01)
+
+    def test_capacity_bounds_time_window(self):
+        window = WindowedStatistics("data", duration=100.0, capacity=64)
+        for i in range(1000):
+            window.add(0.5, i * 0.01)
+        self.assertEqual(len(window), 64)
+        self.assertEqual(window.summaries()[0].count, 64)
+
+    def test_missing(self):
+        window = WindowedStatistics("data", size=4)
+        for i, x in enumerate([None, 1.0, None, 2.0, None, 3.0]):
+            window.add(x, float(i))
+        stats, = window.summaries()
+        self.assertEqual((stats.count, stats.missing), (2, 2))
+        self.assertEqual(stats.mean, 2.5)
+        for i in range(4):
+            window.add(None, 10.0 + i)
+        stats, = window.summaries()
+        self.assertEqual((stats.count, stats.missing), (0, 4))
+        self.assertIsNone(stats.mean)
+
+    def test_vector(self):
+        window = WindowedStatistics("cell_voltage", dim=3, size=10, bounds=(0.0, 5.0))
+        for i in range(20):
+            window.add([3.7, 3.8, 3.9 - 0.01 * i], float(i))
+        stats = window.summaries()
+        self.assertEqual([s.quantity for s in stats],
+                         ["cell_voltage[0]", "cell_voltage[1]", "cell_voltage[2]"])
+        self.assertAlmostEqual(stats[0].mean, 3.7)
+        self.assertAlmostEqual(stats[2].rate, -0.01)
+        with self.assertRaises(ValueError):
+            window.add([3.7], 21.0)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            WindowedStatistics("data")
+        with self.assertRaises(ValueError):
+            WindowedStatistics("data", size=0)
+
+
+class TestStreamAggregators(unittest.TestCase):
+
+    def test_emission_rate(self):
+        aggregator = TemperatureAggregator(duration=10.0, emit_period=1.0)
+        emitted = []
+        for i in range(100):
+            msg = Temperature(header=Header(frame="robot", timestamp=i * 0.1), data=20.0 + i)
+            out = aggregator.update(msg)
+            if out is not None:
+                emitted.append(out)
+        self.assertEqual(len(emitted), 9)
+        stats, = emitted[-1]
+        self.assertEqual(stats.quantity, "data")
+        self.assertEqual(stats.header.frame, "robot")
+        self.assertAlmostEqual(stats.header.timestamp, 9.0)
+        self.assertAlmostEqual(stats.rate, 10.0)
+
+    def test_range_out_of_range(self):
+        aggregator = RangeAggregator(size=10, emit_period=None)
+        for i in range(10):
+            self.assertIsNone(aggregator.update(Range(data=None if i % 2 else 0.5), now=float(i)))
+        stats, = aggregator.summaries()
+        self.assertEqual((stats.count, stats.missing), (5, 5))
+
+    def test_battery(self):
+        aggregator = BatteryStateAggregator(size=50, emit_period=None)
+        for i in range(60):
+            msg = BatteryState(voltage=11.1, percentage=80.0, cell_voltage=[3.7] * 3)
+            aggregator.update(msg, now=float(i))
+        stats = {s.quantity: s for s in aggregator.summaries()}
+        self.assertEqual(set(stats), {"voltage", "percentage", "cell_voltage[0]", "cell_voltage[1]",
+                                      "cell_voltage[2]"})
+        self.assertEqual(stats["cell_voltage[1]"].count, 50)
+        # the number of cells changed, the per-cell window starts over
+        aggregator.update(BatteryState(voltage=7.4, cell_voltage=[3.7] * 2), now=60.0)
+        stats = {s.quantity: s for s in aggregator.summaries()}
+        self.assertNotIn("cell_voltage[2]", stats)
+        self.assertEqual(stats["cell_voltage[0]"].count, 1)
+        self.assertEqual(stats["voltage"].count, 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+
+from dtps_http import RawData
+
+from duckietown_messages.sensors.camera import Camera
+from duckietown_messages.sensors.temperature import Temperature
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.caching import DECODE_CACHE
+from duckietown_messages.utils.exceptions import BatchDecodingError
+from duckietown_messages.utils.metrics import Metrics
+from duckietown_messages.utils.serialization import Serializers
+from duckietown_messages.utils.tracing import Tracing
+
+
+class JsonTemperature(Temperature):
+    wire_format = "json"
+
+
+class TestBulkValidation(unittest.TestCase):
+
+    def test_model_validate_many(self):
+        msgs = Temperature.model_validate_many([{"data": float(i)} for i in range(5)])
+        self.assertEqual([m.data for m in msgs], [0.0, 1.0, 2.0, 3.0, 4.0])
+        self.assertTrue(all(isinstance(m, Temperature) for m in msgs))
+
+    def test_failing_indices(self):
+        data = [{"data": 1.0}, {"data": "hot"}, {"data": 2.0}, {}]
+        with self.assertRaises(BatchDecodingError) as ctx:
+            Temperature.model_validate_many(data)
+        self.assertEqual(ctx.exception.indices, [1, 3])
+
+    def test_rawdata_roundtrip(self):
+        msgs = [Temperature(data=float(i)) for i in range(5)]
+        rds = Temperature.to_rawdata_many(msgs)
+        self.assertEqual([rd.content for rd in rds], [m.to_rawdata().content for m in msgs])
+        self.assertEqual(Temperature.from_rawdata_many(rds), msgs)
+
+    def test_from_rawdata_many_none(self):
+        none = RawData.cbor_from_native_object(None)
+        rds = [Temperature(data=1.0).to_rawdata(), none, RawData.cbor_from_native_object({"data": "x"})]
+        with self.assertRaises(BatchDecodingError) as ctx:
+            Temperature.from_rawdata_many(rds)
+        self.assertEqual(ctx.exception.indices, [1])
+        with self.assertRaises(BatchDecodingError) as ctx:
+            Temperature.from_rawdata_many(rds, allow_none=True)
+        self.assertEqual(ctx.exception.indices, [2])
+        out = Temperature.from_rawdata_many(rds[:2], allow_none=True)
+        self.assertEqual(out, [Temperature(data=1.0), None])
+
+    def test_from_rawdata_many_formats(self):
+        msgs = [Temperature(data=float(i)) for i in range(6)]
+        formats = [fmt for fmt in ("cbor", "json", "msgpack", "compact") if fmt in Serializers.available()]
+        rds = [m.to_rawdata(formats[i % len(formats)]) for i, m in enumerate(msgs)]
+        self.assertEqual(Temperature.from_rawdata_many(rds), msgs)
+        # failures are reported by index whatever the format
+        rds[1] = RawData(content=b'{"data": "hot"}', content_type="application/json")
+        rds[3] = RawData(content=b"?", content_type="text/plain")
+        rds[4] = RawData.cbor_from_native_object({"data": "x"})
+        with self.assertRaises(BatchDecodingError) as ctx:
+            Temperature.from_rawdata_many(rds)
+        self.assertEqual(ctx.exception.indices, [1, 3, 4])
+
+    def test_from_rawdata_many_malformed(self):
+        formats = [fmt for fmt in ("cbor", "json", "compact", "msgpack") if fmt in Serializers.available()]
+        rds = [Temperature(data=float(i)).to_rawdata(fmt) for i, fmt in enumerate(formats)]
+        array = RawData.cbor_from_native_object([1, 2]).content
+        # truncated CBOR, JSON and compact payloads, CBOR and compact payloads that are not maps
+        bad = [(rds[0].content[:-3], "cbor"), (b'{"data": ', "json"), (rds[2].content[:-3], "compact"),
+               (array, "cbor"), (array, "compact")]
+        if "msgpack" in formats:
+            # a reserved (invalid) msgpack type byte, a msgpack array
+            bad += [(b"\xc1", "msgpack"), (b"\x92\x01\x02", "msgpack")]
+        rds += [RawData(content=c, content_type=Serializers.get(fmt).content_type) for c, fmt in bad]
+        with self.assertRaises(BatchDecodingError) as ctx:
+            Temperature.from_rawdata_many(rds)
+        self.assertEqual(ctx.exception.indices, list(range(len(formats), len(rds))))
+
+    def test_to_rawdata_many_format(self):
+        msgs = [JsonTemperature(data=float(i)) for i in range(3)]
+        rds = JsonTemperature.to_rawdata_many(msgs)
+        self.assertEqual([rd.content for rd in rds], [m.to_rawdata().content for m in msgs])
+        self.assertEqual({rd.content_type for rd in rds}, {"application/json"})
+        self.assertEqual(JsonTemperature.from_rawdata_many(rds), msgs)
+        rds = JsonTemperature.to_rawdata_many(msgs, "cbor")
+        self.assertEqual([rd.content for rd in rds], [m.to_rawdata("cbor").content for m in msgs])
+
+    def test_metrics(self):
+        Metrics.reset()
+        Metrics.enable()
+        try:
+            rds = Temperature.to_rawdata_many([Temperature(data=float(i)) for i in range(4)])
+            Temperature.from_rawdata_many(rds)
+            stats = Metrics.snapshot()["Temperature"]
+        finally:
+            Metrics.disable()
+            Metrics.reset()
+        for op in ("encode_many", "decode_many", "validate_many"):
+            self.assertEqual(stats["operations"][op]["count"], 1)
+        self.assertEqual(stats["bytes_out"], sum(len(rd.content) for rd in rds))
+        self.assertEqual(stats["bytes_in"], stats["bytes_out"])
+
+    def test_tracing(self):
+        Tracing.enable()
+        try:
+            msgs = [Temperature(header=Tracing.start(), data=float(i)) for i in range(3)]
+            out = Temperature.from_rawdata_many(Temperature.to_rawdata_many(msgs))
+        finally:
+            Tracing.disable()
+        for msg in out:
+            self.assertEqual([s for s, _ in msg.header.trace.stamps],
+                             ["source", "encode:Temperature", "decode:Temperature"])
+
+    def test_cache_decoded(self):
+        DECODE_CACHE.clear()
+        try:
+            msg = Camera(header=Header(frame="cam"), name="front_camera", type="camera", simulated=False,
+                         width=640, height=480, fov=2.0)
+            rds = Camera.to_rawdata_many([msg, msg])
+            first, second = Camera.from_rawdata_many(rds)
+            # decoded instances are shared (and frozen) as with `from_rawdata`
+            self.assertIs(first, second)
+            self.assertIs(Camera.from_rawdata(rds[0]), first)
+            self.assertEqual(first, msg)
+        finally:
+            DECODE_CACHE.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
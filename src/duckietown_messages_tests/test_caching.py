@@ -0,0 +1,132 @@
+import gc
+import unittest
+
+from dtps_http import RawData
+from pydantic import ValidationError
+
+from duckietown_messages.actuators.generic import Actuator
+from duckietown_messages.calibrations.camera_intrinsic import CameraIntrinsicCalibration
+from duckietown_messages.calibrations.dc_motor import DCMotorCalibration
+from duckietown_messages.sensors.camera import Camera
+from duckietown_messages.sensors.temperature import Temperature
+from duckietown_messages.standard.header import Header
+from duckietown_messages.standard.pair import Pair
+from duckietown_messages.utils import caching
+from duckietown_messages.utils.caching import DECODE_CACHE, DecodeCache
+from duckietown_messages.utils.exceptions import DataDecodingError
+
+
+def camera(width: int = 640) -> Camera:
+    return Camera(name="front_camera", type="camera", simulated=False, width=width, height=480, fov=2.0)
+
+
+class TestContentHash(unittest.TestCase):
+
+    def test_stable(self):
+        h = camera().content_hash()
+        self.assertEqual(h, camera().content_hash())
+        self.assertNotEqual(h, camera(320).content_hash())
+        self.assertEqual(h, caching.digest(camera().to_rawdata().content))
+
+    def test_cached_per_instance(self):
+        msg = camera()
+        h = msg.content_hash()
+        self.assertIn(id(msg), caching._hashes)
+        self.assertEqual(msg.content_hash(), h)
+        # hashing does not change the message
+        self.assertEqual(msg, camera())
+        del msg
+        gc.collect()
+        self.assertFalse(any(ref() is None for ref, _ in caching._hashes.values()))
+
+    def test_reset_on_assignment(self):
+        msg = camera()
+        h = msg.content_hash()
+        msg.width = 320
+        self.assertEqual(msg.content_hash(), camera(320).content_hash())
+        self.assertNotEqual(msg.content_hash(), h)
+
+
+class TestDecodeCache(unittest.TestCase):
+
+    def setUp(self):
+        DECODE_CACHE.clear()
+
+    def tearDown(self):
+        DECODE_CACHE.clear()
+
+    def test_shared_instance(self):
+        rd = camera().to_rawdata()
+        first = Camera.from_rawdata(rd)
+        second = Camera.from_rawdata(RawData(content=bytes(rd.content), content_type=rd.content_type))
+        self.assertIs(first, second)
+        self.assertEqual(first, camera())
+        self.assertEqual(DECODE_CACHE.stats()["hits"], 1)
+        self.assertIsNot(Camera.from_rawdata(camera(320).to_rawdata()), first)
+
+    def test_frozen(self):
+        gain = [Pair[float, float](first=0.5, second=1.1)]
+        msg = DCMotorCalibration(header=Header(frame="motor"), gain=gain)
+        rd = msg.to_rawdata()
+        shared = DCMotorCalibration.from_rawdata(rd)
+        for obj, name, value in ((shared, "gain", []), (shared.header, "frame", "wheel"),
+                                 (shared.gain[0], "first", 1.0)):
+            with self.assertRaises(ValidationError):
+                setattr(obj, name, value)
+        self.assertEqual(DCMotorCalibration.from_rawdata(rd), msg)
+        # copies can be modified
+        copy = shared.model_copy(deep=True)
+        copy.header.frame = "wheel"
+        self.assertEqual(shared.header.frame, "motor")
+        # messages decoded without the cache, and the shared default header, are not frozen
+        Temperature.from_rawdata(Temperature(data=1.0).to_rawdata()).data = 2.0
+        Camera.from_rawdata(RawData.cbor_from_native_object(camera(100).model_dump(exclude={"header"})))
+        self.assertNotIn(id(Header.get_default()), caching._frozen)
+
+    def test_class_vars(self):
+        for cls in (Camera, DCMotorCalibration, CameraIntrinsicCalibration, Actuator):
+            self.assertTrue(cls.cache_decoded)
+            self.assertNotIn("cache_decoded", cls.model_fields)
+
+    def test_opt_in(self):
+        self.assertTrue(Camera.cache_decoded)
+        self.assertTrue(DCMotorCalibration.cache_decoded)
+        self.assertFalse(Temperature.cache_decoded)
+        rd = Temperature(data=21.0).to_rawdata()
+        self.assertIsNot(Temperature.from_rawdata(rd), Temperature.from_rawdata(rd))
+        self.assertEqual(len(DECODE_CACHE), 0)
+
+    def test_calibration(self):
+        msg = DCMotorCalibration(gain=[Pair[float, float](first=0.5, second=1.1)])
+        rd = msg.to_rawdata()
+        self.assertIs(DCMotorCalibration.from_rawdata(rd), DCMotorCalibration.from_rawdata(rd))
+
+    def test_errors_are_not_cached(self):
+        rd = RawData.cbor_from_native_object({"name": "camera"})
+        for _ in range(2):
+            with self.assertRaises(DataDecodingError):
+                Camera.from_rawdata(rd)
+        self.assertEqual(len(DECODE_CACHE), 0)
+        none = RawData.cbor_from_native_object(None)
+        self.assertIsNone(Camera.from_rawdata(none, allow_none=True))
+        with self.assertRaises(DataDecodingError):
+            Camera.from_rawdata(none)
+
+    def test_lru(self):
+        cache = DecodeCache(maxsize=2)
+        rds = [camera(w).to_rawdata() for w in (100, 200, 300)]
+        a, _ = cache.decode(Camera, rds[0]), cache.decode(Camera, rds[1])
+        # touch the first entry, the second one is evicted next
+        self.assertIs(cache.decode(Camera, rds[0]), a)
+        cache.decode(Camera, rds[2])
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get(Camera, caching.digest(rds[0].content), rds[0].content_type))
+        self.assertIsNone(cache.get(Camera, caching.digest(rds[1].content), rds[1].content_type))
+        cache.resize(1)
+        self.assertEqual(len(cache), 1)
+        with self.assertRaises(ValueError):
+            DecodeCache(maxsize=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+
+import numpy as np
+
+from duckietown_messages.geometry_2d.roi import ROI
+from duckietown_messages.sensors.compressed_image import CompressedImage
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.image.change_detection import ChangeDetector
+from duckietown_messages.utils.image.jpeg import jpeg_to_rgb, rgb_to_jpeg
+from duckietown_messages.utils.image.rate_control import AdaptiveJPEGEncoder
+
+
+def scene(h=240, w=320):
+    # smooth background
+    y, x = np.mgrid[0:h, 0:w]
+    return (128 + 60 * np.sin(x / 25.0) * np.cos(y / 30.0)).astype(np.uint8)[:, :, None].repeat(3, axis=2)
+
+
+def noisy(rng, im, sigma=2.0):
+    return np.clip(im + rng.normal(0, sigma, im.shape), 0, 255).astype(np.uint8)
+
+
+class TestChangeDetector(unittest.TestCase):
+
+    def test_static_scene(self):
+        rng = np.random.default_rng(0)
+        background = scene()
+        detector = ChangeDetector()
+        decisions = [detector.changed(noisy(rng, background), t=i * 0.1) for i in range(20)]
+        self.assertEqual(decisions, [True] + [False] * 19)
+        # an object enters the scene
+        im = background.copy()
+        im[100:140, 150:190] = 255
+        self.assertTrue(detector.changed(im, t=2.0))
+        self.assertFalse(detector.changed(noisy(rng, im), t=2.1))
+        stats = detector.stats
+        self.assertEqual((stats.frames, stats.published, stats.skipped), (22, 2, 20))
+        self.assertAlmostEqual(stats.skip_ratio, 20 / 22)
+
+    def test_min_changed_fraction(self):
+        im = np.zeros((240, 320), dtype=np.uint8)
+        detector = ChangeDetector(min_changed_fraction=0.1)
+        detector.changed(im, t=0.0)
+        small = im.copy()
+        small[:32, :32] = 255
+        self.assertFalse(detector.changed(small, t=0.1))
+        self.assertGreater(detector.stats.last_score, 0)
+        large = im.copy()
+        large[:120] = 255
+        self.assertTrue(detector.changed(large, t=0.2))
+
+    def test_keyframes(self):
+        im = np.zeros((120, 160, 3), dtype=np.uint8)
+        detector = ChangeDetector(keyframe_interval=1.0)
+        published = [t for t in np.arange(0, 3.05, 0.1) if detector.changed(im, t=round(t, 1))]
+        self.assertEqual([round(t, 1) for t in published], [0.0, 1.0, 2.0, 3.0])
+
+    def test_slow_drift(self):
+        # changes are measured against the last published frame, so a slow drift is eventually published
+        detector = ChangeDetector(threshold=4.0)
+        decisions = [detector.changed(np.full((64, 64), 100 + i, dtype=np.uint8), t=i) for i in range(10)]
+        self.assertEqual(decisions, [True, False, False, False, False, True, False, False, False, False])
+
+    def test_messages(self):
+        rng = np.random.default_rng(1)
+        background = scene()
+        image = Image.from_rgb(background, header=Header(timestamp=1.0))
+        detector = ChangeDetector()
+        self.assertIs(detector.filter(image), image)
+        self.assertIsNone(detector.filter(Image.from_rgb(noisy(rng, background))))
+        # signatures of raw and compressed frames are close
+        compressed = CompressedImage.from_rgb(background, "jpeg", Header.get_default(), quality=90)
+        raw = detector.signature(image)
+        self.assertEqual(detector.signature(compressed).shape, raw.shape)
+        self.assertLess(np.abs(detector.signature(compressed) - raw).mean(), 4.0)
+        # crops are views on the parent buffer
+        crop = image.crop(ROI(x=10, y=10, width=128, height=64))
+        np.testing.assert_allclose(detector.signature(crop),
+                                   ChangeDetector().signature(background[10:74, 10:138]))
+        mono1 = Image.from_mono1(background[:, :, 0])
+        self.assertEqual(detector.signature(mono1).max(), 255)
+
+    def test_scaled_jpeg_decode(self):
+        data = rgb_to_jpeg(np.zeros((240, 320, 3), dtype=np.uint8))
+        self.assertEqual(jpeg_to_rgb(data, 4).shape, (60, 80, 3))
+        with self.assertRaises(ValueError):
+            jpeg_to_rgb(data, 3)
+
+    def test_encoder(self):
+        rng = np.random.default_rng(2)
+        background = scene()
+        encoder = AdaptiveJPEGEncoder(target_bitrate=1e6, fps=10, change_detector=ChangeDetector())
+        out = [encoder.compress(noisy(rng, background), Header(timestamp=i * 0.1)) for i in range(10)]
+        self.assertIsInstance(out[0], CompressedImage)
+        self.assertTrue(all(msg is None for msg in out[1:]))
+        self.assertEqual(encoder.stats.frames, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
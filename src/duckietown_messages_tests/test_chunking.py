@@ -0,0 +1,176 @@
+import importlib
+import random
+import unittest
+import zlib
+
+import numpy as np
+
+from duckietown_messages.geometry_2d.roi import ROI
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.image.chunking import ImageReassembler, split
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestChunking(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.rgb = rng.integers(0, 256, (72, 128, 3), dtype=np.uint8)
+        self.image = Image.from_rgb(self.rgb, Header(timestamp=3.0))
+
+    def test_split(self):
+        info, chunks = split(self.image, chunk_size=128 * 3 * 10, frame=7)
+        self.assertEqual((info.frame, info.rows_per_chunk, info.chunks), (7, 10, 8))
+        self.assertEqual([c.row for c in chunks], list(range(0, 72, 10)))
+        self.assertEqual(len(chunks[-1].data), 2 * 128 * 3)
+        self.assertTrue(all(c.is_valid() for c in chunks))
+        self.assertEqual(b"".join(c.data for c in chunks), self.image.data)
+        # crops are compacted first
+        info, chunks = split(self.image.crop(ROI(x=8, y=8, width=16, height=16)), chunk_size=1)
+        self.assertEqual((info.step, info.chunks), (48, 16))
+
+    def test_reassemble(self):
+        reassembler = ImageReassembler()
+        info, chunks = split(self.image, chunk_size=4096)
+        messages = [info] + chunks
+        random.Random(0).shuffle(messages)
+        out = [reassembler.add(type(m).from_rawdata(m.to_rawdata())) for m in messages]
+        self.assertTrue(all(o is None for o in out[:-1]))
+        image = out[-1]
+        np.testing.assert_array_equal(image.as_rgb(), self.rgb)
+        self.assertEqual(image.header.timestamp, 3.0)
+        self.assertEqual(len(reassembler), 0)
+        self.assertEqual(reassembler.stats.completed, 1)
+        # late duplicates are ignored
+        self.assertIsNone(reassembler.add(chunks[0]))
+        self.assertEqual((reassembler.stats.duplicates, len(reassembler)), (1, 0))
+
+    def test_partial(self):
+        reassembler = ImageReassembler()
+        info, chunks = split(self.image, chunk_size=128 * 3 * 8)
+        reassembler.add(info)
+        for chunk in chunks[:3] + chunks[5:6]:
+            reassembler.add(chunk)
+        reassembler.add(chunks[0])
+        state = reassembler.partial()
+        self.assertAlmostEqual(state.progress, 4 / 9)
+        rows = state.rows()
+        self.assertEqual(rows.sum(), 32)
+        self.assertTrue(rows[:24].all() and rows[40:48].all() and not rows[24:40].any())
+        im = state.image().as_rgb()
+        np.testing.assert_array_equal(im[rows], self.rgb[rows])
+        self.assertFalse(im[~rows].any())
+        self.assertEqual(reassembler.stats.duplicates, 1)
+
+    def test_corrupted(self):
+        reassembler = ImageReassembler()
+        info, chunks = split(self.image, chunk_size=4096)
+        bad = chunks[1].model_copy(update={"data": b"\x00" * len(chunks[1].data)})
+        reassembler.add(info)
+        for chunk in [chunks[0], bad] + chunks[2:]:
+            self.assertIsNone(reassembler.add(chunk))
+        self.assertEqual(reassembler.stats.corrupted, 1)
+        # retransmission
+        self.assertIsNotNone(reassembler.add(chunks[1]))
+
+    def test_misplaced(self):
+        reassembler = ImageReassembler()
+        info, chunks = split(self.image, chunk_size=4096)
+        reassembler.add(info)
+        data = chunks[-1].data + b"\x00" * info.step
+        # valid checksums, but bands out of place or of the wrong size
+        bad = [
+            chunks[1].model_copy(update={"row": info.height - 1}),
+            chunks[-1].model_copy(update={"data": data, "checksum": zlib.crc32(data)}),
+            chunks[0].model_copy(update={"data": b"", "checksum": zlib.crc32(b"")}),
+        ]
+        for chunk in bad:
+            self.assertTrue(chunk.is_valid())
+            self.assertIsNone(reassembler.add(chunk))
+        self.assertEqual(reassembler.stats.corrupted, 3)
+        out = [reassembler.add(chunk) for chunk in chunks]
+        np.testing.assert_array_equal(out[-1].as_rgb(), self.rgb)
+
+    def test_geometry(self):
+        reassembler = ImageReassembler(max_frame_size=self.image.height * self.image.step)
+        info, chunks = split(self.image, chunk_size=4096)
+        huge: int = 1 << 40
+        bad = [
+            info.model_copy(update={"frame": 1, "chunks": 0}),
+            info.model_copy(update={"frame": 2, "chunks": info.chunks - 1}),
+            info.model_copy(update={"frame": 3, "chunks": info.chunks + 1}),
+            # too large
+            info.model_copy(update={"frame": 4, "height": huge, "chunks": -(-huge // info.rows_per_chunk)}),
+        ]
+        for header in bad:
+            reassembler.add(chunks[0].model_copy(update={"frame": header.frame}))
+            self.assertIsNone(reassembler.add(header))
+            # the chunks of rejected frames are dropped
+            self.assertIsNone(reassembler.add(chunks[1].model_copy(update={"frame": header.frame})))
+        self.assertEqual((reassembler.stats.rejected, len(reassembler)), (4, 0))
+        out = [reassembler.add(m) for m in [info] + chunks]
+        np.testing.assert_array_equal(out[-1].as_rgb(), self.rgb)
+
+    def test_frame_ids(self):
+        from duckietown_messages.utils.image import chunking
+        reassembler = ImageReassembler()
+        info, chunks = split(self.image)
+        self.assertEqual(split(self.image)[0].frame, info.frame + 1)
+        self.assertIsNotNone([reassembler.add(m) for m in [info] + chunks][-1])
+        # a restarted publisher numbers its frames from another random value, they are not duplicates
+        importlib.reload(chunking)
+        info, chunks = chunking.split(self.image)
+        self.assertIsNotNone([reassembler.add(m) for m in [info] + chunks][-1])
+        self.assertEqual(reassembler.stats.duplicates, 0)
+
+    def test_timeout(self):
+        clock = Clock()
+        reassembler = ImageReassembler(timeout=0.5, clock=clock)
+        info, chunks = split(self.image, chunk_size=4096)
+        # chunks may arrive before the header
+        reassembler.add(chunks[0])
+        reassembler.add(info)
+        clock.now = 0.6
+        self.assertEqual([s.frame for s in reassembler.expire()], [info.frame])
+        self.assertEqual(len(reassembler), 0)
+        self.assertEqual(reassembler.stats.expired, 1)
+
+    def test_bounded(self):
+        reassembler = ImageReassembler(max_frames=2, max_early_chunks=3)
+        frames = [split(self.image, chunk_size=4096) for _ in range(4)]
+        for info, chunks in frames:
+            reassembler.add(info)
+            reassembler.add(chunks[0])
+        self.assertEqual(len(reassembler), 2)
+        self.assertEqual(reassembler.stats.evicted, 2)
+        self.assertEqual(reassembler.partial().frame, frames[-1][0].frame)
+        self.assertIsNone(reassembler.partial(frames[0][0].frame))
+        for chunk in frames[0][1] * 2:
+            reassembler.add(chunk)
+        self.assertEqual(len(reassembler.partial(frames[0][0].frame).early), 3)
+
+    def test_mono1(self):
+        mono = (np.random.default_rng(1).random((30, 21)) > 0.5).astype(np.uint8)
+        image = Image.from_np(mono, "mono1")
+        info, chunks = split(image, chunk_size=10)
+        self.assertEqual((info.step, info.rows_per_chunk), (3, 3))
+        reassembler = ImageReassembler()
+        out = [reassembler.add(m) for m in [info] + chunks][-1]
+        np.testing.assert_array_equal(out.as_array(), mono)
+        # empty images
+        empty, none = split(Image.from_rgb(np.zeros((0, 4, 3), dtype=np.uint8)))
+        self.assertEqual(none, [])
+        self.assertEqual(ImageReassembler().add(empty).height, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from typing import List, Optional
+
+import numpy as np
+from dtps_http import RawData, MIME_CBOR
+
+from duckietown_messages.actuators.car_lights import CarLights
+from duckietown_messages.base import BaseMessage
+from duckietown_messages.colors.rgba import RGBA
+from duckietown_messages.geometry_3d.position import Position
+from duckietown_messages.geometry_3d.transformation import Transformation
+from duckietown_messages.standard.header import Header, AUTO
+from duckietown_messages.utils.compact import MIME_CBOR_COMPACT, nested_fields
+
+
+class _Point(Position):
+    inherit_header = True
+
+
+class _Path(BaseMessage):
+    header: Header = AUTO
+    origin: Optional[_Point] = None
+    points: List[_Point] = []
+
+
+def _native(rd: RawData) -> dict:
+    return RawData(content=rd.content, content_type=MIME_CBOR).get_as_native_object()
+
+
+class TestCompact(unittest.TestCase):
+
+    def test_default_headers_omitted(self):
+        color = RGBA(r=1, g=0, b=0, a=1)
+        msg = CarLights(header=Header(timestamp=1.0), front_left=color, front_right=color,
+                        back_left=color, back_right=color)
+        rd = msg.to_rawdata("compact")
+        self.assertEqual(rd.content_type, MIME_CBOR_COMPACT)
+        native = _native(rd)
+        self.assertEqual(native["header"]["timestamp"], 1.0)
+        self.assertNotIn("header", native["front_left"])
+        self.assertLess(len(rd.content), len(msg.to_rawdata().content))
+        self.assertEqual(CarLights.from_rawdata(rd), msg)
+
+    def test_custom_nested_header_kept(self):
+        msg = Transformation.from_pq(np.array([1, 2, 3, 0, 0, 0, 1.0]))
+        msg.position.header = Header(frame="map")
+        native = _native(msg.to_rawdata("compact"))
+        self.assertNotIn("header", native)
+        self.assertEqual(native["position"]["header"]["frame"], "map")
+        self.assertNotIn("header", native["rotation"])
+        self.assertEqual(Transformation.from_rawdata(msg.to_rawdata("compact")), msg)
+
+    def test_inherit_header(self):
+        header = Header(frame="map", timestamp=2.0)
+        msg = _Path(header=header, origin=_Point(header=header, x=0, y=0, z=0),
+                    points=[_Point(header=header, x=i, y=0, z=0) for i in range(3)])
+        rd = msg.to_rawdata("compact")
+        native = _native(rd)
+        self.assertNotIn("header", native["origin"])
+        self.assertTrue(all("header" not in p for p in native["points"]))
+        decoded = _Path.from_rawdata(rd)
+        self.assertEqual(decoded, msg)
+        self.assertEqual(decoded.points[2].header, header)
+
+    def test_inherit_header_lossless(self):
+        # a default header differing from the parent one must travel
+        header = Header(frame="map")
+        msg = _Path(header=header, points=[_Point(x=0, y=0, z=0), _Point(header=header, x=1, y=0, z=0)])
+        native = _native(msg.to_rawdata("compact"))
+        self.assertIn("header", native["points"][0])
+        self.assertNotIn("header", native["points"][1])
+        self.assertEqual(_Path.from_rawdata(msg.to_rawdata("compact")), msg)
+
+    def test_nested_fields(self):
+        self.assertEqual(nested_fields(_Path), (("origin", _Point, False), ("points", _Point, True)))
+        self.assertEqual(nested_fields(Position), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,157 @@
+import socket
+import socketserver
+import threading
+import unittest
+from urllib.parse import urlparse
+
+from duckietown_messages.network.dtps.context import DTPSContextMsg
+from duckietown_messages.network.dtps.pool import ContextPool
+from duckietown_messages.simulation.hil.connection.configuration import HILConnectionConfiguration
+
+
+class EchoHandler(socketserver.BaseRequestHandler):
+
+    def handle(self):
+        while True:
+            data = self.request.recv(1024)
+            if not data:
+                break
+            self.request.sendall(data)
+
+
+def connect(context: DTPSContextMsg) -> socket.socket:
+    url = urlparse(context.urls[0])
+    return socket.create_connection((url.hostname, url.port), timeout=5)
+
+
+class TestContextKey(unittest.TestCase):
+
+    def test_equivalent(self):
+        a = DTPSContextMsg(name="sim", urls=["http://b/", "http://a/"], path="/topic/")
+        b = DTPSContextMsg(name="sim", urls=["http://a/", "http://b/", "http://a/"], path="topic")
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertEqual(len({a, b}), 1)
+        self.assertNotEqual(a, DTPSContextMsg(name="other", urls=["http://a/", "http://b/"], path="topic"))
+        self.assertEqual(DTPSContextMsg(name="sim"), DTPSContextMsg(name="sim", urls=[], path="/"))
+        # the key follows assignments
+        a.path = "other"
+        self.assertNotEqual(a, b)
+        self.assertEqual(a.key, ("sim", ("http://a/", "http://b/"), "other"))
+        # and survives serialization
+        self.assertEqual(DTPSContextMsg.from_rawdata(b.to_rawdata()), b)
+
+    def test_copy(self):
+        a = DTPSContextMsg(name="a", urls=["http://x"])
+        self.assertEqual(a.key, ("a", ("http://x",), ""))
+        b = a.model_copy(update={"name": "b", "urls": ["http://y"]})
+        self.assertEqual(b.key, ("b", ("http://y",), ""))
+        self.assertNotEqual(a, b)
+        self.assertNotEqual(hash(a), hash(b))
+        self.assertEqual(a.model_copy(), a)
+        self.assertEqual(a.model_copy(update={"path": "/"}, deep=True), a)
+
+    def test_configuration(self):
+        a = HILConnectionConfiguration(agent_name="bot", simulator=DTPSContextMsg(name="s", urls=["1", "2"]))
+        b = HILConnectionConfiguration(agent_name="bot", simulator=DTPSContextMsg(name="s", urls=["2", "1"]))
+        self.assertEqual(a, b)
+        self.assertEqual({a: 1}[b], 1)
+        self.assertNotEqual(a, HILConnectionConfiguration(agent_name="bot"))
+        self.assertEqual(hash(HILConnectionConfiguration(agent_name="bot")),
+                         hash(HILConnectionConfiguration(agent_name="bot", simulator=None)))
+
+
+class TestContextPool(unittest.TestCase):
+
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), EchoHandler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def context(self, name: str, path: str = "") -> DTPSContextMsg:
+        return DTPSContextMsg(name=name, urls=[f"http://127.0.0.1:{self.port}/"], path=path)
+
+    def test_reuse(self):
+        with ContextPool(connect, close=socket.socket.close) as pool:
+            first = self.context("sim", "/a/")
+            conn = pool.get(first)
+            conn.sendall(b"ping")
+            self.assertEqual(conn.recv(4), b"ping")
+            # an equivalent context shares the connection and resolves to the first instance
+            other = self.context("sim", "a")
+            self.assertIs(pool.get(other), conn)
+            self.assertIs(pool.resolve(other), first)
+            self.assertIn(other, pool)
+            self.assertEqual((pool.stats.hits, pool.stats.misses), (1, 1))
+            # a discarded connection is closed and opened again on demand
+            pool.discard(other)
+            self.assertEqual(conn.fileno(), -1)
+            self.assertIsNot(pool.get(first), conn)
+        self.assertEqual(len(pool), 0)
+
+    def test_bounded(self):
+        closed = []
+
+        def close(conn):
+            closed.append(conn)
+            conn.close()
+
+        pool = ContextPool(connect, close=close, maxsize=2)
+        a, b, c = (pool.get(self.context(name)) for name in "abc")
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(closed, [a])
+        self.assertEqual(pool.stats.evictions, 1)
+        # the least recently used connection is evicted
+        pool.get(self.context("b"))
+        pool.get(self.context("a"))
+        self.assertEqual(closed, [a, c])
+        pool.close()
+        self.assertEqual(len(closed), 4)
+        with self.assertRaises(ValueError):
+            ContextPool(connect, maxsize=0)
+
+    def test_bounded_contexts(self):
+        pool = ContextPool(lambda context: object(), maxsize=2)
+        for i in range(10):
+            pool.get(self.context(str(i)))
+        self.assertEqual(len(pool._contexts), 2)
+        evicted = self.context("0")
+        self.assertIs(pool.resolve(evicted), evicted)
+        pool.discard(self.context("9"))
+        self.assertEqual(len(pool._contexts), 1)
+
+    def test_slow_connect(self):
+        # both requests for the "slow" context are connecting at once
+        entered, release = threading.Barrier(3), threading.Event()
+        closed = []
+
+        def slow(context):
+            if context.name == "slow":
+                entered.wait(5)
+                release.wait(5)
+            return object()
+
+        pool = ContextPool(slow, close=closed.append)
+        fast = pool.get(self.context("fast"))
+        threads = [threading.Thread(target=pool.get, args=(self.context("slow"),)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        entered.wait(5)
+        # other contexts are served while a connection is being opened
+        self.assertIs(pool.get(self.context("fast")), fast)
+        release.set()
+        for thread in threads:
+            thread.join()
+        # concurrent requests for the same context end up with a single connection, the other one is closed
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(len(closed), 1)
+        self.assertIsNot(closed[0], pool.get(self.context("slow")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+
+import numpy as np
+from dtps_http import RawData, MIME_CBOR
+
+from duckietown_messages.sensors.compressed_image import CompressedImage
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.sensors.imu import Imu
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.decimation import Decimator, EveryNth, KeyframeAware, RateLimit, \
+    TopicDecimator, peek, peek_timestamp
+from duckietown_messages.utils.samples import all_message_classes, sample
+
+
+class _Clock:
+
+    def __init__(self, t: float = 0.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def _image(t, keyframe: bool = False) -> RawData:
+    header = Header(timestamp=t, txt={"keyframe": True} if keyframe else None)
+    return Image.from_rgb(np.zeros((4, 4, 3), dtype=np.uint8), header).to_rawdata()
+
+
+def _imu(t) -> RawData:
+    return Imu(header=Header(timestamp=t)).to_rawdata()
+
+
+class TestPeek(unittest.TestCase):
+
+    def test_timestamp(self):
+        rgb = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
+        self.assertEqual(peek_timestamp(Image.from_rgb(rgb, Header(timestamp=12.5)).to_rawdata()), 12.5)
+        self.assertEqual(peek_timestamp(_imu(3)), 3.0)
+        self.assertIsNone(peek_timestamp(Imu().to_rawdata()))
+        self.assertIsNone(peek_timestamp(Imu(header=Header(timestamp=1.0)).to_rawdata("json")))
+        self.assertEqual(peek_timestamp(Imu(header=Header(timestamp=1.0)).to_rawdata("compact")), 1.0)
+
+    def test_all_classes(self):
+        for cls in all_message_classes():
+            msg = sample(cls)
+            if "header" not in cls.model_fields:
+                continue
+            with self.subTest(cls=cls.__name__):
+                msg = msg.model_copy(update={"header": msg.header.model_copy(update={"timestamp": 1234.5})})
+                self.assertEqual(peek_timestamp(msg.to_rawdata()), 1234.5)
+
+    def test_values(self):
+        rd = CompressedImage(header=Header(frame="cam", txt={"n": -3, "ok": True}), format="jpeg",
+                             data=b"\x00" * 100).to_rawdata()
+        self.assertEqual(peek(rd, ("format",)), "jpeg")
+        self.assertEqual(peek(rd, ("header", "frame")), "cam")
+        self.assertEqual(peek(rd, ("header", "txt", "n")), -3)
+        self.assertIs(peek(rd, ("header", "txt", "ok")), True)
+        # not a scalar, missing, or through a scalar
+        self.assertIsNone(peek(rd, ("header",)))
+        self.assertIsNone(peek(rd, ("header", "nope")))
+        self.assertIsNone(peek(rd, ("format", "x")))
+
+    def test_malformed(self):
+        rd = _imu(1.0)
+        self.assertIsNone(peek_timestamp(RawData(content=rd.content[:10], content_type=MIME_CBOR)))
+        self.assertIsNone(peek_timestamp(RawData(content=b"\xf6", content_type=MIME_CBOR)))
+
+
+class TestDecimation(unittest.TestCase):
+
+    def test_every_nth(self):
+        d = EveryNth(3, offset=1)
+        kept = [i for i in range(10) if d.keep(_imu(i))]
+        self.assertEqual(kept, [1, 4, 7])
+        self.assertEqual((d.stats.seen, d.stats.kept, d.stats.dropped), (10, 3, 7))
+        with self.assertRaises(ValueError):
+            EveryNth(0)
+        # subclasses must implement `_keep`
+        with self.assertRaises(TypeError):
+            Decimator()
+
+    def test_rate_by_header(self):
+        d = RateLimit(10, by="header")
+        # 30 Hz with jitter
+        rng = np.random.default_rng(0)
+        stamps = [i / 30 + rng.uniform(-0.002, 0.002) for i in range(300)]
+        kept = [t for t in stamps if d.keep(_imu(t))]
+        self.assertEqual(len(kept), 100)
+        # early messages do not raise the rate of a 1 kHz input (kept at 0, 0.09, 0.19, ..., 9.99)
+        d = RateLimit(10, by="header")
+        self.assertEqual(sum(d.keep(_imu(i / 1000)) for i in range(10000)), 101)
+
+    def test_rate_restart(self):
+        d = RateLimit(1, by="header")
+        self.assertEqual([d.keep(_imu(t)) for t in [100.0, 100.5, 101.0, 5.0, 5.5]],
+                         [True, False, True, True, False])
+
+    def test_rate_by_arrival(self):
+        clock = _Clock()
+        d = RateLimit(2, by="arrival", clock=clock)
+        kept = []
+        for i in range(20):
+            clock.t = i * 0.1
+            # header times are ignored
+            kept.append(d.keep(_imu(0.0)))
+        self.assertEqual(sum(kept), 4)
+
+    def test_missing_timestamp(self):
+        clock = _Clock()
+        d = RateLimit(1, clock=clock)
+        self.assertTrue(d.keep(Imu().to_rawdata()))
+        self.assertFalse(d.keep(Imu().to_rawdata()))
+        clock.t = 1.0
+        self.assertTrue(d.keep(Imu().to_rawdata()))
+        self.assertEqual(d.stats.missing, 3)
+
+    def test_keyframes(self):
+        d = KeyframeAware(RateLimit(1))
+        kept = [t for t in np.arange(0, 3, 0.25) if d.keep(_image(t, keyframe=t in (1.25, 2.5)))]
+        self.assertEqual(kept, [0.0, 1.0, 1.25, 2.25, 2.5])
+        self.assertEqual(d.stats.keyframes, 2)
+        d = KeyframeAware(EveryNth(4))
+        kept = [i for i in range(8) if d.keep(_image(i, keyframe=i == 2))]
+        self.assertEqual(kept, [0, 2, 5])
+
+    def test_decode(self):
+        d = EveryNth(2)
+        msgs = [d.decode(Imu, _imu(i)) for i in range(4)]
+        self.assertEqual([m is not None for m in msgs], [True, False, True, False])
+        self.assertEqual(len(list(EveryNth(2).filter(_imu(i) for i in range(5)))), 3)
+
+    def test_topics(self):
+        topics = TopicDecimator(lambda topic: EveryNth(5) if topic == "camera" else None)
+        kept = [topics.keep(topic, _imu(i)) for i in range(10) for topic in ("camera", "imu")]
+        self.assertEqual(sum(kept), 12)
+        self.assertEqual(list(topics.stats), ["camera"])
+        self.assertEqual(topics.stats["camera"].dropped, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
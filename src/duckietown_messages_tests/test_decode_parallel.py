@@ -0,0 +1,55 @@
+import unittest
+
+import numpy as np
+from dtps_http import RawData
+
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.sensors.temperature import Temperature
+from duckietown_messages.utils.exceptions import DataDecodingError
+
+
+class TestDecodeParallel(unittest.TestCase):
+
+    def test_in_order(self):
+        payloads = [Temperature(data=float(i)).to_rawdata() for i in range(1000)]
+        out = list(Temperature.decode_parallel(payloads, workers=3, chunksize=17, max_pending=2))
+        self.assertEqual([m.data for m in out], [float(i) for i in range(1000)])
+
+    def test_serial_fallback(self):
+        payloads = [Temperature(data=float(i)).to_rawdata() for i in range(10)]
+        out = list(Temperature.decode_parallel(payloads, workers=1))
+        self.assertEqual([m.data for m in out], [float(i) for i in range(10)])
+
+    def test_lazy_input(self):
+        consumed = []
+
+        def payloads():
+            for i in range(10000):
+                consumed.append(i)
+                yield Temperature(data=float(i)).to_rawdata()
+
+        stream = Temperature.decode_parallel(payloads(), workers=2, chunksize=10, max_pending=2)
+        self.assertEqual(next(stream).data, 0.0)
+        # backpressure: only the chunks in flight have been read from the input
+        self.assertLessEqual(len(consumed), 30)
+        stream.close()
+
+    def test_images_through_shared_memory(self):
+        rng = np.random.default_rng(0)
+        frames = [rng.integers(0, 256, (240, 320, 3), dtype=np.uint8) for _ in range(6)]
+        payloads = [Image.from_rgb(f).to_rawdata() for f in frames]
+        out = list(Image.decode_parallel(payloads, workers=2, chunksize=2))
+        for frame, msg in zip(frames, out):
+            np.testing.assert_array_equal(msg.as_rgb(), frame)
+
+    def test_error_in_order(self):
+        payloads = [Temperature(data=float(i)).to_rawdata() for i in range(10)]
+        payloads[5] = RawData.cbor_from_native_object({"data": "hot"})
+        stream = Temperature.decode_parallel(payloads, workers=2, chunksize=4)
+        self.assertEqual([next(stream).data for _ in range(5)], [0.0, 1.0, 2.0, 3.0, 4.0])
+        with self.assertRaises(DataDecodingError):
+            next(stream)
+
+
+if __name__ == '__main__':
+    unittest.main()
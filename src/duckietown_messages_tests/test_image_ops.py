@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+from duckietown_messages.geometry_2d.roi import ROI
+from duckietown_messages.sensors.image import Image
+
+
+class TestImageOps(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.rgb = rng.integers(0, 256, (48, 64, 3), dtype=np.uint8)
+        self.mono = rng.integers(0, 256, (48, 64), dtype=np.uint8)
+
+    def test_crop_shares_buffer(self):
+        img = Image.from_rgb(self.rgb)
+        crop = img.crop(ROI(x=8, y=24, width=32, height=24))
+        self.assertIs(crop.data, img.data)
+        self.assertEqual(crop.step, img.step)
+        np.testing.assert_array_equal(crop.as_rgb(), self.rgb[24:48, 8:40])
+
+    def test_crop_of_crop(self):
+        img = Image.from_mono8(self.mono)
+        crop = img.crop(ROI(x=4, y=4, width=40, height=40)).crop(ROI(x=2, y=3, width=10, height=5))
+        np.testing.assert_array_equal(crop.as_mono8(), self.mono[7:12, 6:16])
+
+    def test_crop_out_of_bounds(self):
+        img = Image.from_rgb(self.rgb)
+        with self.assertRaises(ValueError):
+            img.crop(ROI(x=60, y=0, width=10, height=10))
+
+    def test_crop_mono1(self):
+        img = Image.from_mono1(self.mono)
+        crop = img.crop(ROI(x=3, y=5, width=16, height=8))
+        np.testing.assert_array_equal(crop.as_array(), (self.mono[5:13, 3:19] > 125).astype(np.uint8))
+
+    def test_compact(self):
+        img = Image.from_rgb(self.rgb)
+        self.assertIs(img.compact(), img)
+        crop = img.crop(ROI(x=8, y=8, width=16, height=16)).compact()
+        self.assertEqual(crop.offset, 0)
+        self.assertEqual(len(crop.data), 16 * 16 * 3)
+        np.testing.assert_array_equal(crop.as_rgb(), self.rgb[8:24, 8:24])
+
+    def test_downsample(self):
+        img = Image.from_rgb(self.rgb).downsample(4)
+        self.assertEqual((img.width, img.height, img.encoding), (16, 12, "rgb8"))
+        expected = self.rgb.reshape(12, 4, 16, 4, 3).astype(np.float64).mean(axis=(1, 3))
+        self.assertLessEqual(np.abs(img.as_rgb().astype(np.float64) - expected).max(), 0.5)
+
+    def test_downsample_mono1(self):
+        img = Image.from_mono1(self.mono).downsample(2)
+        self.assertEqual((img.width, img.height), (32, 24))
+        self.assertTrue(set(np.unique(img.as_array())) <= {0, 1})
+
+    def test_resize(self):
+        img = Image.from_rgb(self.rgb).resize(16, 12)
+        np.testing.assert_array_equal(img.as_rgb(), self.rgb[2::4, 2::4])
+        up = Image.from_mono8(self.mono).resize(128, 96)
+        np.testing.assert_array_equal(up.as_mono8(), np.repeat(np.repeat(self.mono, 2, 0), 2, 1))
+
+    def test_short_buffer(self):
+        img = Image(width=100, height=100, encoding="rgb8", step=300, offset=10, data=bytes(30),
+                    is_bigendian=False)
+        with self.assertRaises(ValueError):
+            img.as_rgb()
+        # the last row does not need to be padded to `step`
+        crop = Image.from_rgb(self.rgb).crop(ROI(x=0, y=0, width=8, height=48))
+        np.testing.assert_array_equal(crop.compact().as_rgb(), self.rgb[:, :8])
+        with self.assertRaises(ValueError):
+            crop.model_copy(update={"offset": 64 * 3 - 8 * 3 + 1}).as_rgb()
+        for step in (0, 8):
+            mono1 = Image(width=64, height=48, encoding="mono1", step=step, data=bytes(100),
+                          is_bigendian=False)
+            with self.assertRaises(ValueError):
+                mono1.as_array()
+
+
+if __name__ == '__main__':
+    unittest.main()
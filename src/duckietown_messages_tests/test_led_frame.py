@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+
+from duckietown_messages.actuators.car_lights import CarLights
+from duckietown_messages.actuators.led_frame import LEDFrame, dequantize, gamma_table, quantize
+from duckietown_messages.actuators.leds import LEDs
+from duckietown_messages.colors.rgba import RGBA
+from duckietown_messages.standard.header import Header
+
+
+class TestLEDFrame(unittest.TestCase):
+
+    def test_quantization(self):
+        for resolution in (1, 4, 8, 10, 16):
+            levels = (1 << resolution) - 1
+            values = np.linspace(0, 1, 1000)
+            q = quantize(values, resolution)
+            self.assertEqual(q.dtype.itemsize, 1 if resolution <= 8 else 2)
+            self.assertEqual((q.min(), q.max()), (0, levels))
+            self.assertLessEqual(np.abs(dequantize(q, resolution) - values).max(), 0.5 / levels + 1e-6)
+        np.testing.assert_array_equal(quantize(np.array([-1.0, 2.0]), 8), [0, 255])
+
+    def test_roundtrip(self):
+        rng = np.random.default_rng(0)
+        values = rng.random((144, 3))
+        for resolution in (8, 12):
+            frame = LEDFrame.from_float(values, resolution=resolution, header=Header(timestamp=1.0))
+            self.assertEqual(len(frame.data), 144 * 3 * (1 if resolution == 8 else 2))
+            decoded = LEDFrame.from_rawdata(frame.to_rawdata())
+            np.testing.assert_array_equal(decoded.as_array(), frame.as_array())
+            np.testing.assert_allclose(decoded.as_float(), values, atol=0.5 / ((1 << resolution) - 1) + 1e-6)
+        self.assertFalse(frame.as_array().flags.writeable)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            LEDFrame.from_array(np.array([[256, 0, 0]]), resolution=8)
+        with self.assertRaises(ValueError):
+            LEDFrame.from_array(np.zeros(3, dtype=np.uint8))
+        frame = LEDFrame(quantity=2, colors=3, resolution=8, data=b"\x00" * 5)
+        with self.assertRaises(ValueError):
+            frame.as_array()
+
+    def test_gamma(self):
+        table = gamma_table(8, 2.2)
+        self.assertEqual((table[0], table[255]), (0, 255))
+        self.assertTrue(np.all(np.diff(table.astype(int)) >= 0))
+        self.assertIs(gamma_table(8, 2.2), table)
+        frame = LEDFrame.from_float(np.full((10, 3), 0.5))
+        corrected = frame.apply_gamma(2.2)
+        np.testing.assert_array_equal(corrected.as_array(), table[128])
+        direct = LEDFrame.from_float(np.full((10, 3), 0.5), gamma=2.2)
+        self.assertLessEqual(np.abs(direct.as_array().astype(int) - corrected.as_array()).max(), 1)
+
+    def test_for_leds(self):
+        leds = LEDs(name="strip", type="leds", simulated=True, addressable=True, quantity=144, colors=3,
+                    resolution=10)
+        frame = LEDFrame.for_leds(leds, np.ones((144, 3)))
+        self.assertEqual((frame.quantity, frame.colors, frame.resolution), (144, 3, 10))
+        self.assertEqual(int(frame.as_array().max()), 1023)
+        with self.assertRaises(ValueError):
+            LEDFrame.for_leds(leds, np.ones((10, 3)))
+
+    def test_car_lights(self):
+        lights = CarLights(
+            header=Header(timestamp=2.0),
+            front_left=RGBA(r=1, g=0, b=0, a=1),
+            front_right=RGBA(r=0, g=1, b=0, a=1),
+            back_left=RGBA(r=0, g=0, b=1, a=0.5),
+            back_right=RGBA(r=0.2, g=0.4, b=0.6, a=0),
+        )
+        frame = LEDFrame.from_car_lights(lights)
+        self.assertEqual((frame.quantity, frame.colors), (4, 4))
+        self.assertEqual(frame.header.timestamp, 2.0)
+        np.testing.assert_array_equal(frame.as_array()[0], [255, 0, 0, 255])
+        back = frame.to_car_lights()
+        self.assertEqual(back.front_right.g, 1.0)
+        self.assertAlmostEqual(back.back_left.a, 0.5, delta=1 / 255)
+        self.assertAlmostEqual(back.back_right.b, 0.6, delta=1 / 255)
+        # RGB frames are opaque
+        rgb = LEDFrame.from_float(np.zeros((4, 3)))
+        self.assertEqual(rgb.to_car_lights().back_right.a, 1.0)
+        with self.assertRaises(ValueError):
+            LEDFrame.from_float(np.zeros((3, 3))).to_car_lights()
+
+
+if __name__ == '__main__':
+    unittest.main()
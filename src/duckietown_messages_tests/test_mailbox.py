@@ -0,0 +1,142 @@
+import threading
+import unittest
+
+from duckietown_messages.actuators.differential_pwm import DifferentialPWM
+from duckietown_messages.actuators.drone_control import DroneControl
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.mailbox import Mailbox, PriorityMux
+
+
+class _Clock:
+
+    def __init__(self, t: float = 100.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+
+def _cmd(t: float, v: float = 0.0) -> DifferentialPWM:
+    return DifferentialPWM(header=Header(timestamp=t), left=v, right=v)
+
+
+class TestMailbox(unittest.TestCase):
+
+    def test_latest_value(self):
+        box = Mailbox()
+        self.assertIsNone(box.take())
+        for i in range(5):
+            box.put(_cmd(i, i / 10))
+        self.assertEqual(box.peek().left, 0.4)
+        self.assertEqual(box.take().left, 0.4)
+        self.assertIsNone(box.take())
+        self.assertEqual(box.peek().left, 0.4)
+        self.assertEqual((box.stats.puts, box.stats.takes, box.stats.overwritten), (5, 1, 4))
+
+    def test_concurrent_writers(self):
+        box = Mailbox()
+
+        def write(k):
+            for i in range(1000):
+                box.put(_cmd(i, k / 10))
+
+        threads = [threading.Thread(target=write, args=(k,)) for k in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(box.stats.puts, 4000)
+        self.assertIsNotNone(box.take())
+
+
+class TestPriorityMux(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        self.mux = PriorityMux(clock=self.clock)
+        self.mux.add_source("safety", priority=2, timeout=0.5)
+        self.mux.add_source("joystick", priority=1, timeout=0.5)
+        self.mux.add_source("autopilot", priority=0, timeout=0.2)
+
+    def test_priority(self):
+        mux = self.mux
+        self.assertIsNone(mux.current())
+        mux.put("autopilot", _cmd(100.0, 0.3))
+        self.assertEqual(mux.select()[0], "autopilot")
+        mux.put("joystick", _cmd(100.0, 0.5))
+        self.assertEqual(mux.current().left, 0.5)
+        # lower priority commands do not take over
+        mux.put("autopilot", _cmd(100.0, 0.1))
+        self.assertEqual(mux.selected, "joystick")
+        self.assertEqual(mux.current().left, 0.5)
+        mux.put("safety", _cmd(100.0, 0.0))
+        self.assertEqual(mux.select()[0], "safety")
+
+    def test_timeouts(self):
+        mux = self.mux
+        mux.put("joystick", _cmd(100.0, 0.5))
+        mux.put("autopilot", _cmd(100.1, 0.3))
+        self.clock.t = 100.49
+        self.assertEqual(mux.select()[0], "joystick")
+        # both commands are stale
+        self.clock.t = 100.5
+        self.assertIsNone(mux.current())
+        self.assertIsNone(mux.selected)
+        self.assertEqual(mux.current(default=_cmd(0.0)).header.timestamp, 0.0)
+
+    def test_fallback(self):
+        mux = self.mux
+        mux.put("joystick", _cmd(100.0, 0.5))
+        mux.put("autopilot", _cmd(100.4, 0.3))
+        self.clock.t = 100.55
+        self.assertEqual(mux.select(), ("autopilot", mux.mailboxes["autopilot"].peek()))
+        self.assertEqual(mux.stats.switches, 1)
+
+    def test_dropped(self):
+        mux = self.mux
+        self.assertFalse(mux.put("joystick", _cmd(99.0)))
+        self.assertTrue(mux.put("joystick", _cmd(100.0, 0.5)))
+        self.assertFalse(mux.put("joystick", _cmd(99.9, 0.1)))
+        self.assertEqual(mux.current().left, 0.5)
+        self.assertEqual((mux.stats.received, mux.stats.expired, mux.stats.out_of_order), (3, 1, 1))
+
+    def test_missing_timestamp(self):
+        self.mux.put("joystick", DifferentialPWM(left=0.2, right=0.2))
+        self.assertEqual(self.mux.current().left, 0.2)
+        self.clock.t += 0.5
+        self.assertIsNone(self.mux.current())
+
+    def test_headerless_commands(self):
+        mux = PriorityMux(clock=self.clock)
+        mux.add_source("safety", priority=1, timeout=0.5)
+        mux.add_source("autopilot", priority=0, timeout=0.5)
+        self.assertTrue(mux.put("autopilot", DroneControl(roll=1500, pitch=1500, yaw=1500, throttle=1200)))
+        self.assertEqual(mux.select()[0], "autopilot")
+        self.clock.t += 0.25
+        self.assertTrue(mux.put("safety", DroneControl(roll=1500, pitch=1500, yaw=1500, throttle=1000)))
+        self.assertEqual(mux.current().throttle, 1000)
+        # arrival times are used as timestamps
+        self.clock.t += 0.5
+        self.assertIsNone(mux.current())
+
+    def test_clear(self):
+        self.mux.put("safety", _cmd(100.0))
+        self.mux.put("joystick", _cmd(100.0, 0.5))
+        self.mux.clear("safety")
+        self.assertEqual(self.mux.select()[0], "joystick")
+        self.mux.clear()
+        self.assertIsNone(self.mux.current())
+
+    def test_invalid_sources(self):
+        with self.assertRaises(ValueError):
+            self.mux.add_source("joystick", priority=5, timeout=1.0)
+        with self.assertRaises(ValueError):
+            self.mux.add_source("other", priority=1, timeout=1.0)
+        with self.assertRaises(ValueError):
+            self.mux.add_source("other", priority=5, timeout=0.0)
+        with self.assertRaises(KeyError):
+            self.mux.put("other", _cmd(100.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
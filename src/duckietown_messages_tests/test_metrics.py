@@ -0,0 +1,70 @@
+import unittest
+
+from dtps_http import RawData
+
+from duckietown_messages.sensors.temperature import Temperature
+from duckietown_messages.utils.exceptions import DataDecodingError
+from duckietown_messages.utils.metrics import Metrics
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        Metrics.reset()
+
+    def tearDown(self):
+        Metrics.disable()
+        Metrics.reset()
+
+    def test_disabled_records_nothing(self):
+        Temperature.from_rawdata(Temperature(data=21.0).to_rawdata())
+        self.assertEqual(Metrics.snapshot(), {})
+
+    def test_counters(self):
+        Metrics.enable()
+        rd = Temperature(data=21.0).to_rawdata()
+        Temperature.from_rawdata(rd)
+        with self.assertRaises(DataDecodingError):
+            Temperature.from_rawdata(RawData.cbor_from_native_object({"data": "hot"}))
+        stats = Metrics.snapshot()["Temperature"]
+        self.assertEqual(stats["operations"]["encode"]["count"], 1)
+        self.assertEqual(stats["operations"]["decode"]["count"], 2)
+        self.assertEqual(stats["operations"]["validate"]["count"], 2)
+        self.assertEqual(stats["operations"]["validate"]["failures"], 1)
+        self.assertEqual(stats["validation_failures"], 1)
+        self.assertEqual(stats["bytes_out"], len(rd.content))
+        self.assertGreaterEqual(stats["operations"]["construct"]["count"], 3)
+        self.assertEqual(sum(stats["operations"]["decode"]["buckets"].values()), 2)
+
+    def test_constructor_timing_is_removed(self):
+        Metrics.enable()
+        Metrics.disable()
+        Temperature(data=1.0)
+        self.assertEqual(Metrics.snapshot(), {})
+
+    def test_hooks(self):
+        calls = []
+        pre = lambda name, op: calls.append(("pre", name, op))
+        post = lambda name, op, ns: calls.append(("post", name, op))
+        Metrics.add_hook(pre=pre, post=post)
+        try:
+            Metrics.enable()
+            Temperature(data=1.0).to_rawdata()
+        finally:
+            Metrics.remove_hook(pre=pre, post=post)
+        self.assertIn(("pre", "Temperature", "encode"), calls)
+        self.assertIn(("post", "Temperature", "encode"), calls)
+
+    def test_prometheus(self):
+        Metrics.enable()
+        Temperature(data=21.0).to_rawdata()
+        txt = Metrics.to_prometheus()
+        self.assertIn('duckietown_messages_operation_seconds_bucket{message="Temperature",'
+                      'operation="encode",le="+Inf"} 1', txt)
+        self.assertIn('duckietown_messages_operation_seconds_count{message="Temperature",'
+                      'operation="encode"} 1', txt)
+        self.assertIn("# TYPE duckietown_messages_bytes_out_total counter", txt)
+
+
+if __name__ == '__main__':
+    unittest.main()
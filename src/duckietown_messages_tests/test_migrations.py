@@ -0,0 +1,139 @@
+import json
+import unittest
+from typing import Optional
+
+from dtps_http import RawData
+
+from duckietown_messages.base import BaseMessage
+from duckietown_messages.standard.header import Header, AUTO
+from duckietown_messages.utils.exceptions import BatchDecodingError, DataDecodingError
+from duckietown_messages.utils.migrations import Migrations, migration
+from duckietown_messages.utils.serialization import Serializers
+
+
+class Distance(BaseMessage):
+    # 1.0: {"data": float}, 1.1: {"distance": float}, 2.0: {"distance": float, "unit": str}
+    header: Header = AUTO
+    distance: Optional[float] = None
+    unit: str
+
+
+def payload(version: Optional[str], **fields) -> RawData:
+    native = dict(fields)
+    if version is not None:
+        native["header"] = {"version": version}
+    return RawData.cbor_from_native_object(native)
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        @migration(Distance, "1.0", "1.1")
+        def _1_1(native):
+            self.calls.append("1.1")
+            native["distance"] = native.pop("data")
+            return native
+
+        @migration(Distance, "1.1", "2.0")
+        def _2_0(native):
+            self.calls.append("2.0")
+            native["unit"] = "m"
+            return native
+
+    def tearDown(self):
+        Migrations.unregister(Distance)
+
+    def test_upgrade(self):
+        self.assertEqual(Migrations.current(Distance), "2.0")
+        for rd in (payload("1.0", data=1.5), payload(None, data=1.5)):
+            msg = Distance.from_rawdata(rd)
+            self.assertEqual((msg.distance, msg.unit, msg.header.version), (1.5, "m", "2.0"))
+        self.assertEqual(Distance.from_rawdata(payload("1.1", distance=2.0)).unit, "m")
+        self.assertEqual(self.calls, ["1.1", "2.0", "1.1", "2.0", "2.0"])
+
+    def test_current_version(self):
+        # nothing happens at the current version, nor for unknown versions
+        self.assertIsNone(Migrations.chain(Distance, "2.0"))
+        msg = Distance.from_rawdata(payload("2.0", distance=3.0, unit="cm"))
+        self.assertEqual((msg.distance, msg.unit), (3.0, "cm"))
+        Distance.from_rawdata(payload("3.0", unit="cm"))
+        self.assertEqual(self.calls, [])
+
+    def test_roundtrip(self):
+        # messages built with the current code are encoded at the current version and not upgraded again
+        msg = Distance(distance=2.0, unit="cm")
+        for rd in (msg.to_rawdata(), msg.to_rawdata("cbor"), Distance.to_rawdata_many([msg])[0]):
+            decoded = Distance.from_rawdata(rd)
+            self.assertEqual((decoded.distance, decoded.unit, decoded.header.version), (2.0, "cm", "2.0"))
+        self.assertEqual(Distance.from_rawdata_many([msg.to_rawdata()])[0].unit, "cm")
+        self.assertEqual(self.calls, [])
+        # the shared default header is left untouched
+        self.assertEqual(Header.get_default().version, "1.0")
+
+    def test_formats(self):
+        msg = Distance(distance=2.0, unit="cm")
+        formats = [fmt for fmt in ("json", "msgpack", "compact") if fmt in Serializers.available()]
+        encode = {
+            "json": lambda native: json.dumps(native).encode(),
+            "msgpack": lambda native: Serializers.get("msgpack").msgpack.packb(native),
+            "compact": lambda native: RawData.cbor_from_native_object(native).content,
+        }
+        for fmt in formats:
+            with self.subTest(format=fmt):
+                # encoded at the current version
+                decoded = Distance.from_rawdata(msg.to_rawdata(fmt))
+                self.assertEqual((decoded.distance, decoded.unit, decoded.header.version), (2.0, "cm", "2.0"))
+                # payloads of older versions are upgraded
+                for native in ({"header": {"version": "1.0"}, "data": 1.5}, {"data": 1.5}):
+                    rd = RawData(content=encode[fmt](native), content_type=Serializers.get(fmt).content_type)
+                    decoded = Distance.from_rawdata(rd)
+                    self.assertEqual((decoded.distance, decoded.unit, decoded.header.version),
+                                     (1.5, "m", "2.0"))
+        self.assertEqual(self.calls, ["1.1", "2.0", "1.1", "2.0"] * len(formats))
+
+    def test_fork(self):
+        # 1.0 -> 1.1 -> 2.0 and 1.5 -> 1.6 end at two different versions
+        Migrations.register(Distance, "1.5", "1.6", lambda native: native)
+        with self.assertRaises(ValueError):
+            Migrations.current(Distance)
+        with self.assertRaises(ValueError):
+            Distance(distance=2.0, unit="cm").to_rawdata()
+
+    def test_cached_chain(self):
+        chain = Migrations.chain(Distance, "1.0")
+        self.assertIs(Migrations.chain(Distance, "1.0"), chain)
+        # registering a new upgrade composes the chains again
+        Migrations.register(Distance, "0.9", "1.0", lambda native: native)
+        self.assertIsNot(Migrations.chain(Distance, "1.0"), chain)
+        self.assertEqual(Migrations.current(Distance), "2.0")
+
+    def test_batch(self):
+        msgs = Distance.from_rawdata_many([payload("1.0", data=1.0), payload("2.0", distance=2.0, unit="km")])
+        self.assertEqual([(m.distance, m.unit) for m in msgs], [(1.0, "m"), (2.0, "km")])
+        with self.assertRaises(BatchDecodingError):
+            Distance.from_rawdata_many([payload("2.0", distance=2.0)])
+
+    def test_errors(self):
+        with self.assertRaises(DataDecodingError):
+            # the 1.0 -> 1.1 upgrade needs "data"
+            Distance.from_rawdata(payload("1.0", distance=1.0))
+        with self.assertRaises(ValueError):
+            Migrations.register(Distance, "1.0", "1.2", lambda native: native)
+        with self.assertRaises(ValueError):
+            Migrations.register(Distance, "2.0", "2.0", lambda native: native)
+        Migrations.register(Distance, "2.0", "1.0", lambda native: native)
+        with self.assertRaises(ValueError):
+            Migrations.chain(Distance, "1.0")
+
+    def test_disabled(self):
+        Migrations.unregister(Distance)
+        self.assertFalse(Migrations.enabled)
+        self.assertIsNone(Migrations.current(Distance))
+        with self.assertRaises(DataDecodingError):
+            Distance.from_rawdata(payload("1.0", data=1.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import math
+import unittest
+
+import numpy as np
+
+from duckietown_messages.actuators.dc_motor import DCMotor
+from duckietown_messages.sensors.wheel_encoder import WheelEncoder
+from duckietown_messages.utils.odometry import WheelOdometry, align, ticks_per_revolution
+
+RADIUS = 0.0318
+BASELINE = 0.1
+
+
+def encoder(name: str, resolution: int = 135) -> WheelEncoder:
+    return WheelEncoder(name=name, type="wheel_encoder", simulated=True, resolution=resolution)
+
+
+def odometry() -> WheelOdometry:
+    return WheelOdometry(encoder("left"), encoder("right"), wheel_radius=RADIUS, baseline=BASELINE)
+
+
+def reference(t, left, right, step):
+    # per-sample dead reckoning with exact arcs
+    x = y = theta = 0.0
+    out = [(x, y, theta)]
+    for k in range(1, len(t)):
+        dl = (left[k] - left[k - 1]) * step
+        dr = (right[k] - right[k - 1]) * step
+        ds, dtheta = (dl + dr) / 2, (dr - dl) / BASELINE
+        if dtheta == 0:
+            x += ds * math.cos(theta)
+            y += ds * math.sin(theta)
+        else:
+            radius = ds / dtheta
+            x += radius * (math.sin(theta + dtheta) - math.sin(theta))
+            y -= radius * (math.cos(theta + dtheta) - math.cos(theta))
+        theta += dtheta
+        out.append((x, y, theta))
+    return np.array(out)
+
+
+class TestWheelOdometry(unittest.TestCase):
+
+    def test_straight(self):
+        odo = odometry()
+        t = np.arange(11) * 0.1
+        ticks = np.arange(11) * 135
+        poses, velocities = odo.integrate(t, ticks, ticks)
+        distance = 10 * 2 * math.pi * RADIUS
+        np.testing.assert_allclose(poses[-1], [distance, 0, 0, 1, 0, 0, 0], atol=1e-12)
+        np.testing.assert_allclose(velocities[1:, 0], 2 * math.pi * RADIUS / 0.1)
+        np.testing.assert_allclose(velocities[0], 0)
+
+    def test_rotation_in_place(self):
+        odo = odometry()
+        # half a turn of the robot
+        ticks = 135 * BASELINE / (4 * RADIUS)
+        poses, velocities = odo.integrate([0.0, 1.0], [0, -ticks], [0, ticks])
+        np.testing.assert_allclose(poses[-1, :6], [0, 0, 0, 0, 0, 0], atol=1e-12)
+        self.assertAlmostEqual(abs(poses[-1, 6]), 1)
+        self.assertAlmostEqual(velocities[-1, 5], math.pi)
+        self.assertAlmostEqual(abs(odo.pose[2]), math.pi)
+
+    def test_exact_arc(self):
+        # a full circle is closed regardless of the number of samples
+        for n in (2, 5, 100):
+            odo = odometry()
+            t = np.linspace(0, 1, n)
+            left = np.linspace(0, 1000, n)
+            right = np.linspace(0, 1000 + 135 * BASELINE / RADIUS, n)
+            poses, _ = odo.integrate(t, left, right)
+            np.testing.assert_allclose(poses[-1, :2], [0, 0], atol=1e-12)
+            self.assertAlmostEqual(odo.pose[2], 0)
+
+    def test_matches_reference(self):
+        rng = np.random.default_rng(0)
+        t = np.cumsum(rng.uniform(0.01, 0.03, 2000))
+        left = np.cumsum(rng.integers(0, 10, t.size))
+        right = np.cumsum(rng.integers(0, 10, t.size))
+        poses, _ = odometry().integrate(t, left, right)
+        expected = reference(t, left, right, 2 * math.pi * RADIUS / 135)
+        np.testing.assert_allclose(poses[:, :2], expected[:, :2], atol=1e-9)
+        np.testing.assert_allclose(np.arctan2(poses[:, 6], poses[:, 3]) * 2 % (2 * np.pi),
+                                   expected[:, 2] % (2 * np.pi), atol=1e-9)
+
+    def test_batches(self):
+        rng = np.random.default_rng(1)
+        t = np.arange(1000) * 0.01
+        left = np.cumsum(rng.integers(-3, 10, t.size))
+        right = np.cumsum(rng.integers(-3, 10, t.size))
+        full, full_velocities = odometry().integrate(t, left, right)
+        odo = odometry()
+        chunks = [odo.integrate(t[i:i + 64], left[i:i + 64], right[i:i + 64]) for i in range(0, t.size, 64)]
+        np.testing.assert_allclose(np.concatenate([p for p, _ in chunks]), full, atol=1e-9)
+        np.testing.assert_allclose(np.concatenate([v for _, v in chunks]), full_velocities, atol=1e-9)
+        # streaming, one message at a time
+        odo = odometry()
+        for i in range(100):
+            transformation, twist = odo.update(t[i], left[i], right[i])
+        self.assertAlmostEqual(transformation.position.x, full[99, 0])
+        self.assertAlmostEqual(transformation.rotation.z, full[99, 6])
+        self.assertEqual(twist.angular_velocity.z, full_velocities[99, 5])
+        self.assertEqual(transformation.header.timestamp, t[99])
+        self.assertEqual((transformation.source, transformation.target), ("odom", "footprint"))
+
+    def test_gear_ratio(self):
+        motor = DCMotor(name="motor", type="dc_motor", simulated=True, voltage=5, gear_ratio=30, torque=1,
+                        speed=3)
+        self.assertEqual(ticks_per_revolution(encoder("left", 7), motor), 210)
+        self.assertEqual(ticks_per_revolution(encoder("left", 7)), 7)
+        with self.assertRaises(ValueError):
+            ticks_per_revolution(encoder("left", 0))
+
+    def test_align(self):
+        t, left, right = align([0.0, 1.0, 2.0], [0, 10, 20], [0.5, 1.5, 2.5], [5, 15, 25])
+        np.testing.assert_array_equal(t, [0.5, 1.0, 1.5, 2.0])
+        np.testing.assert_array_equal(left, [5, 10, 15, 20])
+        np.testing.assert_array_equal(right, [5, 10, 15, 20])
+
+    def test_messages(self):
+        odo = odometry()
+        t = np.array([0.0, 0.5])
+        poses, velocities = odo.integrate(t, [0, 135], [0, 135])
+        transformations = odo.transformations(t, poses)
+        twists = odo.twists(t, velocities)
+        self.assertEqual(len(transformations), 2)
+        self.assertAlmostEqual(transformations[1].position.x, 2 * math.pi * RADIUS)
+        self.assertAlmostEqual(twists[1].linear_velocity.x, 4 * math.pi * RADIUS)
+        self.assertEqual(twists[1].header.frame, "footprint")
+
+
+if __name__ == '__main__':
+    unittest.main()
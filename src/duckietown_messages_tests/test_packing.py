@@ -0,0 +1,105 @@
+import struct
+import unittest
+
+import numpy as np
+from dtps_http import RawData
+
+from duckietown_messages.actuators.attitude_pids_parameters import AttitudePIDParameters
+from duckietown_messages.actuators.differential_pwm import DifferentialPWM
+from duckietown_messages.actuators.drone_control import DroneControl
+from duckietown_messages.actuators.drone_mode import DroneModeMsg, Mode
+from duckietown_messages.actuators.drone_motor_command import DroneMotorCommand
+from duckietown_messages.sensors.temperature import Temperature
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.exceptions import DataDecodingError
+from duckietown_messages.utils.packing import MIME_STRUCT, packed_layout
+
+
+class TestPacking(unittest.TestCase):
+
+    def test_roundtrip(self):
+        msgs = [
+            DroneControl(roll=1500, pitch=1500, yaw=1000, throttle=1200),
+            DroneMotorCommand(m1=1100, m2=1200, m3=1300, m4=1400),
+            DroneMotorCommand(header=Header(timestamp=12.5), m1=1100),
+            AttitudePIDParameters(**{f"{a}_pid_k{k}": 0.1 for a in ["roll", "pitch", "yaw"] for k in "pid"}),
+            DifferentialPWM(left=-0.5, right=1.0),
+            DroneModeMsg(mode=Mode.ARMED),
+        ]
+        for msg in msgs:
+            with self.subTest(cls=type(msg).__name__):
+                data = msg.pack()
+                self.assertEqual(len(data), packed_layout(type(msg)).size)
+                self.assertEqual(type(msg).unpack(data), msg)
+                self.assertEqual(type(msg).from_rawdata(msg.to_rawdata("struct")), msg)
+                self.assertLess(len(data), len(msg.to_rawdata().content))
+
+    def test_range_enforced(self):
+        data = bytearray(DroneControl(roll=1500, pitch=1500, yaw=1500, throttle=1500).pack())
+        layout = packed_layout(DroneControl)
+        # overwrite `throttle` with an out-of-range value
+        values = list(layout.struct.unpack(bytes(data)))
+        values[-1] = 2500.0
+        with self.assertRaises(DataDecodingError):
+            DroneControl.unpack(layout.struct.pack(*values))
+        values[-1] = float("nan")
+        with self.assertRaises(DataDecodingError):
+            DroneControl.unpack(layout.struct.pack(*values))
+
+    def test_invalid_enum(self):
+        layout = packed_layout(DroneModeMsg)
+        with self.assertRaises(DataDecodingError):
+            DroneModeMsg.unpack(layout.struct.pack(layout.schema_hash, 1, 7))
+
+    def test_schema_mismatch(self):
+        with self.assertRaises(DataDecodingError):
+            DroneControl.unpack(DifferentialPWM(left=0, right=0).pack() + bytes(16))
+        with self.assertRaises(DataDecodingError):
+            DroneControl.unpack(b"\x00")
+
+    def test_struct_format_requires_packable(self):
+        rd = DroneControl(roll=1500, pitch=1500, yaw=1000, throttle=1200).to_rawdata("struct")
+        self.assertEqual(rd.content_type, MIME_STRUCT)
+        # Temperature has numeric fields only, but is not Packable
+        with self.assertRaises(TypeError):
+            Temperature(data=1.0).to_rawdata("struct")
+        with self.assertRaises(DataDecodingError) as ctx:
+            Temperature.from_rawdata(rd)
+        self.assertIsNone(ctx.exception.error)
+        with self.assertRaises(DataDecodingError) as ctx:
+            DroneControl.from_rawdata(RawData(content=b"\x00", content_type=MIME_STRUCT))
+        self.assertIsInstance(ctx.exception.error, struct.error)
+
+    def test_pack_many(self):
+        msgs = [DroneMotorCommand(header=Header(timestamp=float(i)), m1=1000 + i) for i in range(10)]
+        arr = DroneMotorCommand.pack_many(msgs)
+        self.assertEqual(arr.shape, (10,))
+        np.testing.assert_array_equal(arr["m1"], np.arange(1000, 1010))
+        np.testing.assert_array_equal(arr["header"], np.arange(10.0))
+        self.assertEqual(DroneMotorCommand.unpack_many(arr), msgs)
+        data = DroneMotorCommand.pack_many_bytes(msgs)
+        self.assertEqual(len(data), packed_layout(DroneMotorCommand).size * 10 - 5 * 9)
+        self.assertEqual(DroneMotorCommand.unpack_many(data), msgs)
+        self.assertEqual(DroneMotorCommand.unpack_many(DroneMotorCommand.pack_many_bytes([])), [])
+
+    def test_unpack_many_schema(self):
+        # 4 x 24B of DifferentialPWM are as large as 3 x 32B of DroneControl
+        data = DifferentialPWM.pack_many_bytes([DifferentialPWM(left=0, right=0)] * 4)
+        self.assertEqual(packed_layout(DroneControl).dtype.itemsize, 32)
+        with self.assertRaises(DataDecodingError):
+            DroneControl.unpack_many(data)
+        with self.assertRaises(DataDecodingError):
+            DroneControl.unpack_many(data[5:])
+        with self.assertRaises(DataDecodingError):
+            DroneControl.unpack_many(DifferentialPWM.pack_many([DifferentialPWM(left=0, right=0)]))
+
+    def test_unpack_many_range(self):
+        arr = DroneControl.pack_many([DroneControl(roll=1500, pitch=1500, yaw=1500, throttle=1500)] * 4)
+        arr["yaw"][[1, 3]] = 100
+        with self.assertRaises(DataDecodingError) as ctx:
+            DroneControl.unpack_many(arr)
+        self.assertIn("[1, 3]", ctx.exception.message)
+
+
+if __name__ == '__main__':
+    unittest.main()
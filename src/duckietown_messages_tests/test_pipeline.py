@@ -0,0 +1,158 @@
+import asyncio
+import itertools
+import queue
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from duckietown_messages.sensors.compressed_image import CompressedImage
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.pipeline import BoundedQueue, Pipeline, QueueClosed, Stage, compress, decode, \
+    encode, to_array
+
+
+def double(x):
+    return 2 * x
+
+
+def invert(frame):
+    header, im = frame
+    return header, 255 - im
+
+
+class TestBoundedQueue(unittest.TestCase):
+
+    def test_policies(self):
+        q = BoundedQueue(2, "drop_oldest")
+        for i in range(5):
+            self.assertTrue(q.put(i))
+        self.assertEqual((q.get(), q.get(), q.dropped), (3, 4, 3))
+        q = BoundedQueue(2, "drop_newest")
+        self.assertEqual([q.put(i) for i in range(4)], [True, True, False, False])
+        self.assertEqual(q.get(), 0)
+        q = BoundedQueue(1, "block")
+        q.put(0)
+        with self.assertRaises(queue.Full):
+            q.put(1, timeout=0.01)
+        with self.assertRaises(ValueError):
+            BoundedQueue(1, "unknown")
+
+    def test_close(self):
+        q = BoundedQueue(1)
+        q.put(1)
+        # a blocked producer is released when the queue is closed
+        errors = []
+
+        def produce():
+            try:
+                q.put(2)
+            except QueueClosed as e:
+                errors.append(e)
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        time.sleep(0.01)
+        q.close()
+        producer.join(1)
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(q.get(), 1)
+        with self.assertRaises(QueueClosed):
+            q.get()
+        with self.assertRaises(queue.Empty):
+            BoundedQueue(1).get(timeout=0.01)
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_run(self):
+        def split(x):
+            yield x
+            if x % 4 == 2:
+                yield -x
+
+        drop_six = Stage(lambda x: x if x != 6 else None, name="filter")
+        pipeline = Pipeline([Stage(double), Stage(split), drop_six])
+        self.assertEqual(list(pipeline.run(range(5))), [0, 2, -2, 4, -6, 8])
+        stats = pipeline.stats()
+        self.assertEqual(list(stats), ["double", "split", "filter"])
+        self.assertEqual(stats["double"].processed, 5)
+        self.assertEqual((stats["split"].emitted, stats["filter"].emitted), (7, 6))
+        self.assertGreaterEqual(stats["double"].latency_max, stats["double"].latency_mean)
+
+    def test_workers(self):
+        async def slow(x):
+            time.sleep(0.01)
+            return x
+
+        pipeline = Pipeline([Stage(slow, workers=4)], queue_size=16)
+        t0 = time.monotonic()
+        self.assertEqual(sorted(pipeline.run(range(40))), list(range(40)))
+        # 40 items of 10ms on 4 workers
+        self.assertLess(time.monotonic() - t0, 0.3)
+        self.assertEqual(pipeline.stats()["slow"].processed, 40)
+
+    def test_early_stop(self):
+        loops = []
+
+        async def record(x):
+            loops.append(asyncio.get_running_loop())
+            return x
+
+        pipeline = Pipeline([Stage(double), Stage(record, workers=2)], queue_size=2)
+        feeder = None
+        for i, out in enumerate(pipeline.run(itertools.count())):
+            feeder = feeder or next(t for t in threading.enumerate() if t.name == "pipeline-feeder")
+            if i == 3:
+                break
+        # the workers and the feeder, blocked on full queues, are released when the consumer stops
+        self.assertIsNotNone(feeder)
+        self.assertFalse(feeder.is_alive())
+        self.assertFalse(any(t.is_alive() for stage in pipeline.stages for t in stage._threads))
+        self.assertTrue(all(loop.is_closed() for loop in loops))
+
+    def test_processes(self):
+        pipeline = Pipeline([Stage(double, workers=2, processes=True)])
+        self.assertEqual(sorted(pipeline.run(range(20))), list(range(0, 40, 2)))
+
+    def test_errors(self):
+        failed = []
+        stage = Stage(lambda x: 1 / x, name="inverse", on_error=lambda item, e: failed.append(item))
+        pipeline = Pipeline([stage])
+        self.assertEqual(list(pipeline.run([1, 0, 2])), [1.0, 0.5])
+        self.assertEqual(failed, [0])
+        self.assertEqual(pipeline.stats()["inverse"].errors, 1)
+
+    def test_drop_oldest(self):
+        gate = threading.Event()
+
+        def wait(x):
+            gate.wait()
+            return x
+
+        with Pipeline([Stage(wait, queue_size=2, policy="drop_oldest")], output_size=100) as pipeline:
+            pipeline.put(0)
+            time.sleep(0.05)
+            # the worker is busy with item 0, only the two freshest items are kept
+            for i in range(1, 10):
+                pipeline.put(i)
+            gate.set()
+            pipeline.close()
+            self.assertEqual(list(pipeline.results(timeout=1)), [0, 8, 9])
+            self.assertEqual(pipeline.stats()["wait"].dropped, 7)
+
+    def test_images(self):
+        gradient = np.linspace(0, 255, 64 * 48 * 3).reshape((48, 64, 3)).astype(np.uint8)
+        frames = [Image.from_rgb(gradient, Header(timestamp=i)) for i in range(10)]
+        stages = [decode(Image), to_array(), Stage(invert), compress(quality=95), encode()]
+        pipeline = Pipeline(stages)
+        out = [CompressedImage.from_rawdata(rd) for rd in pipeline.run(f.to_rawdata() for f in frames)]
+        self.assertEqual([m.header.timestamp for m in out], list(range(10)))
+        self.assertLess(np.abs(out[3].to_rgb().astype(int) - (255 - frames[3].as_rgb())).mean(), 8)
+        self.assertEqual(list(pipeline.stats()), ["decode:Image", "to_array", "invert", "compress", "encode"])
+
+
+if __name__ == '__main__':
+    unittest.main()
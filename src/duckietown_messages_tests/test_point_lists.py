@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+
+from duckietown_messages.geometry_2d.point import Point
+from duckietown_messages.geometry_2d.point_list import PointList
+from duckietown_messages.geometry_2d.polyline import Polyline
+from duckietown_messages.geometry_2d.segment_list import SegmentList
+from duckietown_messages.standard.header import Header
+
+
+class TestPointLists(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def test_point_list(self):
+        points = self.rng.random((100, 2)).astype(np.float32)
+        msg = PointList.from_array(points, ids=np.arange(100), header=Header(timestamp=1.0))
+        self.assertEqual(len(msg), 100)
+        self.assertEqual(len(msg.points), 800)
+        decoded = PointList.from_rawdata(msg.to_rawdata())
+        np.testing.assert_array_equal(decoded.as_array(), points)
+        np.testing.assert_array_equal(decoded.ids_array(), np.arange(100))
+        self.assertFalse(decoded.as_array().flags.writeable)
+        # list of points
+        back = PointList.from_points(msg.to_points())
+        np.testing.assert_array_equal(back.as_array(), points)
+        self.assertIsNone(back.ids_array())
+        self.assertEqual(msg.to_points()[3].header.timestamp, 1.0)
+        self.assertEqual(len(PointList.from_points([])), 0)
+
+    def test_segment_list(self):
+        segments = self.rng.random((300, 2, 2))
+        msg = SegmentList.from_array(segments, ids=self.rng.integers(0, 3, 300))
+        self.assertEqual(len(msg), 300)
+        decoded = SegmentList.from_rawdata(msg.to_rawdata())
+        np.testing.assert_allclose(decoded.as_array(), segments, rtol=1e-6)
+        np.testing.assert_allclose(decoded.lengths(), np.linalg.norm(segments[:, 1] - segments[:, 0], axis=1),
+                                   rtol=1e-5)
+        pairs = decoded.to_segments()
+        self.assertEqual(len(pairs), 300)
+        self.assertAlmostEqual(pairs[5][1].y, segments[5, 1, 1], places=6)
+        np.testing.assert_array_equal(SegmentList.from_segments(pairs).as_array(), decoded.as_array())
+
+    def test_polyline(self):
+        square = [Point(x=0, y=0), Point(x=1, y=0), Point(x=1, y=1), Point(x=0, y=1)]
+        self.assertAlmostEqual(Polyline.from_points(square).length(), 3.0)
+        closed = Polyline.from_points(square, closed=True)
+        self.assertAlmostEqual(closed.length(), 4.0)
+        self.assertTrue(Polyline.from_rawdata(closed.to_rawdata()).closed)
+        self.assertEqual([(p.x, p.y) for p in closed.to_points()], [(0, 0), (1, 0), (1, 1), (0, 1)])
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            PointList.from_array(np.zeros((3, 3)))
+        with self.assertRaises(ValueError):
+            SegmentList.from_array(np.zeros((3, 2)))
+        with self.assertRaises(ValueError):
+            PointList.from_array(np.zeros((3, 2)), ids=[1, 2])
+        with self.assertRaises(ValueError):
+            PointList(points=b"\x00" * 12).as_array()
+        with self.assertRaises(ValueError):
+            PointList(points=b"\x00" * 16, ids=b"\x00" * 4).ids_array()
+
+
+if __name__ == '__main__':
+    unittest.main()
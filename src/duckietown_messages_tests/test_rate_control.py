@@ -0,0 +1,61 @@
+import unittest
+import warnings
+
+import numpy as np
+
+from duckietown_messages.utils.image.rate_control import AdaptiveJPEGEncoder
+
+
+def _sequence(n: int = 60):
+    # a recorded-like sequence: a textured scene panning horizontally
+    rng = np.random.default_rng(0)
+    scene = rng.integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    return [np.roll(scene, i, axis=1) for i in range(n)]
+
+
+class TestAdaptiveJPEGEncoder(unittest.TestCase):
+
+    def _run(self, encoder, frames):
+        with warnings.catch_warnings():
+            # the faster JPEG engines are optional
+            warnings.filterwarnings("ignore", "JPEG engine", UserWarning)
+            return [(len(encoder.encode(f)), encoder.quality, encoder.scale) for f in frames]
+
+    def test_converges_to_target(self):
+        encoder = AdaptiveJPEGEncoder(target_bitrate=8 * 30 * 15000, fps=30)
+        self._run(encoder, _sequence())
+        stats = encoder.stats
+        self.assertEqual(stats.frames, 60)
+        self.assertAlmostEqual(stats.achieved_bitrate / stats.target_bitrate, 1.0, delta=0.05)
+
+    def test_deterministic(self):
+        frames = _sequence(20)
+        run1 = self._run(AdaptiveJPEGEncoder(target_bitrate=1e6, fps=30), frames)
+        run2 = self._run(AdaptiveJPEGEncoder(target_bitrate=1e6, fps=30), frames)
+        self.assertEqual(run1, run2)
+
+    def test_bandwidth_drop(self):
+        frames = _sequence(90)
+        encoder = AdaptiveJPEGEncoder(target_bitrate=8 * 30 * 15000, fps=30)
+        self._run(encoder, frames[:30])
+        q_before = encoder.quality
+        encoder.target_bitrate /= 2
+        self._run(encoder, frames[30:])
+        self.assertLess(encoder.quality, q_before)
+        self.assertAlmostEqual(encoder.stats.achieved_bitrate / encoder.target_bitrate, 1.0, delta=0.05)
+
+    def test_scaling(self):
+        encoder = AdaptiveJPEGEncoder(target_bitrate=8 * 30 * 1500, fps=30, allow_scaling=True)
+        self._run(encoder, _sequence())
+        self.assertGreater(encoder.scale, 1)
+        self.assertAlmostEqual(encoder.stats.achieved_bitrate / encoder.target_bitrate, 1.0, delta=0.1)
+
+    def test_no_scaling_saturates_quality(self):
+        encoder = AdaptiveJPEGEncoder(target_bitrate=8 * 30 * 1500, fps=30)
+        self._run(encoder, _sequence(20))
+        self.assertEqual(encoder.scale, 1)
+        self.assertEqual(encoder.quality, encoder.min_quality)
+
+
+if __name__ == '__main__':
+    unittest.main()
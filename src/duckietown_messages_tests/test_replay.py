@@ -0,0 +1,107 @@
+import unittest
+
+from dtps_http import RawData
+
+from duckietown_messages.sensors.range import Range
+from duckietown_messages.simulation.hil.replay import LocalSimulator, ReplayDriver, header_timestamp
+from duckietown_messages.standard.float import Float
+from duckietown_messages.standard.header import Header
+
+
+def ranges(timestamps):
+    return [Range(header=Header(timestamp=t), data=1.0).to_rawdata() for t in timestamps]
+
+
+class FakeTime:
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def echo(topic, rd, t):
+    # publishes a command for every range reading
+    if topic == "range":
+        return [("cmd", Float(header=Header(timestamp=t), data=t).to_rawdata())]
+
+
+class TestReplay(unittest.TestCase):
+
+    def test_header_timestamp(self):
+        self.assertEqual(header_timestamp(ranges([1.5])[0]), 1.5)
+        self.assertIsNone(header_timestamp(RawData.cbor_from_native_object([1, 2])))
+
+    def test_order(self):
+        simulator = LocalSimulator({
+            "range": ranges([0.0, 0.1, 0.2]),
+            "imu": [(0.0, RawData.cbor_from_native_object(i)) for i in range(3)] + ranges([0.15]),
+        })
+        order = [(t, topic) for t, _, _, topic, _ in simulator.events()]
+        # ties are broken by topic order, then by recording order
+        self.assertEqual(order, [(0.0, "range"), (0.0, "imu"), (0.0, "imu"), (0.0, "imu"),
+                                 (0.1, "range"), (0.15, "imu"), (0.2, "range")])
+        # replaying twice gives the same sequence
+        self.assertEqual(order, [(t, topic) for t, _, _, topic, _ in simulator.events()])
+
+    def test_missing_timestamp(self):
+        raw = RawData.cbor_from_native_object({"data": 1})
+        simulator = LocalSimulator({"a": [raw] + ranges([2.0]) + [raw]})
+        self.assertEqual([t for t, *_ in simulator.events()], [0.0, 2.0, 2.0])
+
+    def test_out_of_order(self):
+        simulator = LocalSimulator({"range": ranges([1.0, 0.5])})
+        with self.assertRaises(ValueError):
+            list(simulator.events())
+
+    def test_run(self):
+        simulator = LocalSimulator({"range": ranges([10.0, 10.5, 11.0]), "imu": ranges([10.25])})
+        seen = []
+
+        def agent(topic, rd, t):
+            seen.append((topic, t))
+            return echo(topic, rd, t)
+
+        stats = ReplayDriver(simulator, agent).run()
+        self.assertEqual(seen, [("range", 10.0), ("imu", 10.25), ("range", 10.5), ("range", 11.0)])
+        self.assertEqual([(t, topic) for t, topic, _ in simulator.received],
+                         [(10.0, "cmd"), (10.5, "cmd"), (11.0, "cmd")])
+        self.assertEqual(Float.from_rawdata(simulator.received[-1][2]).data, 11.0)
+        self.assertEqual((stats.messages, stats.outputs), (4, 3))
+        self.assertEqual(stats.per_topic, {"range": 3, "imu": 1})
+        self.assertEqual(stats.virtual_seconds, 1.0)
+        self.assertGreater(stats.bytes, 0)
+
+    def test_pacing(self):
+        for speed in (1.0, 10.0):
+            clock = FakeTime()
+            simulator = LocalSimulator({"range": ranges([0.0, 0.5, 1.0, 2.0])})
+            stats = ReplayDriver(simulator, echo, speed=speed, sleep=clock.sleep,
+                                 monotonic=clock.monotonic).run()
+            self.assertEqual(len(clock.sleeps), 3)
+            self.assertAlmostEqual(sum(clock.sleeps), 2.0 / speed)
+            self.assertAlmostEqual(stats.wall_seconds, 2.0 / speed)
+            self.assertAlmostEqual(stats.speedup, speed)
+        # as fast as possible
+        clock = FakeTime()
+        ReplayDriver(LocalSimulator({"range": ranges([0.0, 5.0])}), echo, sleep=clock.sleep).run()
+        self.assertEqual(clock.sleeps, [])
+        with self.assertRaises(ValueError):
+            ReplayDriver(simulator, echo, speed=0)
+
+    def test_until_limit(self):
+        simulator = LocalSimulator({"range": ranges([0.0, 1.0, 2.0, 3.0])})
+        self.assertEqual(ReplayDriver(simulator, echo).run(until=2.0).messages, 3)
+        self.assertEqual(ReplayDriver(simulator, echo).run(limit=2).messages, 2)
+        empty = ReplayDriver(LocalSimulator({}), echo).run()
+        self.assertEqual((empty.messages, empty.virtual_seconds), (0, 0.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+
+import numpy as np
+
+from duckietown_messages.geometry_2d.roi import ROI
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.sensors.rle_mask import RLEMask, rle_decode, rle_encode
+from duckietown_messages.standard.header import Header
+
+
+def blobs(h=120, w=160):
+    mask = np.zeros((h, w), dtype=np.uint8)
+    mask[10:30, 20:45] = 1
+    mask[70:71, 100:160] = 1
+    mask[90:120, 0:5] = 1
+    return mask
+
+
+class TestMono1(unittest.TestCase):
+
+    def test_row_aligned(self):
+        rng = np.random.default_rng(0)
+        mono = rng.integers(0, 256, (13, 21), dtype=np.uint8)
+        img = Image.from_mono1(mono)
+        self.assertEqual(img.step, 3)
+        self.assertEqual(len(img.data), 13 * 3)
+        np.testing.assert_array_equal(img.as_array(), (mono > 125).astype(np.uint8))
+        # every row starts on a new byte
+        np.testing.assert_array_equal(np.frombuffer(img.data, np.uint8).reshape(13, 3)[1],
+                                      np.packbits(mono[1] > 125))
+        decoded = Image.from_rawdata(img.to_rawdata())
+        np.testing.assert_array_equal(decoded.as_array(), img.as_array())
+
+    def test_threshold(self):
+        mono = np.array([[0, 50, 100, 200]], dtype=np.uint8)
+        np.testing.assert_array_equal(Image.from_mono1(mono).as_array(), [[0, 0, 0, 1]])
+        np.testing.assert_array_equal(Image.from_mono1(mono, threshold=40).as_array(), [[0, 1, 1, 1]])
+
+    def test_legacy_layout(self):
+        # images packed over the flattened buffer have a step of 0
+        bits = blobs(5, 11)
+        legacy = Image(width=11, height=5, encoding="mono1", step=0, data=np.packbits(bits).tobytes(),
+                       is_bigendian=False)
+        np.testing.assert_array_equal(legacy.as_array(), bits)
+        compact = legacy.compact()
+        self.assertEqual(compact.step, 2)
+        np.testing.assert_array_equal(compact.as_array(), bits)
+
+
+class TestRLEMask(unittest.TestCase):
+
+    def test_codec(self):
+        rng = np.random.default_rng(1)
+        masks = (blobs(), rng.random((31, 17)) > 0.5, np.ones((4, 4)), np.zeros((4, 4)), np.zeros((0, 3)))
+        for mask in masks:
+            counts = rle_encode(mask)
+            np.testing.assert_array_equal(rle_decode(counts, *mask.shape), mask.astype(np.uint8))
+        np.testing.assert_array_equal(rle_encode(np.array([[1, 1, 0, 1]])), [0, 2, 1, 1])
+        with self.assertRaises(ValueError):
+            rle_decode(np.array([3, 2]), 2, 2)
+
+    def test_message(self):
+        mask = blobs()
+        msg = RLEMask.from_mask(mask, header=Header(timestamp=1.0))
+        self.assertEqual(msg.area, int(mask.sum()))
+        decoded = RLEMask.from_rawdata(msg.to_rawdata())
+        np.testing.assert_array_equal(decoded.to_mask(), mask)
+        # images
+        image = msg.to_image()
+        self.assertEqual((image.encoding, image.width, image.height), ("mono1", 160, 120))
+        self.assertEqual(RLEMask.from_image(image).counts, msg.counts)
+        self.assertEqual(RLEMask.from_image(Image.from_mono8(mask * 255)).counts, msg.counts)
+        with self.assertRaises(ValueError):
+            RLEMask.from_image(Image.from_rgb(np.zeros((2, 2, 3), dtype=np.uint8)))
+        # sparse VGA masks are an order of magnitude smaller than the packed bits
+        sparse = np.zeros((480, 640), dtype=np.uint8)
+        sparse[200:260, 300:380] = sparse[400:420, 0:50] = 1
+        self.assertLess(len(RLEMask.from_mask(sparse).to_rawdata().content) * 10,
+                        len(Image.from_np(sparse, "mono1").to_rawdata().content))
+
+    def test_roi(self):
+        self.assertEqual(RLEMask.from_mask(blobs()).to_roi().model_dump(exclude={"header"}),
+                         {"x": 0, "y": 10, "width": 160, "height": 110})
+        mask = np.zeros((50, 60), dtype=np.uint8)
+        mask[5:9, 7:13] = 1
+        mask[20, 30] = 1
+        roi = RLEMask.from_mask(mask).to_roi()
+        self.assertEqual((roi.x, roi.y, roi.width, roi.height), (7, 5, 24, 16))
+        # a run wrapping to the next row covers all columns
+        mask = np.zeros((4, 10), dtype=np.uint8)
+        mask[1, 8:] = mask[2, :2] = 1
+        roi = RLEMask.from_mask(mask).to_roi()
+        self.assertEqual((roi.x, roi.y, roi.width, roi.height), (0, 1, 10, 2))
+        self.assertIsNone(RLEMask.from_mask(np.zeros((4, 4))).to_roi())
+
+    def test_from_roi(self):
+        for roi in (ROI(x=3, y=2, width=4, height=5), ROI(x=0, y=0, width=10, height=3),
+                    ROI(x=6, y=7, width=4, height=3), ROI(x=1, y=1, width=0, height=3),
+                    ROI(x=0, y=9, width=10, height=1)):
+            mask = np.zeros((10, 10), dtype=np.uint8)
+            mask[roi.y:roi.y + roi.height, roi.x:roi.x + roi.width] = 1
+            msg = RLEMask.from_roi(roi, 10, 10)
+            np.testing.assert_array_equal(msg.runs(), rle_encode(mask))
+            if roi.width and roi.height:
+                back = msg.to_roi()
+                self.assertEqual((back.x, back.y, back.width, back.height),
+                                 (roi.x, roi.y, roi.width, roi.height))
+        with self.assertRaises(ValueError):
+            RLEMask.from_roi(ROI(x=8, y=0, width=4, height=1), 10, 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+from dtps_http import RawData
+
+from duckietown_messages.sensors.image import Image
+from duckietown_messages.sensors.temperature import Temperature
+from duckietown_messages.utils.exceptions import DataDecodingError
+from duckietown_messages.utils.packing import Packable
+from duckietown_messages.utils.samples import all_message_classes, sample
+from duckietown_messages.utils.serialization import Serializers
+
+
+class TestSerialization(unittest.TestCase):
+
+    def test_roundtrip_all_classes(self):
+        for cls in all_message_classes():
+            msg = sample(cls)
+            for fmt in Serializers.available():
+                if fmt == "struct" and not issubclass(cls, Packable):
+                    continue
+                with self.subTest(cls=cls.__name__, format=fmt):
+                    rd = msg.to_rawdata(fmt)
+                    self.assertEqual(rd.content_type, Serializers.get(fmt).content_type)
+                    self.assertEqual(cls.from_rawdata(rd), msg)
+
+    def test_default_is_cbor(self):
+        msg = Temperature(data=1.0)
+        self.assertEqual(msg.to_rawdata().content, RawData.cbor_from_native_object(msg.model_dump()).content)
+
+    def test_json_bytes(self):
+        msg = Image.from_rgb(np.arange(12, dtype=np.uint8).reshape((2, 2, 3)))
+        rd = msg.to_rawdata("json")
+        # binary data travels as base64 text
+        rd.content.decode("ascii")
+        self.assertEqual(Image.from_rawdata(rd).data, msg.data)
+
+    def test_content_type_parameters(self):
+        rd = Temperature(data=1.0).to_rawdata("json")
+        rd = RawData(content=rd.content, content_type="application/json; charset=utf-8")
+        self.assertEqual(Temperature.from_rawdata(rd).data, 1.0)
+
+    def test_null_payloads(self):
+        for fmt in ["cbor", "msgpack", "json"]:
+            if fmt not in Serializers.available():
+                continue
+            with self.subTest(format=fmt):
+                content = {"cbor": b"\xf6", "msgpack": b"\xc0", "json": b"null"}[fmt]
+                rd = RawData(content=content, content_type=Serializers.get(fmt).content_type)
+                self.assertIsNone(Temperature.from_rawdata(rd, allow_none=True))
+                with self.assertRaises(DataDecodingError):
+                    Temperature.from_rawdata(rd)
+
+    def test_invalid(self):
+        rd = RawData(content=b'{"data": "hot"}', content_type="application/json")
+        with self.assertRaises(DataDecodingError):
+            Temperature.from_rawdata(rd)
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            Temperature(data=1.0).to_rawdata("xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import random
+import unittest
+
+from duckietown_messages.sensors.range import Range
+from duckietown_messages.standard.header import Header
+from duckietown_messages.utils.synchronizer import ApproximateTimeSynchronizer
+
+
+def msg(t):
+    return Range(header=Header(timestamp=t), data=1.0)
+
+
+def stamps(matches):
+    return [tuple(m.header.timestamp if m.header.timestamp is None else round(m.header.timestamp, 6)
+                  for m in match) for match in matches]
+
+
+class TestApproximateTimeSynchronizer(unittest.TestCase):
+
+    def test_pairs(self):
+        sync = ApproximateTimeSynchronizer(["camera", "imu"], slop=0.002)
+        out = []
+        for i in range(100):
+            # 1kHz IMU, camera every 33 samples
+            out += sync.add("imu", msg(i / 1000))
+            if i % 33 == 10:
+                out += sync.add("camera", msg(i / 1000 + 0.0004))
+        self.assertEqual(stamps(out), [(0.0104, 0.010), (0.0434, 0.043), (0.0764, 0.076)])
+        self.assertEqual(sync.stats.tuples, 3)
+        self.assertEqual(sync.stats.matched, 6)
+
+    def test_closest(self):
+        # the closest message is picked even if an earlier one is within the slop
+        sync = ApproximateTimeSynchronizer(["a", "b"], slop=0.05)
+        out = sync.add("a", msg(1.0))
+        for t in (0.96, 0.98, 0.999, 1.02):
+            out += sync.add("b", msg(t))
+        self.assertEqual(stamps(out), [(1.0, 0.999)])
+        self.assertEqual(sync.pending(), {"a": 0, "b": 1})
+
+    def test_wait_for_closer(self):
+        sync = ApproximateTimeSynchronizer(["a", "b"], slop=0.05)
+        self.assertEqual(sync.add("a", msg(1.0)), [])
+        # a message after the pivot may still arrive
+        self.assertEqual(sync.add("b", msg(0.97)), [])
+        self.assertEqual(stamps(sync.add("b", msg(1.01))), [(1.0, 1.01)])
+
+    def test_three_streams(self):
+        sync = ApproximateTimeSynchronizer(["image", "imu", "range"], slop=0.01)
+        out = []
+        for t in (0.0, 0.1, 0.2):
+            out += sync.add("image", msg(t))
+        for t in [i / 100 for i in range(25)]:
+            out += sync.add("imu", msg(t + 0.001))
+        for t in (0.005, 0.104, 0.3):
+            out += sync.add("range", msg(t))
+        self.assertEqual(stamps(out), [(0.0, 0.001, 0.005), (0.1, 0.101, 0.104)])
+
+    def test_unmatched_pivot(self):
+        sync = ApproximateTimeSynchronizer(["a", "b"], slop=0.01)
+        out = sync.add("a", msg(1.0)) + sync.add("b", msg(1.5)) + sync.add("a", msg(1.505))
+        self.assertEqual(out, [])
+        self.assertEqual(sync.stats.stale, 1)
+        # a newer message of b proves that 1.5 is the closest one
+        self.assertEqual(stamps(sync.add("b", msg(1.6))), [(1.505, 1.5)])
+        # 1.6 cannot be matched with anything newer than 1.505 + 0.01
+        out = [m for t in (1.7, 1.8) for m in sync.add("a", msg(t)) + sync.add("b", msg(t + 0.002))]
+        self.assertEqual(stamps(out), [(1.7, 1.702)])
+        self.assertEqual(sync.stats.stale, 2)
+
+    def test_out_of_order(self):
+        expected = [(i / 10, round(i / 10 + 0.001, 6)) for i in range(19)]
+        for seed in range(5):
+            sync = ApproximateTimeSynchronizer(["a", "b"], slop=0.005, queue_size=100)
+            # b arrives first, shuffled, a arrives in order
+            b = [i / 10 + 0.001 for i in range(20)]
+            random.Random(seed).shuffle(b)
+            out = []
+            for t in b:
+                out += sync.add("b", msg(t))
+            for i in range(20):
+                out += sync.add("a", msg(i / 10))
+            # the last message of a waits for a newer message of b
+            self.assertEqual(stamps(out), expected)
+
+    def test_late(self):
+        sync = ApproximateTimeSynchronizer(["a", "b"], slop=0.01)
+        sync.add("a", msg(1.0))
+        sync.add("b", msg(1.0))
+        self.assertEqual(sync.add("a", msg(0.5)), [])
+        self.assertEqual(sync.stats.late, 1)
+
+    def test_missing(self):
+        sync = ApproximateTimeSynchronizer(["a", "b"], slop=0.01)
+        self.assertEqual(sync.add("a", msg(None)), [])
+        self.assertEqual(sync.stats.missing, 1)
+        sync = ApproximateTimeSynchronizer(["a", "b"], slop=0.01, missing="arrival", clock=lambda: 5.0)
+        out = sync.add("b", msg(4.999)) + sync.add("b", msg(5.2)) + sync.add("a", msg(None))
+        self.assertEqual(stamps(out), [(None, 4.999)])
+
+    def test_overflow(self):
+        sync = ApproximateTimeSynchronizer(["a", "b"], slop=0.01, queue_size=10)
+        for i in range(50):
+            sync.add("a", msg(i))
+        self.assertEqual(sync.pending()["a"], 10)
+        self.assertEqual(sync.stats.overflow, 40)
+        with self.assertRaises(ValueError):
+            ApproximateTimeSynchronizer(["a"], slop=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
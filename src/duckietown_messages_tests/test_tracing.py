@@ -0,0 +1,100 @@
+import unittest
+
+from duckietown_messages.sensors.temperature import Temperature
+from duckietown_messages.standard.header import Header
+from duckietown_messages.standard.trace import MAX_TRACE_STAMPS
+from duckietown_messages.utils.tracing import Tracing, TraceAggregator
+
+
+class TestTracing(unittest.TestCase):
+
+    def tearDown(self):
+        Tracing.disable()
+
+    def test_disabled_is_noop(self):
+        header = Tracing.start()
+        self.assertIsNone(header.trace)
+        msg = Temperature(header=header, data=21.0)
+        Tracing.stamp(msg, "processing")
+        self.assertIsNone(Tracing.propagate(msg).trace)
+        self.assertIsNone(Temperature.from_rawdata(msg.to_rawdata()).header.trace)
+        # the shared default header is never touched
+        self.assertIsNone(Header.get_default().trace)
+        # nor is the wire format
+        self.assertNotIn("trace", msg.model_dump()["header"])
+        self.assertNotIn(b"trace", msg.to_rawdata().content)
+        self.assertNotIn(b"trace", msg.to_rawdata("json").content)
+
+    def test_dump_options(self):
+        msg = Temperature(header=Header(frame="sensor", txt={"a": 1}), data=21.0)
+        self.assertNotIn("txt", msg.header.model_dump(exclude={"txt"}))
+        self.assertNotIn("txt", msg.model_dump(exclude={"header": {"txt"}})["header"])
+        self.assertEqual(msg.header.model_dump(exclude_none=True), {"version": "1.0", "frame": "sensor",
+                                                                      "txt": {"a": 1}})
+        self.assertIn("timestamp", Header.model_json_schema(mode="serialization")["properties"])
+
+    def test_start_stamp_propagate(self):
+        Tracing.enable()
+        msg = Temperature(header=Tracing.start(Header(frame="sensor"), "camera"), data=21.0)
+        self.assertEqual(msg.header.frame, "sensor")
+        Tracing.stamp(msg, "processing")
+        self.assertEqual([s for s, _ in msg.header.trace.stamps], ["camera", "processing"])
+        out = Temperature(header=Tracing.propagate(msg), data=22.0)
+        self.assertEqual(out.header.trace.id, msg.header.trace.id)
+        Tracing.stamp(out, "output")
+        # the input message is not affected
+        self.assertEqual(len(msg.header.trace.stamps), 2)
+        self.assertEqual(len(out.header.trace.stamps), 3)
+        stamps = [t for _, t in out.header.trace.stamps]
+        self.assertEqual(stamps, sorted(stamps))
+
+    def test_serialized(self):
+        Tracing.enable()
+        msg = Temperature(header=Tracing.start(Header(frame="sensor"), "camera"), data=21.0)
+        for fmt in ("cbor", "json"):
+            decoded = Temperature.from_rawdata(msg.to_rawdata(fmt))
+            self.assertEqual(decoded.header.trace.id, msg.header.trace.id)
+
+    def test_decode_encode_stamps(self):
+        Tracing.enable()
+        msg = Temperature(header=Tracing.start(), data=21.0)
+        decoded = Temperature.from_rawdata(msg.to_rawdata())
+        self.assertEqual([s for s, _ in decoded.header.trace.stamps],
+                         ["source", "encode:Temperature", "decode:Temperature"])
+        self.assertEqual(decoded.header.trace.id, msg.header.trace.id)
+
+    def test_bounded(self):
+        Tracing.enable()
+        header = Tracing.start(stage="first")
+        for i in range(3 * MAX_TRACE_STAMPS):
+            Tracing.stamp(header, f"stage{i}")
+        stamps = header.trace.stamps
+        self.assertEqual(len(stamps), MAX_TRACE_STAMPS)
+        self.assertEqual(stamps[0][0], "first")
+        self.assertEqual(stamps[-1][0], f"stage{3 * MAX_TRACE_STAMPS - 1}")
+
+    def test_aggregator(self):
+        aggregator = TraceAggregator()
+        # untraced messages are ignored
+        aggregator.observe(Temperature(data=21.0), "received")
+        self.assertEqual(aggregator.snapshot(), {})
+        Tracing.enable()
+        for _ in range(5):
+            msg = Temperature(header=Tracing.start(), data=21.0)
+            aggregator.observe(Temperature.from_rawdata(msg.to_rawdata()), "received")
+        stats = aggregator.snapshot()
+        self.assertEqual(set(stats), {
+            "source -> encode:Temperature",
+            "encode:Temperature -> decode:Temperature",
+            "decode:Temperature -> received",
+            "end-to-end source -> received",
+        })
+        for segment in stats.values():
+            self.assertEqual(segment["count"], 5)
+            self.assertGreaterEqual(segment["mean_seconds"], 0)
+        aggregator.reset()
+        self.assertEqual(aggregator.snapshot(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+from typing import Any
+
+import duckietown_messages
+from duckietown_messages.base import BaseMessage
+from duckietown_messages.standard.header import Header, AUTO
+from duckietown_messages.utils.warmup import is_built
+
+
+def classes():
+    # fresh classes, not built yet
+
+    class Deferred(BaseMessage):
+        header: Header = AUTO
+        data: int
+
+    class Untypable(BaseMessage):
+        data: Any
+
+    return Deferred, Untypable
+
+
+class TestWarmup(unittest.TestCase):
+
+    def test_deferred(self):
+        class Lazy(BaseMessage):
+            data: float
+
+        self.assertFalse(is_built(Lazy))
+        # built on first use
+        self.assertEqual(Lazy(data=1).data, 1.0)
+        self.assertTrue(is_built(Lazy))
+
+    def test_warmup(self):
+        Deferred, _ = classes()
+        self.assertFalse(is_built(Deferred))
+        times = duckietown_messages.warmup([Deferred])
+        self.assertTrue(is_built(Deferred))
+        self.assertEqual(list(times), [Deferred])
+        self.assertGreater(times[Deferred], 0)
+        self.assertEqual(Deferred.from_rawdata(Deferred(data=3).to_rawdata()).data, 3)
+
+    def test_failure(self):
+        Deferred, Untypable = classes()
+        with self.assertWarns(UserWarning):
+            times = duckietown_messages.warmup([Untypable, Deferred])
+        self.assertEqual(list(times), [Deferred])
+        self.assertTrue(duckietown_messages.warmup([Untypable], sample=False))
+
+    def test_all(self):
+        times = duckietown_messages.warmup(sample=False)
+        self.assertGreater(len(times), 40)
+        self.assertTrue(all(is_built(cls) for cls in times))
+
+
+if __name__ == '__main__':
+    unittest.main()